@@ -0,0 +1,3 @@
+#!/bin/bash
+cd /root/mlb-airflow-data-pipeline
+micromamba run -n mlb-airflow-env python mlb_airflow_data_pipeline/statsapi_pipeline_script.py --persist_intermediates
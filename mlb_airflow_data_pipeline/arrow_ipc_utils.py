@@ -0,0 +1,85 @@
+import os
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from mlb_airflow_data_pipeline.logging_setup import get_logger
+
+logger = get_logger("arrow_ipc_utils")
+
+ARROW_IPC_SUFFIX = ".arrow"
+
+
+def get_arrow_ipc_path(path: str) -> str:
+    """Returns the path of the Arrow IPC file handed off next to a CSV file,
+    e.g. national_league_2023-06-01_batter_stats_df.arrow.
+    """
+    return str(Path(path).with_suffix(ARROW_IPC_SUFFIX))
+
+
+def write_arrow_ipc(df: pd.DataFrame, path: str) -> str:
+    """Writes a DataFrame, index included, as an uncompressed Arrow IPC
+    (Feather v2) file so that readers can memory-map it. The file is written
+    next to its final path and then renamed, so that a reader never sees a
+    partially written file.
+
+    Args:
+        df: Data to hand off to the next stage
+        path: Path of the Arrow IPC file
+
+    Returns:
+        str: Path of the Arrow IPC file
+    """
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    temporary_path = f"{path}.tmp"
+    # compressed buffers would have to be decompressed, hence copied, on read
+    feather.write_feather(table, temporary_path, compression="uncompressed")
+    os.replace(temporary_path, path)
+    logger.debug("arrow_ipc_file_written", file_path=path, data_shape=df.shape)
+    return path
+
+
+def read_arrow_ipc(path: str, columns: list[str] | None = None) -> pd.DataFrame:
+    """Reads an Arrow IPC file through a memory map. The record batches are
+    not copied out of the page cache, and the numeric columns without
+    missing values are handed to pandas without a copy either.
+
+    Args:
+        path: Path of the Arrow IPC file
+        columns: If given, only these columns are converted to pandas
+
+    Returns:
+        pd.DataFrame: Data as written, with its index
+    """
+    # the buffers of the table keep the memory map alive
+    table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+    if columns is not None:
+        index_columns = [
+            col
+            for col in table.schema.pandas_metadata.get("index_columns", [])
+            if isinstance(col, str)
+        ]
+        table = table.select(index_columns + columns)
+    return table.to_pandas(split_blocks=True)
+
+
+def read_handoff_data(path: str) -> pd.DataFrame:
+    """Reads the data handed off by the previous stage, memory-mapping its
+    Arrow IPC file if there is one at least as recent as the CSV file, and
+    falling back to parsing the CSV file otherwise.
+
+    Args:
+        path: Path of the CSV file, whose first column is the index
+
+    Returns:
+        pd.DataFrame: Data as written by the previous stage
+    """
+    arrow_ipc_path = get_arrow_ipc_path(path)
+    if os.path.exists(arrow_ipc_path) and (
+        not os.path.exists(path)
+        or os.stat(arrow_ipc_path).st_mtime_ns >= os.stat(path).st_mtime_ns
+    ):
+        return read_arrow_ipc(arrow_ipc_path)
+    return pd.read_csv(path, index_col=0)
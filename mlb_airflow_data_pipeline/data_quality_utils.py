@@ -0,0 +1,344 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from mlb_airflow_data_pipeline.db_utils import STAT_PLACEHOLDERS, create_table
+from mlb_airflow_data_pipeline.logging_setup import get_logger
+
+logger = get_logger("data_quality_utils")
+
+PROFILES_TABLE_NAME = "data_quality_profiles"
+
+# every other column of a snapshot is expected to hold numbers
+TEXT_COLUMNS = ["playername", "date"]
+
+# plausible ranges of the stats, every other stat being non-negative
+STAT_RANGES: dict[str, tuple[float, float]] = {
+    "avg": (0.0, 1.0),
+    "obp": (0.0, 1.0),
+    "slg": (0.0, 4.0),
+    "ops": (0.0, 5.0),
+    "babip": (0.0, 1.0),
+    "fielding": (0.0, 1.0),
+    "stolenBasePercentage": (0.0, 1.0),
+    "strikePercentage": (0.0, 1.0),
+    "winPercentage": (0.0, 1.0),
+}
+
+PROFILE_COUNT_COLUMNS = [
+    "row_count",
+    "null_count",
+    "placeholder_count",
+    "coercion_failure_count",
+    "out_of_range_count",
+]
+PROFILE_VALUE_COLUMNS = ["min", "max", "mean"]
+
+DRIFT_COLUMNS = ["column_name", "check", "previous_value", "current_value"]
+
+# a column drifts when its share of missing values grows by more than this
+NULL_RATE_DRIFT_THRESHOLD = 0.05
+# or when its mean changes by more than this share of the previous mean
+MEAN_DRIFT_THRESHOLD = 0.25
+# a snapshot drifts when its number of rows changes by more than this share
+ROW_COUNT_DRIFT_THRESHOLD = 0.1
+
+
+def profile_snapshot(
+    snapshot_df: pd.DataFrame, text_columns: list[str] = TEXT_COLUMNS
+) -> pd.DataFrame:
+    """Profiles every column of a snapshot in a single vectorized pass over
+    its values: missing values, statsapi placeholders, values that are not
+    numbers, values out of their plausible range, and min, max and mean.
+
+    Args:
+        snapshot_df: Snapshot as extracted, typically with text stats
+        text_columns: Columns holding text, only their missing values are counted
+
+    Returns:
+        pd.DataFrame: Profile indexed by column name, with the
+        PROFILE_COUNT_COLUMNS and PROFILE_VALUE_COLUMNS columns
+    """
+    numeric_columns = [col for col in snapshot_df.columns if col not in text_columns]
+    raw_df = snapshot_df[numeric_columns]
+    is_null = raw_df.isna().to_numpy()
+    is_placeholder = raw_df.isin(STAT_PLACEHOLDERS).to_numpy()
+    values = (
+        raw_df.mask(is_placeholder)
+        .apply(pd.to_numeric, errors="coerce")
+        .to_numpy(dtype=float, na_value=np.nan)
+    )
+    is_present = ~np.isnan(values)
+
+    lower_bounds, upper_bounds = (
+        np.array([STAT_RANGES.get(col, (0.0, np.inf)) for col in numeric_columns])
+        .reshape(-1, 2)
+        .T
+    )
+    is_out_of_range = is_present & ((values < lower_bounds) | (values > upper_bounds))
+
+    present_counts = is_present.sum(axis=0)
+    has_values = present_counts > 0
+    # columns without any number have no min, max nor mean
+    column_mins = np.min(values, axis=0, initial=np.inf, where=is_present)
+    column_maxs = np.max(values, axis=0, initial=-np.inf, where=is_present)
+    column_sums = np.sum(values, axis=0, where=is_present)
+
+    numeric_profile = pd.DataFrame(
+        {
+            "row_count": len(snapshot_df),
+            "null_count": is_null.sum(axis=0),
+            "placeholder_count": is_placeholder.sum(axis=0),
+            "coercion_failure_count": (~is_present & ~is_null & ~is_placeholder).sum(
+                axis=0
+            ),
+            "out_of_range_count": is_out_of_range.sum(axis=0),
+            "min": np.where(has_values, column_mins, np.nan),
+            "max": np.where(has_values, column_maxs, np.nan),
+            "mean": np.where(
+                has_values, column_sums / np.maximum(present_counts, 1), np.nan
+            ),
+        },
+        index=numeric_columns,
+    )
+    text_profile = pd.DataFrame(
+        {
+            "row_count": len(snapshot_df),
+            "null_count": snapshot_df[
+                [col for col in text_columns if col in snapshot_df.columns]
+            ]
+            .isna()
+            .sum(),
+        }
+    )
+    profile = pd.concat([text_profile, numeric_profile]).reindex(
+        index=snapshot_df.columns,
+        columns=PROFILE_COUNT_COLUMNS + PROFILE_VALUE_COLUMNS,
+    )
+    profile[PROFILE_COUNT_COLUMNS] = (
+        profile[PROFILE_COUNT_COLUMNS].fillna(0).astype("int64")
+    )
+    profile.index.name = "column_name"
+    return profile
+
+
+def detect_drift(profile: pd.DataFrame, previous_profile: pd.DataFrame) -> pd.DataFrame:
+    """Compares the profile of a snapshot with the one of the previous
+    snapshot and lists the columns that drifted.
+
+    Args:
+        profile: Profile as returned by profile_snapshot
+        previous_profile: Profile of the previous snapshot
+
+    Returns:
+        pd.DataFrame: One row per drift, with the column_name, check,
+        previous_value and current_value columns
+    """
+    drifts = []
+    for column_name in previous_profile.index.difference(profile.index):
+        drifts.append((column_name, "missing_column", 1.0, 0.0))
+    for column_name in profile.index.difference(previous_profile.index):
+        drifts.append((column_name, "new_column", 0.0, 1.0))
+
+    common_columns = profile.index.intersection(previous_profile.index, sort=False)
+    current = profile.loc[common_columns]
+    previous = previous_profile.loc[common_columns]
+
+    previous_rows_count = int(previous_profile["row_count"].max())
+    rows_count = int(profile["row_count"].max())
+    if (
+        previous_rows_count > 0
+        and abs(rows_count - previous_rows_count) / previous_rows_count
+        > ROW_COUNT_DRIFT_THRESHOLD
+    ):
+        drifts.append(("*", "row_count", previous_rows_count, rows_count))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        previous_null_rates = previous["null_count"] / previous["row_count"]
+        current_null_rates = current["null_count"] / current["row_count"]
+        mean_changes = (current["mean"] - previous["mean"]).abs() / previous[
+            "mean"
+        ].abs()
+    checks = {
+        "null_rate": (
+            current_null_rates - previous_null_rates > NULL_RATE_DRIFT_THRESHOLD,
+            previous_null_rates,
+            current_null_rates,
+        ),
+        "coercion_failures": (
+            current["coercion_failure_count"] > previous["coercion_failure_count"],
+            previous["coercion_failure_count"],
+            current["coercion_failure_count"],
+        ),
+        "out_of_range": (
+            current["out_of_range_count"] > previous["out_of_range_count"],
+            previous["out_of_range_count"],
+            current["out_of_range_count"],
+        ),
+        "mean": (
+            mean_changes > MEAN_DRIFT_THRESHOLD,
+            previous["mean"],
+            current["mean"],
+        ),
+    }
+    for check, (is_drifting, previous_values, current_values) in checks.items():
+        for column_name in common_columns[is_drifting.to_numpy(dtype=bool)]:
+            drifts.append(
+                (
+                    column_name,
+                    check,
+                    float(previous_values[column_name]),
+                    float(current_values[column_name]),
+                )
+            )
+
+    return pd.DataFrame(drifts, columns=DRIFT_COLUMNS)
+
+
+class DataQualityProfileStore:
+    """Profiles of the snapshots of every league and date, persisted so that
+    each run is compared with the previous one."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        count_columns_sql = ", ".join(
+            f"{col} INTEGER NOT NULL" for col in PROFILE_COUNT_COLUMNS
+        )
+        value_columns_sql = ", ".join(f"{col} REAL" for col in PROFILE_VALUE_COLUMNS)
+        create_table(
+            self.conn,
+            f"""
+            CREATE TABLE IF NOT EXISTS {PROFILES_TABLE_NAME} (
+                league TEXT NOT NULL,
+                date TEXT NOT NULL,
+                column_name TEXT NOT NULL,
+                {count_columns_sql},
+                {value_columns_sql},
+                PRIMARY KEY (league, date, column_name)
+            ) WITHOUT ROWID;
+            """,
+        )
+
+    def write_profile(self, profile: pd.DataFrame, league_name: str, date: str) -> None:
+        """Stores the profile of a snapshot, replacing any previous one.
+
+        Args:
+            profile: Profile as returned by profile_snapshot
+            league_name: League of the snapshot
+            date: Snapshot date in the YYYY-MM-DD format
+
+        Raises:
+            sqlite3.Error: If the profile cannot be written
+        """
+        profile_columns = PROFILE_COUNT_COLUMNS + PROFILE_VALUE_COLUMNS
+        rows = [
+            (league_name, date, column_name, *values)
+            for column_name, values in zip(
+                profile.index,
+                profile[profile_columns]
+                .astype(object)
+                .where(profile[profile_columns].notna(), None)
+                .itertuples(index=False),
+            )
+        ]
+        placeholders = ", ".join("?" for _ in range(3 + len(profile_columns)))
+        try:
+            with self.conn:
+                self.conn.execute(
+                    f"DELETE FROM {PROFILES_TABLE_NAME} WHERE league = ? AND date = ?",
+                    (league_name, date),
+                )
+                self.conn.executemany(
+                    f"INSERT INTO {PROFILES_TABLE_NAME} "
+                    f"(league, date, column_name, {', '.join(profile_columns)}) "
+                    f"VALUES ({placeholders})",
+                    rows,
+                )
+        except sqlite3.Error as e:
+            raise sqlite3.Error(f"Failed to write data quality profile: {e}")
+
+    def read_profile(self, league_name: str, date: str) -> pd.DataFrame | None:
+        """Reads the profile of a snapshot.
+
+        Args:
+            league_name: League of the snapshot
+            date: Snapshot date in the YYYY-MM-DD format
+
+        Returns:
+            pd.DataFrame | None: Profile indexed by column name, None if the
+            snapshot was not profiled
+        """
+        profile = pd.read_sql_query(
+            f"SELECT column_name, {', '.join(PROFILE_COUNT_COLUMNS)}, "
+            f"{', '.join(PROFILE_VALUE_COLUMNS)} FROM {PROFILES_TABLE_NAME} "
+            "WHERE league = ? AND date = ?",
+            self.conn,
+            params=(league_name, date),
+            index_col="column_name",
+        )
+        return None if profile.empty else profile
+
+    def get_previous_date(self, league_name: str, date: str) -> str | None:
+        """Returns the latest profiled date of a league before a date."""
+        row = self.conn.execute(
+            f"SELECT MAX(date) FROM {PROFILES_TABLE_NAME} "
+            "WHERE league = ? AND date < ?",
+            (league_name, date),
+        ).fetchone()
+        previous_date: str | None = row[0]
+        return previous_date
+
+
+def run_data_quality_check(
+    conn: sqlite3.Connection,
+    snapshot_df: pd.DataFrame,
+    league_name: str,
+    date: str,
+) -> pd.DataFrame:
+    """Profiles a snapshot, stores its profile and flags the drifts from the
+    previous profiled snapshot of the league.
+
+    Args:
+        conn: Database connection object
+        snapshot_df: Snapshot as extracted
+        league_name: League of the snapshot
+        date: Snapshot date in the YYYY-MM-DD format
+
+    Returns:
+        pd.DataFrame: Drifts as returned by detect_drift, empty for the first
+        snapshot of a league
+    """
+    profile_store = DataQualityProfileStore(conn)
+    profile = profile_snapshot(snapshot_df)
+    profile_store.write_profile(profile, league_name, date)
+
+    issue_counts = profile[["coercion_failure_count", "out_of_range_count"]].sum()
+    logger.info(
+        "data_quality_profiled",
+        league=league_name,
+        date=date,
+        columns_count=len(profile),
+        rows_count=len(snapshot_df),
+        coercion_failures=int(issue_counts["coercion_failure_count"]),
+        out_of_range_values=int(issue_counts["out_of_range_count"]),
+    )
+
+    previous_date = profile_store.get_previous_date(league_name, date)
+    if previous_date is None:
+        return pd.DataFrame(columns=DRIFT_COLUMNS)
+
+    drifts = detect_drift(
+        profile,
+        profile_store.read_profile(league_name, previous_date),  # type: ignore
+    )
+    if not drifts.empty:
+        logger.warning(
+            "data_quality_drift_detected",
+            league=league_name,
+            date=date,
+            previous_date=previous_date,
+            drifts_count=len(drifts),
+            drifts=drifts.to_dict(orient="records")[:20],
+        )
+    return drifts
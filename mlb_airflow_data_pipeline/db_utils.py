@@ -7,6 +7,9 @@ import pandas as pd
 
 from mlb_airflow_data_pipeline.statsapi_parameters_script import DATA_FILE_LOCATION
 
+# placeholder strings used by the statsapi for undefined rate stats
+STAT_PLACEHOLDERS = ["-.--", ".---", "*.**"]
+
 
 @contextmanager
 def create_connection(db_file: str) -> Iterator[sqlite3.Connection]:
@@ -56,7 +59,9 @@ def insert_dataframe(
     df: pd.DataFrame,
     mode: Literal["fail", "replace", "append"] | None = "append",
 ) -> None:
-    """Inserts a pandas DataFrame into a table.
+    """Inserts a pandas DataFrame into a table. When appending, the columns
+    missing from an existing table, e.g. a stat the statsapi started to serve,
+    are added to it first.
 
     Args:
         conn: Database connection object
@@ -68,6 +73,8 @@ def insert_dataframe(
     """
     assert mode is not None, "Mode must be one of 'fail', 'replace', or 'append'."
     try:
+        if mode == "append":
+            add_missing_columns(conn, table_name, df)
         df.to_sql(table_name, conn, if_exists=mode, index=False)
         conn.commit()
     except sqlite3.Error as e:
@@ -76,6 +83,43 @@ def insert_dataframe(
         raise Exception(f"Failed to insert DataFrame into table {table_name}: {e}")
 
 
+def add_missing_columns(
+    conn: sqlite3.Connection, table_name: str, df: pd.DataFrame
+) -> list[str]:
+    """Adds the columns of the DataFrame that an existing table lacks, typed
+    after their dtype. The rows already stored hold NULL in them.
+
+    Args:
+        conn: Database connection object
+        table_name: Name of the table
+        df: DataFrame about to be appended to the table
+
+    Returns:
+        list[str]: Names of the added columns, empty if the table does not exist
+
+    Raises:
+        sqlite3.Error: If a column cannot be added
+    """
+    table_columns = {
+        row[1] for row in conn.execute(f'PRAGMA table_info("{table_name}")')
+    }
+    if not table_columns:
+        return []
+
+    missing_columns = [col for col in df.columns if col not in table_columns]
+    for column in missing_columns:
+        if pd.api.types.is_bool_dtype(df[column]) or pd.api.types.is_integer_dtype(
+            df[column]
+        ):
+            column_type = "INTEGER"
+        elif pd.api.types.is_float_dtype(df[column]):
+            column_type = "REAL"
+        else:
+            column_type = "TEXT"
+        conn.execute(f'ALTER TABLE "{table_name}" ADD COLUMN "{column}" {column_type}')
+    return missing_columns
+
+
 def read_table(conn: sqlite3.Connection, table_name: str) -> pd.DataFrame:
     """Reads a table into a pandas DataFrame.
 
@@ -111,3 +155,27 @@ def get_database_path() -> str:
         conn = sqlite3.connect(db_path)
         conn.close()
     return str(db_path)
+
+
+def cast_stat_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Returns a copy of the DataFrame where every column whose values are all
+    numeric (once the statsapi placeholders are treated as missing) is cast to
+    a numeric dtype. Columns containing free text, such as player or team names,
+    are left untouched.
+
+    Args:
+        df: DataFrame as returned by the extraction, typically with TEXT stats
+
+    Returns:
+        pd.DataFrame: DataFrame with typed stat columns
+    """
+    typed_df = df.copy()
+    for column in typed_df.columns:
+        if pd.api.types.is_numeric_dtype(typed_df[column]):
+            continue
+        values = typed_df[column].replace(STAT_PLACEHOLDERS, None)
+        try:
+            typed_df[column] = pd.to_numeric(values)
+        except (ValueError, TypeError):
+            continue
+    return typed_df
@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+import pandas.api.types as pdtypes
+
+from mlb_airflow_data_pipeline.db_utils import cast_stat_columns
+from mlb_airflow_data_pipeline.logging_setup import get_logger
+from mlb_airflow_data_pipeline.statsapi_parameters_script import PLAYER_INFORMATION
+
+logger = get_logger("dtype_utils")
+
+# counting stats are not downcast below int16, so that the sums and
+# differences of a few of them computed by the features cannot overflow
+MIN_INTEGER_DTYPE = np.dtype("int16")
+
+
+def get_memory_usage_bytes(input_df: pd.DataFrame) -> int:
+    """Returns the memory used by a DataFrame, including its index and the
+    strings held by object columns.
+
+    Args:
+        input_df: DataFrame to measure
+
+    Returns:
+        int: Memory usage in bytes
+    """
+    return int(input_df.memory_usage(deep=True).sum())
+
+
+def compact_column(series: pd.Series) -> pd.Series:
+    """Downcasts a numeric column: integral values become the smallest integer
+    type of at least 16 bits holding them, nullable if values are missing,
+    and other numbers become float32.
+
+    Args:
+        series: Column to downcast
+
+    Returns:
+        pd.Series: Downcast column, unchanged if it is not numeric
+    """
+    if not pdtypes.is_numeric_dtype(series) or pdtypes.is_bool_dtype(series):
+        return series
+
+    values = series.to_numpy(dtype=float, na_value=np.nan)
+    present_values = values[~np.isnan(values)]
+    if not (
+        np.isfinite(present_values).all()
+        and np.array_equal(present_values, np.trunc(present_values))
+    ):
+        return series.astype("float32")
+
+    integer_dtype = max(
+        pd.to_numeric(present_values, downcast="integer").dtype, MIN_INTEGER_DTYPE
+    )
+    if len(present_values) < len(values):
+        # e.g. Int16, which keeps the missing values of players without the stat
+        return series.astype(integer_dtype.name.capitalize())
+    return series.astype(integer_dtype)
+
+
+def compact_dtypes(
+    input_df: pd.DataFrame, categorical_columns: list[str] | None = None
+) -> pd.DataFrame:
+    """Shrinks the memory of a player stats DataFrame: counting stats are
+    downcast to small integers, rates to float32, and the player names and
+    team ids become categorical. Rates read as text because of the statsapi
+    placeholders are parsed first. The memory usage before and after is logged.
+
+    Args:
+        input_df: Player stats
+        categorical_columns: Columns made categorical, the player
+        information columns by default
+
+    Returns:
+        pd.DataFrame: Player stats with compact dtypes
+    """
+    if categorical_columns is None:
+        categorical_columns = PLAYER_INFORMATION
+
+    typed_df = cast_stat_columns(input_df)
+    compact_df = pd.DataFrame(
+        {
+            col: typed_df[col].astype("category")
+            if col in categorical_columns
+            else compact_column(typed_df[col])
+            for col in typed_df.columns
+        },
+        index=input_df.index,
+    )
+
+    memory_before_bytes = get_memory_usage_bytes(input_df)
+    memory_after_bytes = get_memory_usage_bytes(compact_df)
+    logger.info(
+        "dtypes_compacted",
+        memory_before_bytes=memory_before_bytes,
+        memory_after_bytes=memory_after_bytes,
+        memory_saved_ratio=round(1 - memory_after_bytes / memory_before_bytes, 3)
+        if memory_before_bytes
+        else 0.0,
+    )
+    return compact_df
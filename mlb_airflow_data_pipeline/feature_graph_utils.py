@@ -0,0 +1,367 @@
+import threading
+from graphlib import CycleError, TopologicalSorter
+from typing import Callable, Optional
+
+import pandas as pd
+from pydantic import BaseModel
+
+from mlb_airflow_data_pipeline.logging_setup import get_logger
+from mlb_airflow_data_pipeline.rate_stats_utils import (
+    get_rate_stat_inputs,
+    recompute_rate_stats,
+)
+from mlb_airflow_data_pipeline.statsapi_feature_utils import (
+    compute_grouped_normalization_features,
+    compute_grouped_statistics,
+    compute_innings_pitched_features,
+    compute_league_statistics,
+    compute_mean_normalization_features,
+    compute_ratio_features,
+    create_babip,
+    get_grouped_normalization_feature_names,
+)
+
+logger = get_logger("feature_graph_utils")
+
+MEAN_NORMALIZATION_FEATURE_NAME = "mean_normalization"
+GROUPED_NORMALIZATION_FEATURE_NAME = "grouped_normalization"
+
+
+class FeatureDefinition(BaseModel):
+    """A feature computed from input columns into output columns.
+
+    The function receives a frame holding exactly the input columns and
+    returns a frame holding exactly the output columns. When a statistics
+    function is given, it is computed on the same inputs first and the
+    function is called with it as its second argument.
+
+    Row-wise features only depend on the values of their own row, so they
+    can be computed once over the whole input and shared between configs
+    that filter different rows.
+
+    Statistics computed within the groups of some input columns, e.g. per
+    team, declare these columns as group keys.
+    """
+
+    name: str
+    inputs: list[str]
+    outputs: list[str]
+    function: Callable
+    statistics_function: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None
+    row_wise: bool = True
+    group_keys: list[str] = []
+
+
+def resolve_feature_order(
+    feature_definitions: list[FeatureDefinition],
+    requested_features: list[str],
+    available_columns: list[str],
+) -> list[FeatureDefinition]:
+    """Orders the features required by the requested ones so that every
+    feature comes after the features producing its inputs. Features that
+    are not needed by a requested feature are left out.
+
+    A declared feature takes precedence over an input column of the same name.
+
+    Args:
+        feature_definitions: Declared features
+        requested_features: Output columns to compute
+        available_columns: Columns of the input data
+
+    Returns:
+        list[FeatureDefinition]: Features to compute, in order
+
+    Raises:
+        ValueError: If an output is declared twice, a column is neither
+        declared nor available, or the features depend on each other cyclically
+    """
+    producers: dict[str, FeatureDefinition] = {}
+    for definition in feature_definitions:
+        for output in definition.outputs:
+            if output in producers:
+                raise ValueError(f"Feature {output} is declared more than once")
+            producers[output] = definition
+
+    graph: dict[str, set[str]] = {}
+    definitions_by_name: dict[str, FeatureDefinition] = {}
+    pending = list(requested_features)
+    while pending:
+        column = pending.pop()
+        producer = producers.get(column)
+        if producer is None:
+            if column not in available_columns:
+                raise ValueError(f"Feature {column} is not declared nor available")
+            continue
+        if producer.name in graph:
+            continue
+
+        definitions_by_name[producer.name] = producer
+        graph[producer.name] = {
+            producers[input_name].name
+            for input_name in producer.inputs
+            if input_name in producers
+        }
+        pending.extend(producer.inputs)
+
+    try:
+        ordered_names = list(TopologicalSorter(graph).static_order())
+    except CycleError as e:
+        raise ValueError(f"Features depend on each other cyclically: {e.args[1]}")
+    return [definitions_by_name[name] for name in ordered_names]
+
+
+class FeatureEngine:
+    """Computes declared features in dependency order.
+
+    An engine created with the input shared by several configs memoizes the
+    row-wise features it computes on the whole input, so that the same
+    intermediate is computed once for the batter, pitcher and defender data.
+    The frames given to compute must then be row subsets of that input.
+    """
+
+    def __init__(self, input_df: pd.DataFrame | None = None):
+        # row-wise features are only shared when rows can be matched by index
+        self.input_df = (
+            input_df if input_df is not None and input_df.index.is_unique else None
+        )
+        self._memo: dict[tuple, pd.DataFrame] = {}
+        self._lock = threading.Lock()
+
+    def compute(
+        self,
+        input_df: pd.DataFrame,
+        feature_definitions: list[FeatureDefinition],
+        requested_features: list[str] | None = None,
+    ) -> tuple[pd.DataFrame, dict[str, pd.DataFrame]]:
+        """Computes the requested features and attaches them to the input with
+        a single concat, replacing input columns of the same name.
+
+        Args:
+            input_df: Data the features are computed on
+            feature_definitions: Declared features
+            requested_features: Output columns to compute, every declared
+            output by default
+
+        Returns:
+            pd.DataFrame: input_df with the requested features
+            dict[str, pd.DataFrame]: Statistics of the computed features, by
+            feature name
+        """
+        if requested_features is None:
+            requested_features = [
+                output
+                for definition in feature_definitions
+                for output in definition.outputs
+            ]
+        ordered_definitions = resolve_feature_order(
+            feature_definitions, requested_features, list(input_df.columns)
+        )
+
+        feature_columns: dict[str, pd.Series] = {}
+        statistics: dict[str, pd.DataFrame] = {}
+        # full input columns of the memoized features, for their dependents
+        memoized_columns: dict[str, pd.Series] = {}
+        memoized_features_count = 0
+        for definition in ordered_definitions:
+            if self._is_memoizable(definition, memoized_columns, feature_columns):
+                full_output_df = self._get_memoized_output(definition, memoized_columns)
+                memoized_columns.update(full_output_df.items())
+                output_df = full_output_df.loc[input_df.index]
+                memoized_features_count += 1
+            else:
+                output_df, definition_statistics = compute_feature(
+                    definition,
+                    get_feature_inputs(definition, input_df, feature_columns),
+                )
+                if definition_statistics is not None:
+                    statistics[definition.name] = definition_statistics
+            feature_columns.update(output_df.items())
+
+        output_columns = [col for col in requested_features if col in feature_columns]
+        logger.debug(
+            "features_computed",
+            features_count=len(ordered_definitions),
+            memoized_features_count=memoized_features_count,
+        )
+        return (
+            pd.concat(
+                [
+                    input_df.drop(columns=output_columns, errors="ignore"),
+                    pd.DataFrame(
+                        {col: feature_columns[col] for col in output_columns},
+                        index=input_df.index,
+                    ),
+                ],
+                axis=1,
+            ),
+            statistics,
+        )
+
+    def _is_memoizable(
+        self,
+        definition: FeatureDefinition,
+        memoized_columns: dict[str, pd.Series],
+        feature_columns: dict[str, pd.Series],
+    ) -> bool:
+        # every input must be memoized too, or an input column that no
+        # feature computed on the given rows replaces
+        return (
+            self.input_df is not None
+            and definition.row_wise
+            and definition.statistics_function is None
+            and all(
+                col in memoized_columns
+                or (col not in feature_columns and col in self.input_df.columns)
+                for col in definition.inputs
+            )
+        )
+
+    def _get_memoized_output(
+        self, definition: FeatureDefinition, memoized_columns: dict[str, pd.Series]
+    ) -> pd.DataFrame:
+        key = (
+            definition.name,
+            tuple(definition.inputs),
+            tuple(definition.outputs),
+            # definitions of the same name and columns may compute differently
+            definition.function,
+        )
+        with self._lock:
+            if key not in self._memo:
+                self._memo[key], _ = compute_feature(
+                    definition,
+                    get_feature_inputs(definition, self.input_df, memoized_columns),  # type: ignore
+                )
+            return self._memo[key]
+
+
+def get_feature_inputs(
+    definition: FeatureDefinition,
+    input_df: pd.DataFrame,
+    feature_columns: dict[str, pd.Series],
+) -> pd.DataFrame:
+    """Gathers the input columns of a feature, preferring computed features
+    over input columns of the same name.
+    """
+    return pd.DataFrame(
+        {
+            col: feature_columns[col] if col in feature_columns else input_df[col]
+            for col in definition.inputs
+        },
+        index=input_df.index,
+    )
+
+
+def compute_feature(
+    definition: FeatureDefinition, inputs_df: pd.DataFrame
+) -> tuple[pd.DataFrame, pd.DataFrame | None]:
+    """Computes the outputs, and statistics if any, of a feature."""
+    if definition.statistics_function is None:
+        return definition.function(inputs_df)[definition.outputs], None
+    statistics = definition.statistics_function(inputs_df)
+    return definition.function(inputs_df, statistics)[definition.outputs], statistics
+
+
+def babip_feature() -> FeatureDefinition:
+    """BABIP according to MLB, see create_babip."""
+    return FeatureDefinition(
+        name="babip",
+        inputs=["hits", "homeRuns", "atBats", "strikeOuts", "sacFlies"],
+        outputs=["babip"],
+        # the inputs are gathered in a new frame, which create_babip can extend
+        function=create_babip,
+    )
+
+
+def dif_strike_outs_base_on_balls_feature() -> FeatureDefinition:
+    """Difference between strikeouts and walks,
+    see create_dif_strike_outs_base_on_balls."""
+    return FeatureDefinition(
+        name="difstrikeOutsbaseOnBalls",
+        inputs=["strikeOuts", "baseOnBalls"],
+        outputs=["difstrikeOutsbaseOnBalls"],
+        function=lambda df: pd.DataFrame(
+            {"difstrikeOutsbaseOnBalls": df["strikeOuts"] - df["baseOnBalls"]}
+        ),
+    )
+
+
+def ratio_feature(
+    name: str, feature_name_list: list, denominator_name: str, suffix: str
+) -> FeatureDefinition:
+    """Features divided by a denominator column, see compute_ratio_features."""
+    return FeatureDefinition(
+        name=name,
+        inputs=feature_name_list + [denominator_name],
+        outputs=[feature_name + suffix for feature_name in feature_name_list],
+        function=lambda df: compute_ratio_features(
+            df, feature_name_list, denominator_name, suffix
+        ),
+    )
+
+
+def plate_appearance_feature(feature_name_list: list) -> FeatureDefinition:
+    """Features normalized by the player's plate appearances."""
+    return ratio_feature(
+        "plate_appearance_normalization",
+        feature_name_list,
+        "plateAppearances",
+        "perplateAppearance",
+    )
+
+
+def innings_pitched_feature(feature_name_list: list) -> FeatureDefinition:
+    """Features normalized by the player's pitched innings, see
+    compute_innings_pitched_features."""
+    return FeatureDefinition(
+        name="innings_pitched_normalization",
+        inputs=feature_name_list + ["inningsPitched"],
+        outputs=[feature_name + "inningsPitched" for feature_name in feature_name_list],
+        function=lambda df: compute_innings_pitched_features(df, feature_name_list),
+    )
+
+
+def rate_stats_feature(rate_stat_names: list[str]) -> FeatureDefinition:
+    """Rate stats recomputed from counting stats, replacing the rounded ones
+    returned by statsapi, see recompute_rate_stats."""
+    return FeatureDefinition(
+        name="rate_stats",
+        inputs=get_rate_stat_inputs(rate_stat_names),
+        outputs=rate_stat_names,
+        function=lambda df: recompute_rate_stats(df, rate_stat_names),
+    )
+
+
+def mean_normalization_feature(feature_name_list: list) -> FeatureDefinition:
+    """Features normalized by the league's mean and their z-scores. The
+    league's means and stds are kept as the statistics of the feature."""
+    return FeatureDefinition(
+        name=MEAN_NORMALIZATION_FEATURE_NAME,
+        inputs=feature_name_list,
+        outputs=["normalized_" + feature_name for feature_name in feature_name_list]
+        + [feature_name + "_z_score" for feature_name in feature_name_list],
+        function=compute_mean_normalization_features,
+        statistics_function=lambda df: compute_league_statistics(df, feature_name_list),
+        row_wise=False,
+    )
+
+
+def grouped_normalization_feature(
+    feature_name_list: list, group_keys: list
+) -> FeatureDefinition:
+    """Features normalized by the mean of the player's group and their
+    z-scores within it, for every grouping key, e.g. team_id. The groups'
+    means and stds are kept as the statistics of the feature."""
+    return FeatureDefinition(
+        name=GROUPED_NORMALIZATION_FEATURE_NAME,
+        inputs=feature_name_list + group_keys,
+        outputs=get_grouped_normalization_feature_names(feature_name_list, group_keys),
+        function=lambda df, statistics: compute_grouped_normalization_features(
+            df, statistics, feature_name_list, group_keys
+        ),
+        statistics_function=lambda df: compute_grouped_statistics(
+            df, feature_name_list, group_keys
+        ),
+        row_wise=False,
+        group_keys=group_keys,
+    )
@@ -0,0 +1,297 @@
+import fcntl
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import sys
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from types import CodeType
+from typing import Any, Iterator
+
+import pandas as pd
+from pydantic import BaseModel
+
+from mlb_airflow_data_pipeline.logging_setup import get_logger
+from mlb_airflow_data_pipeline.snapshot_utils import normalize_stat_columns
+from mlb_airflow_data_pipeline.statsapi_parameters_script import DATA_FILE_LOCATION
+
+logger = get_logger("feature_store_utils")
+
+OUTPUT_FILE_NAME = "output.parquet"
+STATISTICS_FILE_NAME = "league_statistics.parquet"
+LOCK_FILE_NAME = ".lock"
+
+DEFAULT_MAX_SIZE_BYTES = 256 * 1024 * 1024
+
+# bump to invalidate every cached output after a change to the treatment
+# that the configuration hash cannot see, e.g. in a third party library
+FEATURE_STORE_VERSION = 1
+
+# only the source of the pipeline's own modules is hashed
+PIPELINE_PACKAGE_NAME = "mlb_airflow_data_pipeline"
+
+
+class FeatureStoreKey(BaseModel):
+    league_name: str
+    date: str
+    input_hash: str
+    config_hash: str
+
+    @property
+    def entry_name(self) -> str:
+        return f"{self.league_name}_{self.date}_{self.input_hash}_{self.config_hash}"
+
+
+def get_feature_store_root() -> str:
+    """Returns the root directory of the feature store.
+
+    Returns:
+        str: Path to the feature store directory inside the data directory
+    """
+    feature_store_root = Path(DATA_FILE_LOCATION) / "feature_store"
+    feature_store_root.mkdir(parents=True, exist_ok=True)
+    return str(feature_store_root)
+
+
+def compute_input_hash(input_df: pd.DataFrame) -> str:
+    """Computes a hash of the content of a DataFrame: its columns, index
+    and values. The values are normalized with normalize_stat_columns, so
+    that the hash does not depend on the dtypes pandas inferred.
+
+    Args:
+        input_df: DataFrame to hash
+
+    Returns:
+        str: Hexadecimal hash
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps([str(col) for col in input_df.columns]).encode())
+    digest.update(
+        pd.util.hash_pandas_object(normalize_stat_columns(input_df), index=True)
+        .to_numpy()
+        .tobytes()
+    )
+    return digest.hexdigest()[:16]
+
+
+@lru_cache(maxsize=None)
+def _hash_module_source(module_name: str) -> str:
+    module = sys.modules.get(module_name)
+    try:
+        source = inspect.getsource(module)  # type: ignore
+    except (OSError, TypeError):
+        return ""
+    return hashlib.sha256(source.encode()).hexdigest()[:16]
+
+
+def _describe_code(code: CodeType) -> dict:
+    return {
+        "bytecode": hashlib.sha256(code.co_code).hexdigest()[:16],
+        # constants such as thresholds, and the code of nested functions
+        "constants": [
+            _describe_code(const) if isinstance(const, CodeType) else repr(const)
+            for const in code.co_consts
+        ],
+        "names": list(code.co_names),
+    }
+
+
+def _get_referenced_names(code: CodeType) -> set[str]:
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, CodeType):
+            names |= _get_referenced_names(const)
+    return names
+
+
+def _describe_callable(value: Any) -> dict:
+    if not callable(value):
+        raise TypeError(f"Cannot hash configuration value {value!r}")
+    description: dict[str, Any] = {"name": f"{value.__module__}.{value.__qualname__}"}
+    module_names = {value.__module__}
+    code = getattr(value, "__code__", None)
+    if code is not None:
+        # editing a feature function, a value it closes over, or a helper
+        # of the pipeline it calls invalidates the outputs computed with it
+        description["code"] = _describe_code(code)
+        description["closure"] = [
+            cell.cell_contents for cell in value.__closure__ or ()
+        ]
+        for name in _get_referenced_names(code):
+            referenced = value.__globals__.get(name)
+            if callable(referenced) and hasattr(referenced, "__module__"):
+                module_names.add(referenced.__module__)
+    description["module_sources"] = {
+        module_name: _hash_module_source(module_name)
+        for module_name in sorted(module_names)
+        if module_name.startswith(PIPELINE_PACKAGE_NAME)
+    }
+    return description
+
+
+def compute_config_hash(config: BaseModel) -> str:
+    """Computes a hash of a treatment configuration, e.g. a
+    DataTreaterInputRepresentation. Functions are identified by their name,
+    code, constants and closure values, and the source of the pipeline
+    modules they call. FEATURE_STORE_VERSION is hashed too.
+
+    Args:
+        config: Configuration to hash
+
+    Returns:
+        str: Hexadecimal hash
+    """
+    serialized_config = json.dumps(
+        [FEATURE_STORE_VERSION, config.model_dump()],
+        default=_describe_callable,
+        sort_keys=True,
+    )
+    return hashlib.sha256(serialized_config.encode()).hexdigest()[:16]
+
+
+class FeatureStore:
+    """Caches treated outputs on disk, keyed by league, date, input content
+    and treatment configuration, so that unchanged reruns skip the treatment.
+
+    Each entry is a directory holding the output and its league statistics
+    as Parquet files. When the store grows above its maximum size, the least
+    recently used entries are evicted. Reads, writes and evictions hold a lock
+    file of the store, so that the treatment processes of a batch sharing the
+    store never evict an entry another one is reading or writing.
+    """
+
+    def __init__(
+        self,
+        root: str | None = None,
+        max_size_bytes: int = DEFAULT_MAX_SIZE_BYTES,
+    ):
+        self.root = Path(get_feature_store_root() if root is None else root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_size_bytes = max_size_bytes
+        self._lock = threading.Lock()
+
+    def get_key(
+        self,
+        league_name: str | None,
+        date: str | None,
+        input_df: pd.DataFrame,
+        config: BaseModel,
+    ) -> FeatureStoreKey:
+        """Builds the key of a treatment of the input data.
+
+        Args:
+            league_name: League of the input data, if known
+            date: Date of the input data, if known
+            input_df: Input data of the treatment
+            config: Treatment configuration
+
+        Returns:
+            FeatureStoreKey: Key of the treated output
+        """
+        return FeatureStoreKey(
+            league_name=league_name or "unknown",
+            date=date or "unknown",
+            input_hash=compute_input_hash(input_df),
+            config_hash=compute_config_hash(config),
+        )
+
+    def get(
+        self, key: FeatureStoreKey
+    ) -> tuple[pd.DataFrame, pd.DataFrame | None] | None:
+        """Reads a cached output and marks it as recently used.
+
+        Args:
+            key: Key of the treated output
+
+        Returns:
+            tuple[pd.DataFrame, pd.DataFrame | None] | None: Output and league
+            statistics, None if the key is not cached
+        """
+        entry_path = self.root / key.entry_name
+        with self._locked(fcntl.LOCK_SH):
+            if not entry_path.exists():
+                logger.debug("feature_store_miss", entry=key.entry_name)
+                return None
+            output_df = pd.read_parquet(entry_path / OUTPUT_FILE_NAME)
+            statistics_path = entry_path / STATISTICS_FILE_NAME
+            statistics_df = (
+                pd.read_parquet(statistics_path) if statistics_path.exists() else None
+            )
+            os.utime(entry_path)
+
+        logger.info("feature_store_hit", entry=key.entry_name)
+        return output_df, statistics_df
+
+    def put(
+        self,
+        key: FeatureStoreKey,
+        output_df: pd.DataFrame,
+        statistics_df: pd.DataFrame | None = None,
+    ) -> Path:
+        """Caches a treated output, then evicts the least recently used entries
+        while the store is above its maximum size.
+
+        Args:
+            key: Key of the treated output
+            output_df: Treated output
+            statistics_df: League statistics of the output
+
+        Returns:
+            Path: Entry directory
+        """
+        entry_path = self.root / key.entry_name
+        # written aside first so that readers never see a partial entry
+        tmp_path = self.root / f".{key.entry_name}.tmp"
+        with self._locked(fcntl.LOCK_EX):
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            tmp_path.mkdir()
+            output_df.to_parquet(tmp_path / OUTPUT_FILE_NAME)
+            if statistics_df is not None:
+                statistics_df.to_parquet(tmp_path / STATISTICS_FILE_NAME)
+            shutil.rmtree(entry_path, ignore_errors=True)
+            tmp_path.rename(entry_path)
+            self._evict(keep=entry_path)
+
+        logger.info("feature_store_put", entry=key.entry_name)
+        return entry_path
+
+    def get_size_bytes(self) -> int:
+        """Returns the total size of the cached entries."""
+        return sum(size for _, _, size in self._list_entries())
+
+    @contextmanager
+    def _locked(self, operation: int) -> Iterator[None]:
+        # the lock file serializes the processes sharing the store and the
+        # thread lock the threads of this one
+        with self._lock, open(self.root / LOCK_FILE_NAME, "a") as lock_file:
+            fcntl.flock(lock_file, operation)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _list_entries(self) -> list[tuple[Path, float, int]]:
+        entries = []
+        for entry_path in self.root.iterdir():
+            if not entry_path.is_dir() or entry_path.name.startswith("."):
+                continue
+            size = sum(file.stat().st_size for file in entry_path.iterdir())
+            entries.append((entry_path, entry_path.stat().st_mtime, size))
+        return entries
+
+    def _evict(self, keep: Path) -> None:
+        entries = sorted(self._list_entries(), key=lambda entry: entry[1])
+        total_size = sum(size for _, _, size in entries)
+        for entry_path, _, size in entries:
+            if total_size <= self.max_size_bytes:
+                break
+            # the entry just written is kept even if it alone exceeds the limit
+            if entry_path == keep:
+                continue
+            shutil.rmtree(entry_path)
+            total_size -= size
+            logger.info("feature_store_evicted", entry=entry_path.name, size=size)
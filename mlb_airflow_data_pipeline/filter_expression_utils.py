@@ -0,0 +1,152 @@
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel
+
+from mlb_airflow_data_pipeline.zone_map_utils import FILTER_OPERATORS, Filter
+
+# key of filter_conditions_dict holding a list of alternative condition dicts
+OR_KEY = "or"
+IN_OPERATOR = "in"
+
+SQL_OPERATORS = {
+    "==": "=",
+    "!=": "!=",
+    ">": ">",
+    ">=": ">=",
+    "<": "<",
+    "<=": "<=",
+}
+
+
+class FilterExpression(BaseModel):
+    """Rows matching all the (column, operator, value) filters and at least
+    one alternative of every OR group. Missing values never match a filter,
+    as in SQL.
+    """
+
+    filters: list[Filter] = []
+    or_groups: list[list["FilterExpression"]] = []
+
+    def get_columns(self) -> list[str]:
+        """Returns the columns the expression reads, in order of appearance."""
+        columns = {column: None for column, _, _ in self.filters}
+        for or_group in self.or_groups:
+            for alternative in or_group:
+                columns.update(dict.fromkeys(alternative.get_columns()))
+        return list(columns)
+
+    def evaluate(self, input_df: pd.DataFrame) -> np.ndarray:
+        """Evaluates the expression into a boolean mask of the rows, with one
+        vectorized comparison per filter.
+
+        Args:
+            input_df: Data to filter
+
+        Returns:
+            np.ndarray: Whether every row matches the expression
+        """
+        mask = np.ones(len(input_df), dtype=bool)
+        for column, operator_name, value in self.filters:
+            mask &= evaluate_filter(input_df[column], operator_name, value)
+        for or_group in self.or_groups:
+            mask &= np.logical_or.reduce(
+                [alternative.evaluate(input_df) for alternative in or_group]
+            )
+        return mask
+
+    def to_sql(
+        self, column_sql: Callable[[str], str] = lambda column: f'"{column}"'
+    ) -> tuple[str, list[Any]]:
+        """Translates the expression into a SQL condition with placeholders.
+
+        Args:
+            column_sql: Returns the SQL expression of a column, its quoted name
+            by default
+
+        Returns:
+            str: SQL condition, "1 = 1" if the expression has no filter
+            list[Any]: Parameters of the placeholders, in order
+        """
+        conditions = []
+        params: list[Any] = []
+        for column, operator_name, value in self.filters:
+            if operator_name == IN_OPERATOR:
+                placeholders = ", ".join("?" for _ in value)
+                conditions.append(f"{column_sql(column)} IN ({placeholders})")
+                params.extend(value)
+            else:
+                sql_operator = SQL_OPERATORS[operator_name]
+                conditions.append(f"{column_sql(column)} {sql_operator} ?")
+                params.append(value)
+        for or_group in self.or_groups:
+            alternatives = []
+            for alternative in or_group:
+                alternative_sql, alternative_params = alternative.to_sql(column_sql)
+                alternatives.append(f"({alternative_sql})")
+                params.extend(alternative_params)
+            conditions.append(f"({' OR '.join(alternatives)})")
+        return " AND ".join(conditions) or "1 = 1", params
+
+
+def evaluate_filter(series: pd.Series, operator_name: str, value: Any) -> np.ndarray:
+    """Evaluates a single filter on a column.
+
+    Args:
+        series: Column to filter
+        operator_name: One of FILTER_OPERATORS or "in"
+        value: Value compared to, a list of values for "in"
+
+    Returns:
+        np.ndarray: Whether every row matches the filter, False where missing
+    """
+    is_present = series.notna().to_numpy()
+    if operator_name == IN_OPERATOR:
+        return np.asarray(series.isin(value).to_numpy() & is_present, dtype=bool)
+    matches = FILTER_OPERATORS[operator_name](series, value)
+    # missing values of nullable columns fail the filter, like NaN does
+    return np.asarray(
+        matches.to_numpy(dtype=bool, na_value=False) & is_present, dtype=bool
+    )
+
+
+def compile_filter_conditions(conditions_dict: dict) -> FilterExpression:
+    """Compiles filter conditions into a filter expression.
+
+    Every key of the conditions is a column, except "or" whose value is a
+    list of alternative conditions. A column maps either to a minimum, e.g.
+    {"plateAppearances": 100}, or to a dict of operators and values, e.g.
+    {"atBats": {">=": 50, "<": 200}} or {"team_id": {"in": [119, 147]}}.
+
+    Args:
+        conditions_dict: Filter conditions, e.g. filter_conditions_dict
+
+    Returns:
+        FilterExpression: Compiled conditions
+
+    Raises:
+        ValueError: If an operator is not supported or an "or" group is empty
+    """
+    filters: list[Filter] = []
+    or_groups = []
+    for key, condition in conditions_dict.items():
+        if key == OR_KEY:
+            if not condition:
+                raise ValueError("An or group needs at least one alternative")
+            or_groups.append(
+                [compile_filter_conditions(alternative) for alternative in condition]
+            )
+        elif isinstance(condition, dict):
+            for operator_name, value in condition.items():
+                if (
+                    operator_name not in FILTER_OPERATORS
+                    and operator_name != IN_OPERATOR
+                ):
+                    raise ValueError(f"Unsupported filter operator {operator_name}")
+                if operator_name == IN_OPERATOR:
+                    value = list(value)
+                filters.append((key, operator_name, value))
+        else:
+            filters.append((key, ">=", condition))
+    return FilterExpression(filters=filters, or_groups=or_groups)
@@ -0,0 +1,212 @@
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from mlb_airflow_data_pipeline.db_utils import cast_stat_columns
+from mlb_airflow_data_pipeline.statsapi_parameters_script import (
+    DATA_FILE_LOCATION,
+    SEASON_YEAR,
+)
+from mlb_airflow_data_pipeline.zone_map_utils import (
+    FILTER_OPERATORS,
+    Filter,
+    compute_zone_map,
+    read_zone_map,
+    write_zone_map,
+    zone_map_can_match,
+)
+
+PARQUET_FILE_NAME = "part-0.parquet"
+
+# the partition keys are stored in the directory names, not in the files
+PARTITION_SCHEMA = pa.schema(
+    [("league", pa.string()), ("season", pa.int32()), ("date", pa.string())]
+)
+
+# free text columns that repeat across rows and are therefore dictionary-encoded
+DICTIONARY_COLUMNS = ["playername", "name"]
+
+
+def get_parquet_root() -> str:
+    """Returns the root directory of the partitioned Parquet store.
+
+    Returns:
+        str: Path to the Parquet directory inside the data directory
+    """
+    parquet_root = Path(DATA_FILE_LOCATION) / "parquet"
+    parquet_root.mkdir(parents=True, exist_ok=True)
+    return str(parquet_root)
+
+
+def get_partition_path(
+    root: str, table_name: str, league_name: str, season: int, date: str
+) -> Path:
+    """Returns the directory holding a single (league, season, date) partition.
+
+    Args:
+        root: Root directory of the Parquet store
+        table_name: Name of the dataset, e.g. "player_stats"
+        league_name: League of the snapshot
+        season: Season year of the snapshot
+        date: Snapshot date in the YYYY-MM-DD format
+
+    Returns:
+        Path: Partition directory
+    """
+    return (
+        Path(root)
+        / table_name
+        / f"league={league_name}"
+        / f"season={season}"
+        / f"date={date}"
+    )
+
+
+def write_partition(
+    df: pd.DataFrame,
+    table_name: str,
+    league_name: str,
+    date: str,
+    season: int = SEASON_YEAR,
+    root: str | None = None,
+    index_label: str | None = None,
+) -> Path:
+    """Writes a daily snapshot as a single Parquet partition, replacing any
+    previous file for the same partition so that reruns are idempotent.
+
+    Stat columns are cast to numeric types and names are dictionary-encoded.
+    A zone map with the min/max/count of every numeric column is written
+    next to the data file, so that reads can skip the partition.
+
+    Args:
+        df: Snapshot to write
+        table_name: Name of the dataset, e.g. "player_stats"
+        league_name: League of the snapshot
+        date: Snapshot date in the YYYY-MM-DD format
+        season: Season year of the snapshot
+        root: Root directory of the Parquet store, defaults to get_parquet_root()
+        index_label: If given, the DataFrame index is stored under this column name
+
+    Returns:
+        Path: Path to the written Parquet file
+    """
+    if root is None:
+        root = get_parquet_root()
+
+    if index_label is not None:
+        df = df.rename_axis(index_label).reset_index()
+
+    # the partition keys are recovered from the directory structure on read
+    partition_keys = [col for col in PARTITION_SCHEMA.names if col in df.columns]
+    typed_df = cast_stat_columns(df.drop(columns=partition_keys))
+
+    partition_path = get_partition_path(root, table_name, league_name, season, date)
+    partition_path.mkdir(parents=True, exist_ok=True)
+    file_path = partition_path / PARQUET_FILE_NAME
+
+    table = pa.Table.from_pandas(typed_df, preserve_index=False)
+    pq.write_table(
+        table,
+        file_path,
+        use_dictionary=[col for col in DICTIONARY_COLUMNS if col in typed_df],
+        compression="zstd",
+    )
+    write_zone_map(compute_zone_map(typed_df), partition_path)
+    return file_path
+
+
+def read_partitions(
+    table_name: str,
+    league_name: str | None = None,
+    season: int | None = None,
+    dates: list[str] | None = None,
+    columns: list[str] | None = None,
+    filters: list[Filter] | None = None,
+    root: str | None = None,
+) -> pd.DataFrame:
+    """Reads snapshots from the Parquet store. Partitions not matching the
+    league, season and dates are pruned from the directory structure, and
+    partitions whose zone maps show that no row can match the filters are
+    skipped. Only the requested columns are read from the remaining files.
+
+    Args:
+        table_name: Name of the dataset, e.g. "player_stats"
+        league_name: If given, only this league is read
+        season: If given, only this season is read
+        dates: If given, only these snapshot dates are read
+        columns: If given, only these columns (plus the partition keys) are read
+        filters: If given, only the rows matching all these
+            (column, operator, value) filters are returned
+        root: Root directory of the Parquet store, defaults to get_parquet_root()
+
+    Returns:
+        pd.DataFrame: Concatenated snapshots, with the league, season and date columns
+    """
+    if root is None:
+        root = get_parquet_root()
+
+    table_path = Path(root) / table_name
+    if not table_path.exists():
+        raise FileNotFoundError(f"No Parquet dataset found for table {table_name}")
+
+    partitioning = ds.partitioning(PARTITION_SCHEMA, flavor="hive")
+    dataset = ds.dataset(table_path, format="parquet", partitioning=partitioning)
+
+    partition_filter = None
+    conditions = []
+    if league_name is not None:
+        conditions.append(ds.field("league") == league_name)
+    if season is not None:
+        conditions.append(ds.field("season") == season)
+    if dates is not None:
+        conditions.append(ds.field("date").isin(dates))
+    for condition in conditions:
+        partition_filter = (
+            condition if partition_filter is None else partition_filter & condition
+        )
+
+    if columns is not None:
+        columns = [col for col in columns if col not in PARTITION_SCHEMA.names]
+        columns = columns + PARTITION_SCHEMA.names
+
+    fragments = list(dataset.get_fragments(filter=partition_filter))
+    if filters:
+        fragments = [
+            fragment
+            for fragment in fragments
+            if zone_map_can_match(read_zone_map(Path(fragment.path).parent), filters)
+        ]
+        for column, operator_name, value in filters:
+            condition = FILTER_OPERATORS[operator_name](ds.field(column), value)
+            partition_filter = (
+                condition if partition_filter is None else partition_filter & condition
+            )
+
+    # the same stat can be stored as an integer on one day and as a float
+    # on another (e.g. once a missing value shows up), so the schemas of the
+    # selected files are unified before scanning
+    if fragments:
+        schema = pa.unify_schemas(
+            [fragment.physical_schema for fragment in fragments] + [PARTITION_SCHEMA],
+            promote_options="permissive",
+        )
+        dataset = ds.dataset(
+            [fragment.path for fragment in fragments],
+            schema=schema,
+            format="parquet",
+            partitioning=partitioning,
+            partition_base_dir=str(table_path),
+        )
+    elif filters:
+        # every partition was skipped, only the schema is needed
+        return (
+            dataset.schema.empty_table()
+            .select(columns or dataset.schema.names)
+            .to_pandas()
+        )
+
+    table = dataset.to_table(columns=columns, filter=partition_filter)
+    return table.to_pandas()
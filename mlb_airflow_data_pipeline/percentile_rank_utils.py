@@ -0,0 +1,128 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pandas.api.types as pdtypes
+
+from mlb_airflow_data_pipeline.logging_setup import get_logger
+
+logger = get_logger("percentile_rank_utils")
+
+PERCENTILE_RANK_SUFFIX = "_percentile_rank"
+
+
+def get_percentile_ranks_path(output_path: str) -> str:
+    """Returns the path of the percentile ranks side table of an output file,
+    e.g. national_league_2023-06-01_batter_stats_df_percentile_ranks.csv.
+    """
+    path = Path(output_path)
+    return str(path.with_name(f"{path.stem}_percentile_ranks{path.suffix}"))
+
+
+def get_stat_columns(input_df: pd.DataFrame) -> list[str]:
+    """Returns the numeric stat columns of a DataFrame, leaving out player
+    information such as names and team ids.
+
+    Args:
+        input_df: Treated player stats
+
+    Returns:
+        list[str]: Names of the numeric columns
+    """
+    return [
+        col
+        for col in input_df.columns
+        if col != "team_id"
+        and pdtypes.is_numeric_dtype(input_df[col])
+        and not pdtypes.is_bool_dtype(input_df[col])
+    ]
+
+
+def compute_percentile_ranks(
+    input_df: pd.DataFrame, stat_columns: list[str] | None = None
+) -> pd.DataFrame:
+    """Computes the percentile rank of every player in every stat with a
+    single argsort over the stat matrix.
+
+    Ranks are in (0, 1], higher values ranking higher, and tied values share
+    their average rank, matching pandas' rank(pct=True). Missing values are
+    left unranked.
+
+    Args:
+        input_df: Treated player stats
+        stat_columns: Columns to rank, every numeric stat column by default
+
+    Returns:
+        pd.DataFrame: <stat>_percentile_rank columns, with the index of input_df
+    """
+    if stat_columns is None:
+        stat_columns = get_stat_columns(input_df)
+    values = input_df[stat_columns].to_numpy(dtype=float, na_value=np.nan)
+    rows_count, columns_count = values.shape
+
+    # missing values are sorted last in every column
+    order = np.argsort(values, axis=0, kind="stable")
+    sorted_values = np.take_along_axis(values, order, axis=0)
+    positions = np.broadcast_to(
+        np.arange(rows_count)[:, np.newaxis], (rows_count, columns_count)
+    )
+
+    # first and last sorted positions of the run of ties of every value
+    is_run_start = np.ones_like(sorted_values, dtype=bool)
+    is_run_start[1:] = sorted_values[1:] != sorted_values[:-1]
+    is_run_end = np.ones_like(sorted_values, dtype=bool)
+    is_run_end[:-1] = is_run_start[1:]
+    run_starts = np.maximum.accumulate(np.where(is_run_start, positions, 0), axis=0)
+    run_ends = np.minimum.accumulate(
+        np.where(is_run_end, positions, rows_count)[::-1], axis=0
+    )[::-1]
+
+    present_count = np.count_nonzero(~np.isnan(values), axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sorted_ranks = ((run_starts + run_ends) / 2 + 1) / present_count
+    sorted_ranks[np.isnan(sorted_values)] = np.nan
+
+    percentile_ranks = np.empty_like(sorted_ranks)
+    np.put_along_axis(percentile_ranks, order, sorted_ranks, axis=0)
+
+    logger.debug(
+        "percentile_ranks_computed",
+        stats_count=columns_count,
+        players_count=rows_count,
+    )
+    return pd.DataFrame(
+        percentile_ranks,
+        index=input_df.index,
+        columns=[col + PERCENTILE_RANK_SUFFIX for col in stat_columns],
+    )
+
+
+def get_leaderboard(
+    input_df: pd.DataFrame,
+    percentile_ranks_df: pd.DataFrame,
+    stat_name: str,
+    top_n: int = 10,
+    ascending: bool = False,
+) -> pd.DataFrame:
+    """Returns the top (or bottom) players in a stat from its precomputed
+    percentile ranks, selecting them in linear time and only sorting them.
+
+    Args:
+        input_df: Treated player stats
+        percentile_ranks_df: As returned by compute_percentile_ranks, with the
+        rows of input_df in the same order
+        stat_name: Stat to rank the players by
+        top_n: Number of players
+        ascending: Whether the players with the lowest values come first
+
+    Returns:
+        pd.DataFrame: Rows of input_df of the top players, in order
+    """
+    ranks = percentile_ranks_df[stat_name + PERCENTILE_RANK_SUFFIX].to_numpy()
+    # unranked players come last either way
+    keys = np.where(np.isnan(ranks), np.inf, ranks if ascending else -ranks)
+    top_n = min(top_n, len(keys))
+    if top_n == 0:
+        return input_df.iloc[:0]
+    candidates = np.argpartition(keys, top_n - 1)[:top_n]
+    return input_df.iloc[candidates[np.argsort(keys[candidates], kind="stable")]]
@@ -0,0 +1,260 @@
+from typing import Mapping
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+from pydantic import BaseModel
+
+from mlb_airflow_data_pipeline.db_utils import STAT_PLACEHOLDERS
+
+OUTS_PER_INNING = 3
+INNINGS_PER_GAME = 9
+
+# counting stats read as innings pitched are converted to outs, so that every
+# rate per inning is exact
+INNINGS_PITCHED = "inningsPitched"
+
+
+class RateStat(BaseModel):
+    """A rate stat recomputed from counting stats as
+    scale * sum(numerator weights * stats) / sum(denominator weights * stats).
+    """
+
+    numerator: dict[str, float]
+    denominator: dict[str, float]
+    scale: float = 1.0
+
+
+RATE_STAT_CATALOG: dict[str, RateStat] = {
+    # batting
+    "avg": RateStat(numerator={"hits": 1}, denominator={"atBats": 1}),
+    "obp": RateStat(
+        numerator={"hits": 1, "baseOnBalls": 1, "hitByPitch": 1},
+        denominator={"atBats": 1, "baseOnBalls": 1, "hitByPitch": 1, "sacFlies": 1},
+    ),
+    "slg": RateStat(numerator={"totalBases": 1}, denominator={"atBats": 1}),
+    "babip": RateStat(
+        numerator={"hits": 1, "homeRuns": -1},
+        denominator={"atBats": 1, "strikeOuts": -1, "homeRuns": -1, "sacFlies": 1},
+    ),
+    "stolenBasePercentage": RateStat(
+        numerator={"stolenBases": 1},
+        denominator={"stolenBases": 1, "caughtStealing": 1},
+    ),
+    # pitching, where hits, walks, strikeouts and home runs are the ones allowed
+    "era": RateStat(
+        numerator={"earnedRuns": 1},
+        denominator={INNINGS_PITCHED: 1},
+        scale=INNINGS_PER_GAME * OUTS_PER_INNING,
+    ),
+    "whip": RateStat(
+        numerator={"hits": 1, "baseOnBalls": 1},
+        denominator={INNINGS_PITCHED: 1},
+        scale=OUTS_PER_INNING,
+    ),
+    "strikeoutsPer9Inn": RateStat(
+        numerator={"strikeOuts": 1},
+        denominator={INNINGS_PITCHED: 1},
+        scale=INNINGS_PER_GAME * OUTS_PER_INNING,
+    ),
+    "walksPer9Inn": RateStat(
+        numerator={"baseOnBalls": 1},
+        denominator={INNINGS_PITCHED: 1},
+        scale=INNINGS_PER_GAME * OUTS_PER_INNING,
+    ),
+    "hitsPer9Inn": RateStat(
+        numerator={"hits": 1},
+        denominator={INNINGS_PITCHED: 1},
+        scale=INNINGS_PER_GAME * OUTS_PER_INNING,
+    ),
+    "homeRunsPer9": RateStat(
+        numerator={"homeRuns": 1},
+        denominator={INNINGS_PITCHED: 1},
+        scale=INNINGS_PER_GAME * OUTS_PER_INNING,
+    ),
+    "pitchesPerInning": RateStat(
+        numerator={"numberOfPitches": 1},
+        denominator={INNINGS_PITCHED: 1},
+        scale=OUTS_PER_INNING,
+    ),
+    "strikePercentage": RateStat(
+        numerator={"strikes": 1}, denominator={"numberOfPitches": 1}
+    ),
+    "strikeoutWalkRatio": RateStat(
+        numerator={"strikeOuts": 1}, denominator={"baseOnBalls": 1}
+    ),
+    # fielding
+    "fielding": RateStat(
+        numerator={"putOuts": 1, "assists": 1},
+        denominator={"putOuts": 1, "assists": 1, "errors": 1},
+    ),
+}
+
+# rate stats summing other rate stats of the catalog
+DERIVED_RATE_STATS: dict[str, list[str]] = {"ops": ["obp", "slg"]}
+
+
+def _to_float_array(values: npt.ArrayLike) -> np.ndarray:
+    array = np.asarray(values)
+    if array.dtype.kind in "biuf":
+        return array.astype(float)
+    # stats read as text, possibly with the statsapi placeholders
+    parsed_values = pd.to_numeric(
+        pd.Series(array.ravel()).replace(STAT_PLACEHOLDERS, None), errors="coerce"
+    )
+    float_array: np.ndarray = parsed_values.to_numpy(
+        dtype=float, na_value=np.nan
+    ).reshape(array.shape)
+    return float_array
+
+
+def innings_to_outs(innings_pitched: npt.ArrayLike) -> np.ndarray:
+    """Parses innings pitched, where "123.1" means 123 innings and one out,
+    into the exact number of outs.
+
+    Args:
+        innings_pitched: Innings pitched of any shape, as numbers or text
+
+    Returns:
+        np.ndarray: Outs, NaN where the innings are missing or malformed
+    """
+    innings = _to_float_array(innings_pitched)
+    whole_innings = np.floor(innings)
+    extra_outs = np.rint((innings - whole_innings) * 10)
+    is_valid = np.isin(extra_outs, [0, 1, 2])
+    return np.where(is_valid, whole_innings * OUTS_PER_INNING + extra_outs, np.nan)
+
+
+def outs_to_innings(outs: npt.ArrayLike) -> np.ndarray:
+    """Converts outs into true innings, e.g. 370 outs into 123.33 innings.
+
+    Args:
+        outs: Outs of any shape
+
+    Returns:
+        np.ndarray: Innings as fractional numbers
+    """
+    return _to_float_array(outs) / OUTS_PER_INNING
+
+
+def parse_innings_pitched(innings_pitched: npt.ArrayLike) -> np.ndarray:
+    """Parses innings pitched into true innings, e.g. "123.1" into 123.33.
+
+    Args:
+        innings_pitched: Innings pitched of any shape, as numbers or text
+
+    Returns:
+        np.ndarray: Innings as fractional numbers
+    """
+    return outs_to_innings(innings_to_outs(innings_pitched))
+
+
+def safe_divide(numerator: npt.ArrayLike, denominator: npt.ArrayLike) -> np.ndarray:
+    """Divides element-wise, returning NaN instead of infinities where the
+    denominator is zero, as statsapi does with its placeholders.
+
+    Args:
+        numerator: Dividend of any shape
+        denominator: Divisor, broadcast against the numerator
+
+    Returns:
+        np.ndarray: Quotient, NaN where the denominator is zero or missing
+    """
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator == 0, np.nan, numerator / denominator)
+
+
+def get_rate_stat_inputs(rate_stat_names: list[str]) -> list[str]:
+    """Returns the counting stats needed to recompute rate stats.
+
+    Args:
+        rate_stat_names: Rate stats of the catalog
+
+    Returns:
+        list[str]: Counting stats, in the order they are first needed
+
+    Raises:
+        ValueError: If a rate stat is not in the catalog
+    """
+    input_names: dict[str, None] = {}
+    for rate_stat_name in rate_stat_names:
+        if rate_stat_name in DERIVED_RATE_STATS:
+            input_names.update(
+                dict.fromkeys(get_rate_stat_inputs(DERIVED_RATE_STATS[rate_stat_name]))
+            )
+            continue
+        if rate_stat_name not in RATE_STAT_CATALOG:
+            raise ValueError(f"Rate stat {rate_stat_name} is not in the catalog")
+        rate_stat = RATE_STAT_CATALOG[rate_stat_name]
+        input_names.update(dict.fromkeys(rate_stat.numerator))
+        input_names.update(dict.fromkeys(rate_stat.denominator))
+    return list(input_names)
+
+
+def compute_rate_stats(
+    counting_stats: Mapping[str, npt.ArrayLike], rate_stat_names: list[str]
+) -> dict[str, np.ndarray]:
+    """Recomputes rate stats from counting stats, e.g. to replace the rounded
+    rates returned by statsapi. Innings pitched are parsed into outs first.
+
+    Args:
+        counting_stats: Arrays of the same shape, by counting stat name
+        rate_stat_names: Rate stats of the catalog to compute
+
+    Returns:
+        dict[str, np.ndarray]: Arrays of the rate stats, by name
+
+    Raises:
+        ValueError: If a rate stat is not in the catalog or a counting stat
+        it needs is missing
+    """
+    input_names = get_rate_stat_inputs(rate_stat_names)
+    missing_names = [name for name in input_names if name not in counting_stats]
+    if missing_names:
+        raise ValueError(f"Missing counting stats {missing_names}")
+    values = {
+        name: innings_to_outs(counting_stats[name])
+        if name == INNINGS_PITCHED
+        else _to_float_array(counting_stats[name])
+        for name in input_names
+    }
+
+    def compute(rate_stat_name: str) -> np.ndarray:
+        if rate_stat_name in DERIVED_RATE_STATS:
+            return sum(map(compute, DERIVED_RATE_STATS[rate_stat_name]))  # type: ignore
+        rate_stat = RATE_STAT_CATALOG[rate_stat_name]
+        numerator = sum(
+            weight * values[name] for name, weight in rate_stat.numerator.items()
+        )
+        denominator = sum(
+            weight * values[name] for name, weight in rate_stat.denominator.items()
+        )
+        return rate_stat.scale * safe_divide(numerator, denominator)
+
+    return {
+        rate_stat_name: compute(rate_stat_name) for rate_stat_name in rate_stat_names
+    }
+
+
+def recompute_rate_stats(
+    input_df: pd.DataFrame, rate_stat_names: list[str]
+) -> pd.DataFrame:
+    """Recomputes rate stats from the counting stats of a DataFrame.
+
+    Args:
+        input_df: Player stats holding the counting stats
+        rate_stat_names: Rate stats of the catalog to compute
+
+    Returns:
+        pd.DataFrame: Rate stats only, with the index of input_df
+    """
+    rate_stats = compute_rate_stats(
+        {
+            name: input_df[name].to_numpy()
+            for name in get_rate_stat_inputs(rate_stat_names)
+        },
+        rate_stat_names,
+    )
+    return pd.DataFrame(rate_stats, index=input_df.index)
@@ -0,0 +1,457 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from mlb_airflow_data_pipeline.db_utils import cast_stat_columns, create_table
+from mlb_airflow_data_pipeline.logging_setup import get_logger
+from mlb_airflow_data_pipeline.parquet_utils import read_partitions
+from mlb_airflow_data_pipeline.snapshot_utils import SnapshotStore
+from mlb_airflow_data_pipeline.statsapi_feature_utils import compute_ratio_features
+
+logger = get_logger("rolling_window_utils")
+
+CUMULATIVE_TABLE_NAME = "rolling_cumulative_stats"
+DELTAS_TABLE_NAME = "rolling_daily_deltas"
+WINDOW_SUMS_TABLE_NAME = "rolling_window_sums"
+WINDOW_DATES_TABLE_NAME = "rolling_window_dates"
+
+KEY_COLUMN = "player_id"
+
+# counting stats, whose daily increments can be summed over a window
+ROLLING_WINDOW_STATS = [
+    "gamesPlayed",
+    "plateAppearances",
+    "atBats",
+    "runs",
+    "hits",
+    "doubles",
+    "triples",
+    "homeRuns",
+    "rbi",
+    "baseOnBalls",
+    "strikeOuts",
+    "stolenBases",
+    "totalBases",
+]
+
+ROLLING_WINDOW_DAYS = [7, 14, 30]
+
+
+def _stat_columns_sql(stats: list[str]) -> str:
+    return ", ".join(f'"{stat}" REAL NOT NULL' for stat in stats)
+
+
+def _shift_date(date: str, days: int) -> str:
+    shifted_date: str = (pd.Timestamp(date) - pd.Timedelta(days=days)).strftime(
+        "%Y-%m-%d"
+    )
+    return shifted_date
+
+
+class RollingWindowAggregator:
+    """Incrementally maintained sums of player stats over the last days.
+
+    Each day, the new cumulative snapshot is diffed against the last one of
+    every player to get the daily increments. The sum of each window is
+    then updated by adding the increments of the day and subtracting the
+    increments that left the window, which are kept only as long as the
+    longest window. A day's update is thus proportional to the number of
+    players, whatever the length of the history.
+
+    A window of n days ending on a date covers that date and the n - 1
+    previous ones. Snapshots must be processed in date order: the first one
+    of a league is only a baseline, and dates already processed are skipped.
+    """
+
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        stats: list[str] = ROLLING_WINDOW_STATS,
+        window_days: list[int] = ROLLING_WINDOW_DAYS,
+    ):
+        self.conn = conn
+        self.stats = list(stats)
+        self.window_days = sorted(window_days)
+        for create_table_sql in [
+            f"""
+            CREATE TABLE IF NOT EXISTS {CUMULATIVE_TABLE_NAME} (
+                league TEXT NOT NULL,
+                {KEY_COLUMN} INTEGER NOT NULL,
+                {_stat_columns_sql(self.stats)},
+                PRIMARY KEY (league, {KEY_COLUMN})
+            ) WITHOUT ROWID;
+            """,
+            f"""
+            CREATE TABLE IF NOT EXISTS {DELTAS_TABLE_NAME} (
+                league TEXT NOT NULL,
+                date TEXT NOT NULL,
+                {KEY_COLUMN} INTEGER NOT NULL,
+                {_stat_columns_sql(self.stats)},
+                PRIMARY KEY (league, date, {KEY_COLUMN})
+            ) WITHOUT ROWID;
+            """,
+            f"""
+            CREATE TABLE IF NOT EXISTS {WINDOW_SUMS_TABLE_NAME} (
+                league TEXT NOT NULL,
+                window_days INTEGER NOT NULL,
+                {KEY_COLUMN} INTEGER NOT NULL,
+                {_stat_columns_sql(self.stats)},
+                PRIMARY KEY (league, window_days, {KEY_COLUMN})
+            ) WITHOUT ROWID;
+            """,
+            f"""
+            CREATE TABLE IF NOT EXISTS {WINDOW_DATES_TABLE_NAME} (
+                league TEXT NOT NULL,
+                date TEXT NOT NULL,
+                players_changed INTEGER NOT NULL,
+                PRIMARY KEY (league, date)
+            );
+            """,
+        ]:
+            create_table(self.conn, create_table_sql)
+
+    def update(self, snapshot_df: pd.DataFrame, league_name: str, date: str) -> int:
+        """Updates the window sums with the increments of a new snapshot.
+
+        Args:
+            snapshot_df: Full cumulative snapshot, indexed by player id
+            league_name: League of the snapshot
+            date: Snapshot date in the YYYY-MM-DD format
+
+        Returns:
+            int: Number of players whose stats changed since the previous snapshot
+
+        Raises:
+            sqlite3.Error: If the update fails, in which case nothing is written
+        """
+        last_date = self.get_last_date(league_name)
+        if last_date is not None and date <= last_date:
+            logger.warning(
+                "rolling_window_date_skipped",
+                league=league_name,
+                date=date,
+                last_date=last_date,
+            )
+            return 0
+
+        current_df = cast_stat_columns(
+            snapshot_df[~snapshot_df.index.duplicated(keep="first")]
+        )
+        current_df = (
+            current_df.reindex(columns=self.stats)
+            .apply(pd.to_numeric, errors="coerce")
+            .fillna(0.0)
+            .astype(float)
+            .rename_axis(KEY_COLUMN)
+        )
+
+        if last_date is None:
+            # the first snapshot is the baseline the next ones are diffed against
+            deltas_df = current_df.iloc[0:0]
+        else:
+            previous_df = self._read_stats(
+                f"SELECT * FROM {CUMULATIVE_TABLE_NAME} WHERE league = ?",
+                (league_name,),
+            )
+            deltas_df = current_df.sub(
+                previous_df.reindex(current_df.index).fillna(0.0)
+            )
+            deltas_df = deltas_df[(deltas_df != 0).any(axis=1)]
+
+        try:
+            self._insert_stats(DELTAS_TABLE_NAME, deltas_df, league_name, date=date)
+            for window_days in self.window_days:
+                self._update_window(
+                    league_name, window_days, deltas_df, last_date, date
+                )
+            # the players missing from the snapshot, e.g. on the injured list,
+            # keep their baseline, so that their return is not booked as a
+            # whole season of increments
+            self._insert_stats(
+                CUMULATIVE_TABLE_NAME, current_df, league_name, replace=True
+            )
+            # increments older than the longest window are never needed again
+            self.conn.execute(
+                f"DELETE FROM {DELTAS_TABLE_NAME} WHERE league = ? AND date <= ?",
+                (league_name, _shift_date(date, self.window_days[-1])),
+            )
+            self.conn.execute(
+                f"INSERT INTO {WINDOW_DATES_TABLE_NAME} VALUES (?, ?, ?)",
+                (league_name, date, len(deltas_df)),
+            )
+            self.conn.commit()
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            raise sqlite3.Error(f"Failed to update rolling windows: {e}")
+
+        logger.info(
+            "rolling_windows_updated",
+            league=league_name,
+            date=date,
+            players_changed=len(deltas_df),
+        )
+        return len(deltas_df)
+
+    def update_changed(
+        self, snapshot_store: SnapshotStore, league_name: str, date: str
+    ) -> int:
+        """Updates the window sums with a snapshot already in the snapshot
+        store, reading only the players whose stats changed since the last
+        date processed. The others have no increment, and update keeps the
+        baseline of the players missing from what it is given, so that a
+        quiet day only reads and diffs a few rows.
+
+        Args:
+            snapshot_store: Snapshot store holding the snapshot of the date
+            league_name: League of the snapshot
+            date: Snapshot date in the YYYY-MM-DD format
+
+        Returns:
+            int: Number of players whose stats changed since the previous snapshot
+        """
+        last_date = self.get_last_date(league_name)
+        if last_date is None:
+            snapshot_df = snapshot_store.read_snapshot(league_name, date)
+        else:
+            snapshot_df = snapshot_store.read_changed_stats(
+                league_name, last_date, date
+            )
+        return self.update(snapshot_df, league_name, date)
+
+    def read_window(self, league_name: str, window_days: int) -> pd.DataFrame:
+        """Reads the stats of the players over a window, with every stat also
+        normalized by the plate appearances of the window.
+
+        Args:
+            league_name: League of the snapshots
+            window_days: Length of the window
+
+        Returns:
+            pd.DataFrame: Window sums indexed by player id, with a date
+            column holding the last day of the window
+
+        Raises:
+            ValueError: If the window is not maintained by the aggregator
+        """
+        if window_days not in self.window_days:
+            raise ValueError(f"No rolling window of {window_days} days")
+
+        window_df = self._read_stats(
+            f"""
+            SELECT * FROM {WINDOW_SUMS_TABLE_NAME}
+            WHERE league = ? AND window_days = ?
+            ORDER BY {KEY_COLUMN}
+            """,
+            (league_name, window_days),
+        )
+        if "plateAppearances" in self.stats:
+            window_df = pd.concat(
+                [
+                    window_df,
+                    compute_ratio_features(
+                        window_df,
+                        [stat for stat in self.stats if stat != "plateAppearances"],
+                        "plateAppearances",
+                        "perplateAppearance",
+                    ),
+                ],
+                axis=1,
+            )
+        window_df.index.name = None
+        window_df["date"] = self.get_last_date(league_name)
+        return window_df
+
+    def get_last_date(self, league_name: str) -> str | None:
+        """Returns the date of the last snapshot processed for a league.
+
+        Args:
+            league_name: League of the snapshots
+
+        Returns:
+            str | None: Date in the YYYY-MM-DD format, None if there is none
+        """
+        cursor = self.conn.execute(
+            f"SELECT MAX(date) FROM {WINDOW_DATES_TABLE_NAME} WHERE league = ?",
+            (league_name,),
+        )
+        last_date: str | None = cursor.fetchone()[0]
+        return last_date
+
+    def _update_window(
+        self,
+        league_name: str,
+        window_days: int,
+        deltas_df: pd.DataFrame,
+        last_date: str | None,
+        date: str,
+    ) -> None:
+        if last_date is None:
+            return
+        # increments inside the window ending on last_date but not inside
+        # the one ending on date, several days of them if dates were skipped
+        stat_sums = ", ".join(f'SUM("{stat}") AS "{stat}"' for stat in self.stats)
+        leaving_df = self._read_stats(
+            f"""
+            SELECT {KEY_COLUMN}, {stat_sums}
+            FROM {DELTAS_TABLE_NAME}
+            WHERE league = ? AND date > ? AND date <= ?
+            GROUP BY {KEY_COLUMN}
+            """,
+            (
+                league_name,
+                _shift_date(last_date, window_days),
+                _shift_date(date, window_days),
+            ),
+        )
+        changes_df = deltas_df.sub(leaving_df, fill_value=0.0)
+        changes_df = changes_df[(changes_df != 0).any(axis=1)]
+
+        stat_columns = ", ".join(f'"{stat}"' for stat in self.stats)
+        stat_updates = ", ".join(
+            f'"{stat}" = "{stat}" + excluded."{stat}"' for stat in self.stats
+        )
+        self.conn.executemany(
+            f"""
+            INSERT INTO {WINDOW_SUMS_TABLE_NAME}
+            (league, window_days, {KEY_COLUMN}, {stat_columns})
+            VALUES (?, ?, ?, {", ".join("?" for _ in self.stats)})
+            ON CONFLICT (league, window_days, {KEY_COLUMN}) DO UPDATE SET
+            {stat_updates}
+            """,
+            (
+                (league_name, window_days, int(player_id), *values)
+                for player_id, values in zip(
+                    changes_df.index, changes_df.itertuples(index=False, name=None)
+                )
+            ),
+        )
+
+    def _insert_stats(
+        self,
+        table_name: str,
+        stats_df: pd.DataFrame,
+        league_name: str,
+        date: str | None = None,
+        replace: bool = False,
+    ) -> None:
+        records_df = stats_df.reset_index()
+        if date is not None:
+            records_df.insert(0, "date", date)
+        records_df.insert(0, "league", league_name)
+        columns = ", ".join(f'"{col}"' for col in records_df.columns)
+        self.conn.executemany(
+            f"""
+            INSERT {"OR REPLACE " if replace else ""}INTO {table_name} ({columns})
+            VALUES ({", ".join("?" for _ in records_df.columns)})
+            """,
+            records_df.astype({KEY_COLUMN: "int64"}).itertuples(index=False, name=None),
+        )
+
+    def _read_stats(self, query: str, params: tuple) -> pd.DataFrame:
+        stats_df = pd.read_sql_query(query, self.conn, params=params)
+        return stats_df.set_index(KEY_COLUMN)[self.stats].astype(float)
+
+
+def compute_daily_increments(
+    snapshots_df: pd.DataFrame, stats: list[str] = ROLLING_WINDOW_STATS
+) -> pd.DataFrame:
+    """Computes the increments of every player's cumulative stats between
+    consecutive snapshots, in a single sort and diff over all of them.
+
+    The increments of a player are taken against the player's previous
+    snapshot, whatever the number of days in between and whether the player
+    changed teams. The first snapshot of a player is taken against zero.
+
+    Args:
+        snapshots_df: Cumulative snapshots, with player_id, date and team_id
+            columns and one row per player and date
+        stats: Counting stats whose increments are computed
+
+    Returns:
+        pd.DataFrame: One row per player and snapshot date, with the
+        previous date of the player, the days elapsed since, the team, whether
+        the player changed teams and the increment of every stat
+    """
+    stats = [stat for stat in stats if stat in snapshots_df.columns]
+    sorted_df = (
+        cast_stat_columns(snapshots_df[[KEY_COLUMN, "date", "team_id"] + stats])
+        .sort_values([KEY_COLUMN, "date"], kind="stable")
+        .drop_duplicates([KEY_COLUMN, "date"], keep="last")
+        .reset_index(drop=True)
+    )
+    # a stat missing on one day keeps its previous cumulative value
+    cumulative_values = (
+        sorted_df.groupby(KEY_COLUMN)[stats]
+        .ffill()
+        .apply(pd.to_numeric, errors="coerce")
+        .fillna(0.0)
+        .to_numpy(dtype=float)
+    )
+
+    player_ids = sorted_df[KEY_COLUMN].to_numpy()
+    is_first = np.ones(len(sorted_df), dtype=bool)
+    is_first[1:] = player_ids[1:] != player_ids[:-1]
+
+    increments = cumulative_values.copy()
+    increments[1:] -= cumulative_values[:-1]
+    increments[is_first] = cumulative_values[is_first]
+
+    dates = pd.to_datetime(sorted_df["date"])
+    previous_dates = dates.shift(1).where(~is_first)
+    team_ids = sorted_df["team_id"]
+    previous_team_ids = team_ids.shift(1).where(~is_first)
+
+    increments_df = pd.concat(
+        [
+            pd.DataFrame(
+                {
+                    KEY_COLUMN: player_ids,
+                    "date": sorted_df["date"],
+                    "previous_date": previous_dates.dt.strftime("%Y-%m-%d"),
+                    "days_elapsed": (dates - previous_dates).dt.days.astype("Int64"),
+                    "team_id": team_ids,
+                    "is_team_change": (
+                        previous_team_ids.notna() & (previous_team_ids != team_ids)
+                    ),
+                }
+            ),
+            pd.DataFrame(increments, columns=stats),
+        ],
+        axis=1,
+    )
+    logger.debug(
+        "daily_increments_computed",
+        players_count=int(is_first.sum()),
+        rows_count=len(increments_df),
+    )
+    return increments_df
+
+
+def read_season_increments(
+    league_name: str,
+    season: int,
+    stats: list[str] = ROLLING_WINDOW_STATS,
+    root: str | None = None,
+) -> pd.DataFrame:
+    """Rebuilds the daily increments of a whole season from the player stats
+    snapshots of the Parquet store, written by the extraction run with
+    --write_parquet.
+
+    Args:
+        league_name: League of the snapshots
+        season: Season year of the snapshots
+        stats: Counting stats whose increments are computed
+        root: Root directory of the Parquet store, defaults to get_parquet_root()
+
+    Returns:
+        pd.DataFrame: Increments as returned by compute_daily_increments
+    """
+    snapshots_df = read_partitions(
+        "player_stats",
+        league_name=league_name,
+        season=season,
+        columns=[KEY_COLUMN, "team_id"] + stats,
+        root=root,
+    )
+    return compute_daily_increments(snapshots_df, stats)
@@ -0,0 +1,545 @@
+import sqlite3
+from bisect import bisect_right
+
+import numpy as np
+import pandas as pd
+
+from mlb_airflow_data_pipeline.db_utils import (
+    cast_stat_columns,
+    create_table,
+    insert_dataframe,
+)
+from mlb_airflow_data_pipeline.logging_setup import get_logger
+
+logger = get_logger("snapshot_utils")
+
+SNAPSHOT_TABLE_NAME = "player_stats_snapshots"
+SNAPSHOT_DATES_TABLE_NAME = "snapshot_dates"
+
+# columns added by the snapshot store on top of the extracted stats
+KEY_COLUMN = "player_id"
+SNAPSHOT_METADATA_COLUMNS = ["league", "date", KEY_COLUMN, "row_hash", "is_deleted"]
+
+# ways the stat vector of a player can change between two runs
+CHANGE_TYPE_NEW = "new"
+CHANGE_TYPE_CHANGED = "changed"
+CHANGE_TYPE_REMOVED = "removed"
+
+# hashed in place of a missing text value
+MISSING_VALUE_TOKEN = "<NA>"
+
+CREATE_SNAPSHOT_DATES_TABLE_SQL = f"""
+    CREATE TABLE IF NOT EXISTS {SNAPSHOT_DATES_TABLE_NAME} (
+        table_name TEXT NOT NULL,
+        league TEXT NOT NULL,
+        date TEXT NOT NULL,
+        rows_total INTEGER NOT NULL,
+        rows_written INTEGER NOT NULL,
+        PRIMARY KEY (table_name, league, date)
+    );
+"""
+
+
+def normalize_stat_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Types the stats with cast_stat_columns and casts every numeric column
+    to float64, so that the same values hash the same whether they arrive as
+    text, integers or floats, e.g. integers that pandas infers as floats
+    because of a single missing value. Missing text values become a fixed
+    token.
+
+    Args:
+        df: DataFrame containing the stats
+
+    Returns:
+        pd.DataFrame: DataFrame ready to be hashed, with the same index
+    """
+    typed_df = cast_stat_columns(df)
+    return pd.DataFrame(
+        {
+            column: (
+                values.astype("float64")
+                if pd.api.types.is_numeric_dtype(values)
+                else values.astype("string").fillna(MISSING_VALUE_TOKEN)
+            )
+            for column, values in typed_df.items()
+        },
+        index=typed_df.index,
+    )
+
+
+def compute_row_hashes(df: pd.DataFrame, columns: list[str]) -> pd.Series:
+    """Computes a stable hash of each row's stat vector, normalized with
+    normalize_stat_columns.
+
+    Args:
+        df: DataFrame containing the stats
+        columns: Columns making up the stat vector
+
+    Returns:
+        pd.Series: Hash of each row, as a hexadecimal string
+    """
+    hashes = pd.util.hash_pandas_object(
+        normalize_stat_columns(df[sorted(columns)]), index=False
+    )
+    return hashes.map(lambda row_hash: f"{row_hash:016x}")
+
+
+class SnapshotDateIndex:
+    """Sorted index of the dates for which a snapshot is available."""
+
+    def __init__(self, dates: list[str]):
+        self.dates = sorted(dates)
+
+    def get_nearest_date(self, date: str) -> str | None:
+        """Returns the latest available date on or before the given date,
+        found by binary search.
+
+        Args:
+            date: Date in the YYYY-MM-DD format
+
+        Returns:
+            str | None: Nearest available date, None if there is no earlier snapshot
+        """
+        position = bisect_right(self.dates, date)
+        if position == 0:
+            return None
+        return self.dates[position - 1]
+
+
+class SnapshotStore:
+    """Delta-encoded store of daily cumulative player stats snapshots.
+
+    Only the rows whose stat vector changed since the previous stored date
+    are written, together with tombstones for the players that disappeared
+    from the snapshot. The full snapshot of any date is rebuilt on read by
+    picking, for each player, the latest row on or before that date.
+
+    Snapshots are expected to be written in date order. Rewriting an already
+    stored date replaces the rows of that date only.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, table_name: str = SNAPSHOT_TABLE_NAME):
+        self.conn = conn
+        self.table_name = table_name
+        self.date_indexes: dict[str, SnapshotDateIndex] = {}
+        create_table(self.conn, CREATE_SNAPSHOT_DATES_TABLE_SQL)
+
+    def write_snapshot(
+        self, snapshot_df: pd.DataFrame, league_name: str, date: str
+    ) -> int:
+        """Stores the rows of the snapshot that changed since the previous date.
+
+        Args:
+            snapshot_df: Full snapshot, indexed by player id
+            league_name: League of the snapshot
+            date: Snapshot date in the YYYY-MM-DD format
+
+        Returns:
+            int: Number of rows written, including tombstones
+        """
+        current_df = snapshot_df.drop(columns=["date"], errors="ignore")
+        current_df = current_df.rename_axis(KEY_COLUMN).reset_index()
+        stat_columns = [col for col in current_df.columns if col != KEY_COLUMN]
+        current_df["row_hash"] = compute_row_hashes(current_df, stat_columns)
+
+        self._delete_date(league_name, date)
+        previous_df = self._get_latest_hashes(league_name, date)
+
+        merged_df = current_df[[KEY_COLUMN, "row_hash"]].merge(
+            previous_df,
+            on=KEY_COLUMN,
+            how="outer",
+            suffixes=("", "_previous"),
+            indicator=True,
+        )
+        is_changed = (merged_df["_merge"] == "left_only") | (
+            (merged_df["_merge"] == "both")
+            & (
+                (merged_df["row_hash"] != merged_df["row_hash_previous"])
+                | (merged_df["is_deleted"] == 1)
+            )
+        )
+        is_removed = (merged_df["_merge"] == "right_only") & (
+            merged_df["is_deleted"] == 0
+        )
+
+        changed_df = current_df[
+            current_df[KEY_COLUMN].isin(merged_df.loc[is_changed, KEY_COLUMN])
+        ].assign(is_deleted=0)
+        tombstones_df = pd.DataFrame(
+            {
+                KEY_COLUMN: merged_df.loc[is_removed, KEY_COLUMN].astype(
+                    current_df[KEY_COLUMN].dtype
+                ),
+                "row_hash": None,
+                "is_deleted": 1,
+            }
+        ).reset_index(drop=True)
+        delta_df = pd.concat([changed_df, tombstones_df], ignore_index=True)
+        delta_df.insert(0, "date", date)
+        delta_df.insert(0, "league", league_name)
+
+        if len(delta_df):
+            insert_dataframe(self.conn, self.table_name, delta_df)
+        self._create_index()
+        self._register_date(league_name, date, len(current_df), len(delta_df))
+
+        logger.info(
+            "delta_snapshot_written",
+            league=league_name,
+            date=date,
+            rows_total=len(current_df),
+            rows_changed=len(changed_df),
+            rows_removed=len(tombstones_df),
+        )
+        return len(delta_df)
+
+    def read_snapshot(
+        self,
+        league_name: str,
+        date: str,
+        columns: list[str] | None = None,
+        player_ids: list[int] | None = None,
+    ) -> pd.DataFrame:
+        """Rebuilds the full snapshot of a date with an as-of join over the deltas.
+
+        Args:
+            league_name: League of the snapshot
+            date: Snapshot date in the YYYY-MM-DD format
+            columns: If given, only these stat columns are returned
+            player_ids: If given, only the rows of these players are rebuilt
+
+        Returns:
+            pd.DataFrame: Snapshot indexed by player id, with a date column
+        """
+        select_columns = (
+            "*" if columns is None else ", ".join(f'"{col}"' for col in columns)
+        )
+        params: list = [league_name, date]
+        player_ids_sql = ""
+        if player_ids is not None:
+            player_ids_sql = (
+                f"AND {KEY_COLUMN} IN ({', '.join('?' for _ in player_ids)})"
+            )
+            params.extend(int(player_id) for player_id in player_ids)
+        query = f"""
+            SELECT {KEY_COLUMN}, {select_columns} FROM (
+                SELECT *, ROW_NUMBER() OVER (
+                    PARTITION BY {KEY_COLUMN} ORDER BY date DESC
+                ) AS row_number
+                FROM {self.table_name}
+                WHERE league = ? AND date <= ? {player_ids_sql}
+            )
+            WHERE row_number = 1 AND is_deleted = 0
+            ORDER BY {KEY_COLUMN}
+        """
+        try:
+            snapshot_df = pd.read_sql_query(query, self.conn, params=params)
+        except Exception as e:
+            raise Exception(f"Failed to read snapshot {league_name} {date}: {e}")
+
+        # the select star duplicates the key column
+        snapshot_df = snapshot_df.loc[:, ~snapshot_df.columns.duplicated()]
+        snapshot_df = snapshot_df.drop(
+            columns=[
+                col
+                for col in SNAPSHOT_METADATA_COLUMNS + ["row_number"]
+                if col in snapshot_df.columns and col != KEY_COLUMN
+            ]
+        ).set_index(KEY_COLUMN)
+        snapshot_df.index.name = None
+        snapshot_df["date"] = date
+        return snapshot_df
+
+    def get_dates(self, league_name: str) -> list[str]:
+        """Returns the sorted dates for which a snapshot was written.
+
+        Args:
+            league_name: League of the snapshots
+
+        Returns:
+            list[str]: Snapshot dates in the YYYY-MM-DD format
+        """
+        cursor = self.conn.execute(
+            f"""
+            SELECT date FROM {SNAPSHOT_DATES_TABLE_NAME}
+            WHERE table_name = ? AND league = ? ORDER BY date
+            """,
+            (self.table_name, league_name),
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+    def get_date_index(self, league_name: str) -> SnapshotDateIndex:
+        """Returns the date index of a league, loading it on first use.
+
+        Args:
+            league_name: League of the snapshots
+
+        Returns:
+            SnapshotDateIndex: Index of the available snapshot dates
+        """
+        if league_name not in self.date_indexes:
+            self.date_indexes[league_name] = SnapshotDateIndex(
+                self.get_dates(league_name)
+            )
+        return self.date_indexes[league_name]
+
+    def get_stats_as_of(
+        self, league_name: str, date: str, columns: list[str] | None = None
+    ) -> pd.DataFrame:
+        """Returns the snapshot of the nearest available date on or before the
+        given date, so that callers do not need to know which days were extracted.
+
+        Args:
+            league_name: League of the snapshot
+            date: Requested date in the YYYY-MM-DD format
+            columns: If given, only these stat columns are returned
+
+        Returns:
+            pd.DataFrame: Snapshot indexed by player id, whose date column holds
+            the date of the snapshot actually used
+
+        Raises:
+            ValueError: If there is no snapshot on or before the given date
+        """
+        snapshot_date = self.get_date_index(league_name).get_nearest_date(date)
+        if snapshot_date is None:
+            raise ValueError(f"No {league_name} snapshot available on or before {date}")
+        logger.debug(
+            "snapshot_as_of_resolved",
+            league=league_name,
+            requested_date=date,
+            snapshot_date=snapshot_date,
+        )
+        return self.read_snapshot(league_name, snapshot_date, columns=columns)
+
+    def get_stats_diff(
+        self,
+        league_name: str,
+        date: str,
+        previous_date: str,
+        columns: list[str] | None = None,
+    ) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """Returns the snapshots as of two dates, aligned on the players present
+        in both of them.
+
+        Args:
+            league_name: League of the snapshots
+            date: Most recent date in the YYYY-MM-DD format
+            previous_date: Date to compare against in the YYYY-MM-DD format
+            columns: If given, only these stat columns are returned
+
+        Returns:
+            pd.DataFrame: Snapshot as of date
+            pd.DataFrame: Snapshot as of previous_date, with the same index
+        """
+        return align_snapshots(
+            self.get_stats_as_of(league_name, date, columns=columns),
+            self.get_stats_as_of(league_name, previous_date, columns=columns),
+        )
+
+    def get_changed_players(
+        self, league_name: str, since_date: str, date: str | None = None
+    ) -> pd.DataFrame:
+        """Returns the players whose stat vector changed since a given run, by
+        comparing their stored row hashes. Only the players with a delta row
+        between the two dates are looked at, so that quiet days are cheap.
+
+        Args:
+            league_name: League of the snapshots
+            since_date: Date of the run to compare against, in the YYYY-MM-DD
+            format
+            date: Most recent date in the YYYY-MM-DD format, the latest stored
+            date by default
+
+        Returns:
+            pd.DataFrame: Indexed by player id, with a change_type column holding
+            "new", "changed" or "removed", and the row_hash and
+            previous_row_hash columns
+        """
+        if date is None:
+            dates = self.get_dates(league_name)
+            date = dates[-1] if dates else since_date
+        changes_df = pd.DataFrame(
+            {
+                "change_type": pd.Series(dtype=object),
+                "row_hash": pd.Series(dtype=object),
+                "previous_row_hash": pd.Series(dtype=object),
+            },
+            index=pd.Index([], dtype="int64"),
+        )
+        if not self._table_exists() or date <= since_date:
+            return changes_df
+
+        latest_rows_sql = f"""
+            SELECT {KEY_COLUMN}, row_hash, is_deleted FROM (
+                SELECT {KEY_COLUMN}, row_hash, is_deleted, ROW_NUMBER() OVER (
+                    PARTITION BY {KEY_COLUMN} ORDER BY date DESC
+                ) AS row_number
+                FROM {self.table_name}
+                WHERE league = ? AND date <= ? AND {KEY_COLUMN} IN (
+                    SELECT {KEY_COLUMN} FROM {self.table_name}
+                    WHERE league = ? AND date > ? AND date <= ?
+                )
+            )
+            WHERE row_number = 1
+        """
+        query = f"""
+            SELECT
+                current.{KEY_COLUMN},
+                current.row_hash,
+                current.is_deleted,
+                previous.row_hash AS previous_row_hash,
+                previous.is_deleted AS previous_is_deleted
+            FROM ({latest_rows_sql}) AS current
+            LEFT JOIN ({latest_rows_sql}) AS previous
+            ON current.{KEY_COLUMN} = previous.{KEY_COLUMN}
+            ORDER BY current.{KEY_COLUMN}
+        """
+        window_params = (league_name, since_date, date)
+        try:
+            rows_df = pd.read_sql_query(
+                query,
+                self.conn,
+                params=(league_name, date, *window_params)
+                + (league_name, since_date, *window_params),
+            )
+        except Exception as e:
+            raise Exception(
+                f"Failed to read changed players {league_name} {since_date} {date}: {e}"
+            )
+
+        is_present = rows_df["is_deleted"] == 0
+        was_present = rows_df["previous_is_deleted"] == 0
+        change_types = np.select(
+            [
+                is_present & ~was_present,
+                ~is_present & was_present,
+                is_present & (rows_df["row_hash"] != rows_df["previous_row_hash"]),
+            ],
+            [CHANGE_TYPE_NEW, CHANGE_TYPE_REMOVED, CHANGE_TYPE_CHANGED],
+            default="",
+        )
+        rows_df["change_type"] = change_types
+        rows_df = rows_df[change_types != ""].set_index(KEY_COLUMN)
+        rows_df.index.name = None
+
+        logger.debug(
+            "changed_players_read",
+            league=league_name,
+            since_date=since_date,
+            date=date,
+            players_changed=len(rows_df),
+        )
+        if rows_df.empty:
+            return changes_df
+        return rows_df[list(changes_df.columns)]
+
+    def read_changed_stats(
+        self,
+        league_name: str,
+        since_date: str,
+        date: str | None = None,
+        columns: list[str] | None = None,
+    ) -> pd.DataFrame:
+        """Returns the stats as of a date of the players that are new or whose
+        stats changed since a given run, for incremental consumers.
+
+        Args:
+            league_name: League of the snapshots
+            since_date: Date of the run to compare against, in the YYYY-MM-DD
+            format
+            date: Most recent date in the YYYY-MM-DD format, the latest stored
+            date by default
+            columns: If given, only these stat columns are returned
+
+        Returns:
+            pd.DataFrame: Snapshot rows of the changed players, indexed by
+            player id, with a date column
+        """
+        if date is None:
+            dates = self.get_dates(league_name)
+            date = dates[-1] if dates else since_date
+        changes_df = self.get_changed_players(league_name, since_date, date)
+        player_ids = changes_df.index[
+            changes_df["change_type"] != CHANGE_TYPE_REMOVED
+        ].tolist()
+        return self.read_snapshot(
+            league_name, date, columns=columns, player_ids=player_ids
+        )
+
+    def _get_latest_hashes(self, league_name: str, date: str) -> pd.DataFrame:
+        if not self._table_exists():
+            return pd.DataFrame(
+                {KEY_COLUMN: pd.Series(dtype="int64"), "row_hash": [], "is_deleted": []}
+            )
+        query = f"""
+            SELECT {KEY_COLUMN}, row_hash, is_deleted FROM (
+                SELECT {KEY_COLUMN}, row_hash, is_deleted, ROW_NUMBER() OVER (
+                    PARTITION BY {KEY_COLUMN} ORDER BY date DESC
+                ) AS row_number
+                FROM {self.table_name}
+                WHERE league = ? AND date < ?
+            )
+            WHERE row_number = 1
+        """
+        return pd.read_sql_query(query, self.conn, params=(league_name, date))
+
+    def _delete_date(self, league_name: str, date: str) -> None:
+        if self._table_exists():
+            self.conn.execute(
+                f"DELETE FROM {self.table_name} WHERE league = ? AND date = ?",
+                (league_name, date),
+            )
+            self.conn.commit()
+
+    def _register_date(
+        self, league_name: str, date: str, rows_total: int, rows_written: int
+    ) -> None:
+        self.conn.execute(
+            f"""
+            INSERT OR REPLACE INTO {SNAPSHOT_DATES_TABLE_NAME}
+            (table_name, league, date, rows_total, rows_written)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (self.table_name, league_name, date, rows_total, rows_written),
+        )
+        self.conn.commit()
+        self.date_indexes.pop(league_name, None)
+
+    def _create_index(self) -> None:
+        if self._table_exists():
+            create_table(
+                self.conn,
+                f"""
+                CREATE INDEX IF NOT EXISTS {self.table_name}_league_player_date
+                ON {self.table_name} (league, {KEY_COLUMN}, date);
+                """,
+            )
+
+    def _table_exists(self) -> bool:
+        cursor = self.conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name=?",
+            (self.table_name,),
+        )
+        return cursor.fetchone() is not None
+
+
+def align_snapshots(
+    current_df: pd.DataFrame, previous_df: pd.DataFrame
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Aligns two snapshots on the players present in both of them. Players
+    appearing more than once in a snapshot only keep their first row.
+
+    Args:
+        current_df: Most recent snapshot, indexed by player id
+        previous_df: Snapshot to compare against, indexed by player id
+
+    Returns:
+        pd.DataFrame: Most recent snapshot, sorted by player id
+        pd.DataFrame: Previous snapshot, with the same index
+    """
+    current_df = current_df[~current_df.index.duplicated(keep="first")]
+    previous_df = previous_df[~previous_df.index.duplicated(keep="first")]
+    common_index = current_df.index.intersection(previous_df.index).sort_values()
+    return current_df.loc[common_index], previous_df.loc[common_index]
@@ -0,0 +1,347 @@
+import hashlib
+import sqlite3
+
+import pandas as pd
+
+from mlb_airflow_data_pipeline.db_utils import (
+    cast_stat_columns,
+    create_table,
+    insert_dataframe,
+)
+from mlb_airflow_data_pipeline.filter_expression_utils import FilterExpression
+from mlb_airflow_data_pipeline.statsapi_parameters_script import (
+    LEAGUE_MAPPING,
+    PLAYER_INFORMATION,
+    american_league_team_id_name,
+    expected_output_columns,
+    national_league_team_id_name,
+)
+
+PLAYERS_TABLE_NAME = "players"
+TEAMS_TABLE_NAME = "teams"
+FACT_TABLE_NAME = "player_stats_fact"
+PLAYER_STATS_VIEW_NAME = "player_stats_view"
+
+# every extracted stat is stored as a number in the fact table
+FACT_STAT_COLUMNS = [
+    col for col in expected_output_columns() if col not in PLAYER_INFORMATION + ["date"]
+]
+
+CREATE_PLAYERS_TABLE_SQL = f"""
+    CREATE TABLE IF NOT EXISTS {PLAYERS_TABLE_NAME} (
+        player_id INTEGER PRIMARY KEY,
+        playername TEXT NOT NULL
+    );
+"""
+
+CREATE_TEAMS_TABLE_SQL = f"""
+    CREATE TABLE IF NOT EXISTS {TEAMS_TABLE_NAME} (
+        team_id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        league TEXT NOT NULL
+    );
+"""
+
+CREATE_FACT_TABLE_SQL = f"""
+    CREATE TABLE IF NOT EXISTS {FACT_TABLE_NAME} (
+        date TEXT NOT NULL,
+        player_id INTEGER NOT NULL REFERENCES {PLAYERS_TABLE_NAME} (player_id),
+        team_id INTEGER NOT NULL REFERENCES {TEAMS_TABLE_NAME} (team_id),
+        {", ".join(f'"{col}" REAL' for col in FACT_STAT_COLUMNS)},
+        PRIMARY KEY (date, player_id, team_id)
+    ) WITHOUT ROWID;
+"""
+
+# the facts with the names and league of the dimensions, the stored form of
+# the player stats snapshots for readers expecting a single table
+CREATE_PLAYER_STATS_VIEW_SQL = f"""
+    CREATE VIEW IF NOT EXISTS {PLAYER_STATS_VIEW_NAME} AS
+    SELECT t.league, p.playername, f.*
+    FROM {FACT_TABLE_NAME} AS f
+    JOIN {PLAYERS_TABLE_NAME} AS p ON p.player_id = f.player_id
+    JOIN {TEAMS_TABLE_NAME} AS t ON t.team_id = f.team_id;
+"""
+
+
+def create_star_schema(conn: sqlite3.Connection) -> None:
+    """Creates the players and teams dimension tables, the player stats
+    fact table referencing them and the view joining them, if they do not
+    exist yet.
+
+    Args:
+        conn: Database connection object
+    """
+    for create_table_sql in [
+        CREATE_PLAYERS_TABLE_SQL,
+        CREATE_TEAMS_TABLE_SQL,
+        CREATE_FACT_TABLE_SQL,
+        CREATE_PLAYER_STATS_VIEW_SQL,
+    ]:
+        create_table(conn, create_table_sql)
+
+
+def upsert_teams(conn: sqlite3.Connection, teams_df: pd.DataFrame) -> None:
+    """Inserts the teams into the teams dimension, updating the name and league
+    of the teams already present.
+
+    Args:
+        conn: Database connection object
+        teams_df: DataFrame with team_id, name and league columns
+
+    Raises:
+        sqlite3.Error: If the upsert fails
+    """
+    records = teams_df[["team_id", "name", "league"]].drop_duplicates("team_id")
+    try:
+        conn.executemany(
+            f"""
+            INSERT INTO {TEAMS_TABLE_NAME} (team_id, name, league) VALUES (?, ?, ?)
+            ON CONFLICT (team_id) DO UPDATE SET
+                name = excluded.name, league = excluded.league
+            """,
+            records.itertuples(index=False, name=None),
+        )
+        conn.commit()
+    except sqlite3.Error as e:
+        raise sqlite3.Error(f"Failed to upsert into table {TEAMS_TABLE_NAME}: {e}")
+
+
+def seed_teams(conn: sqlite3.Connection) -> None:
+    """Fills the teams dimension from the team names known in the parameters.
+
+    Args:
+        conn: Database connection object
+    """
+    league_team_id_names = {
+        "american_league": american_league_team_id_name(),
+        "national_league": national_league_team_id_name(),
+    }
+    teams_df = pd.DataFrame(
+        [
+            {"team_id": team_id, "name": name, "league": league_name}
+            for league_name in LEAGUE_MAPPING.keys()
+            for team_id, name in league_team_id_names[league_name].items()
+        ]
+    )
+    upsert_teams(conn, teams_df)
+
+
+def upsert_players(conn: sqlite3.Connection, player_stats_df: pd.DataFrame) -> None:
+    """Inserts the players of a snapshot into the players dimension, updating
+    the names of the players already present.
+
+    Args:
+        conn: Database connection object
+        player_stats_df: Player stats snapshot, indexed by player id
+
+    Raises:
+        sqlite3.Error: If the upsert fails
+    """
+    records = (
+        player_stats_df[["playername"]]
+        .rename_axis("player_id")
+        .reset_index()
+        .drop_duplicates("player_id")
+        .astype({"player_id": "int64"})
+    )
+    try:
+        conn.executemany(
+            f"""
+            INSERT INTO {PLAYERS_TABLE_NAME} (player_id, playername) VALUES (?, ?)
+            ON CONFLICT (player_id) DO UPDATE SET playername = excluded.playername
+            """,
+            records.itertuples(index=False, name=None),
+        )
+        conn.commit()
+    except sqlite3.Error as e:
+        raise sqlite3.Error(f"Failed to upsert into table {PLAYERS_TABLE_NAME}: {e}")
+
+
+def insert_player_stats_facts(
+    conn: sqlite3.Connection, player_stats_df: pd.DataFrame, date: str
+) -> None:
+    """Writes a player stats snapshot to the fact table, replacing the rows of
+    the same date and teams so that reruns are idempotent. The players must
+    be present in the players dimension.
+
+    Args:
+        conn: Database connection object
+        player_stats_df: Player stats snapshot, indexed by player id
+        date: Snapshot date in the YYYY-MM-DD format
+    """
+    fact_df = cast_stat_columns(
+        player_stats_df.rename_axis("player_id")
+        .reset_index()
+        .drop_duplicates(["player_id", "team_id"])
+    )
+    fact_df["date"] = date
+    fact_columns = ["date", "player_id", "team_id"] + [
+        col for col in FACT_STAT_COLUMNS if col in fact_df.columns
+    ]
+
+    team_ids = fact_df["team_id"].unique().tolist()
+    conn.execute(
+        f"""
+        DELETE FROM {FACT_TABLE_NAME}
+        WHERE date = ? AND team_id IN ({", ".join("?" for _ in team_ids)})
+        """,
+        [date] + team_ids,
+    )
+    insert_dataframe(conn, FACT_TABLE_NAME, fact_df[fact_columns])
+
+
+def get_fact_column_sql(column: str) -> str:
+    """Returns the SQL expression of a column of read_player_stats_facts."""
+    if column == "playername":
+        return "p.playername"
+    if column == "team_name":
+        return "t.name"
+    return f'f."{column}"'
+
+
+def get_player_stats_facts_conditions(
+    date: str | None = None,
+    league_name: str | None = None,
+    filter_expression: FilterExpression | None = None,
+) -> tuple[str, list]:
+    """Builds the WHERE clause selecting player stats facts.
+
+    Args:
+        date: If given, only this snapshot date is selected
+        league_name: If given, only the teams of this league are selected
+        filter_expression: If given, only the rows matching it are selected
+
+    Returns:
+        str: WHERE clause, empty if nothing is filtered
+        list: Parameters of the placeholders, in order
+    """
+    conditions = []
+    params = []
+    if date is not None:
+        conditions.append("f.date = ?")
+        params.append(date)
+    if league_name is not None:
+        conditions.append("t.league = ?")
+        params.append(league_name)
+    if filter_expression is not None:
+        filter_sql, filter_params = filter_expression.to_sql(get_fact_column_sql)
+        conditions.append(f"({filter_sql})")
+        params.extend(filter_params)
+    where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return where_clause, params
+
+
+def count_player_stats_facts(
+    conn: sqlite3.Connection,
+    date: str | None = None,
+    league_name: str | None = None,
+    filter_expression: FilterExpression | None = None,
+) -> int:
+    """Counts the player stats facts, e.g. to report how many rows a filter
+    pushed down to the database discarded.
+
+    Args:
+        conn: Database connection object
+        date: If given, only this snapshot date is counted
+        league_name: If given, only the teams of this league are counted
+        filter_expression: If given, only the rows matching it are counted
+
+    Returns:
+        int: Number of rows
+    """
+    where_clause, params = get_player_stats_facts_conditions(
+        date, league_name, filter_expression
+    )
+    query = f"""
+        SELECT COUNT(*)
+        FROM {FACT_TABLE_NAME} AS f
+        JOIN {PLAYERS_TABLE_NAME} AS p ON p.player_id = f.player_id
+        JOIN {TEAMS_TABLE_NAME} AS t ON t.team_id = f.team_id
+        {where_clause}
+    """
+    try:
+        return int(conn.execute(query, params).fetchone()[0])
+    except sqlite3.Error as e:
+        raise sqlite3.Error(f"Failed to count table {FACT_TABLE_NAME}: {e}")
+
+
+def get_player_stats_facts_digest(
+    conn: sqlite3.Connection, date: str, league_name: str
+) -> dict:
+    """Summarizes the player stats facts of a league and date, so that a
+    treatment can tell whether its input changed without watching the whole
+    database file, which every other league and date also writes to.
+
+    Args:
+        conn: Database connection object
+        date: Snapshot date in the YYYY-MM-DD format
+        league_name: League of the teams whose facts are summarized
+
+    Returns:
+        dict: Number of rows and hash of their content
+    """
+    where_clause, params = get_player_stats_facts_conditions(date, league_name)
+    query = f"""
+        SELECT f.*
+        FROM {FACT_TABLE_NAME} AS f
+        JOIN {TEAMS_TABLE_NAME} AS t ON t.team_id = f.team_id
+        {where_clause}
+        ORDER BY f.player_id, f.team_id
+    """
+    digest = hashlib.sha256()
+    rows_count = 0
+    try:
+        for row in conn.execute(query, params):
+            digest.update(repr(row).encode())
+            rows_count += 1
+    except sqlite3.Error as e:
+        raise sqlite3.Error(f"Failed to read table {FACT_TABLE_NAME}: {e}")
+    return {"rows_count": rows_count, "rows_hash": digest.hexdigest()[:16]}
+
+
+def read_player_stats_facts(
+    conn: sqlite3.Connection,
+    date: str | None = None,
+    league_name: str | None = None,
+    columns: list[str] | None = None,
+    filter_expression: FilterExpression | None = None,
+) -> pd.DataFrame:
+    """Reads player stats from the fact table, joined with the player and team
+    names from the dimension tables.
+
+    Args:
+        conn: Database connection object
+        date: If given, only this snapshot date is read
+        league_name: If given, only the teams of this league are read
+        columns: If given, only these stat columns are read
+        filter_expression: If given, only the rows matching it are read, the
+            filter being evaluated by the database
+
+    Returns:
+        pd.DataFrame: Player stats indexed by player id, with playername,
+        team_id, team_name and date columns
+    """
+    stat_columns = FACT_STAT_COLUMNS if columns is None else columns
+    select_columns = ", ".join(f'f."{col}"' for col in stat_columns)
+
+    where_clause, params = get_player_stats_facts_conditions(
+        date, league_name, filter_expression
+    )
+
+    query = f"""
+        SELECT f.player_id, p.playername, f.team_id, t.name AS team_name, f.date,
+            {select_columns}
+        FROM {FACT_TABLE_NAME} AS f
+        JOIN {PLAYERS_TABLE_NAME} AS p ON p.player_id = f.player_id
+        JOIN {TEAMS_TABLE_NAME} AS t ON t.team_id = f.team_id
+        {where_clause}
+        ORDER BY f.date, f.player_id
+    """
+    try:
+        facts_df = pd.read_sql_query(query, conn, params=params)
+    except Exception as e:
+        raise Exception(f"Failed to read table {FACT_TABLE_NAME}: {e}")
+
+    facts_df = facts_df.set_index("player_id")
+    facts_df.index.name = None
+    return facts_df
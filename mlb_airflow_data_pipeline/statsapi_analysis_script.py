@@ -1,19 +1,21 @@
+from typing import Optional
+
 import matplotlib
 import matplotlib.pyplot as plt
 import pandas as pd
 
 matplotlib.use("Agg")
 
+from mlb_airflow_data_pipeline.arrow_ipc_utils import read_handoff_data
 from mlb_airflow_data_pipeline.statsapi_parameters_script import (
-    DATA_FILE_LOCATION,
+    DATE_TIME_EXECUTION,
     OUTPUT_FILE_LOCATION,
     LEAGUE_NAME,
 )
 from mlb_airflow_data_pipeline.statsapi_treatment_script import (
-    BATTER_DATA_FILE_NAME,
     OUTPUT_DETAILS,
-    PITCHER_DATA_FILE_NAME,
     DataPaths,
+    TreatmentJob,
 )
 from mlb_airflow_data_pipeline.logging_setup import get_logger
 
@@ -22,9 +24,16 @@ logger = get_logger("statsapi_analysis", league=LEAGUE_NAME)
 
 
 class DataPlotter:
-    def __init__(self, data_paths: DataPaths, representable_variables: list):
+    def __init__(
+        self,
+        data_paths: DataPaths,
+        representable_variables: list,
+        input_data: Optional[pd.DataFrame] = None,
+    ):
         self.data_paths = data_paths
         self.representable_variables = representable_variables
+        # treated data already in memory, read from path_to_input_data if None
+        self.input_data = input_data
 
     def set_plots(self) -> None:
         input_data = self.get_input_data()
@@ -59,7 +68,10 @@ class DataPlotter:
                 )
 
     def get_input_data(self) -> pd.DataFrame:
-        input_data = pd.read_csv(self.data_paths.path_to_input_data, index_col=0)
+        if self.input_data is not None:
+            return self.input_data
+
+        input_data = read_handoff_data(self.data_paths.path_to_input_data)  # type: ignore
         logger.info(
             "visualization_data_loaded",
             file_path=self.data_paths.path_to_input_data,
@@ -113,8 +125,12 @@ pitcher_tuple_variable_list = [
 
 
 if __name__ == "__main__":
+    treatment_output_paths = TreatmentJob(
+        league_name=LEAGUE_NAME, date=DATE_TIME_EXECUTION
+    ).get_output_paths()
+
     batter_plots_input_paths = DataPaths(
-        path_to_input_data=DATA_FILE_LOCATION + BATTER_DATA_FILE_NAME,
+        path_to_input_data=treatment_output_paths["batter"],
         path_to_output_data=OUTPUT_FILE_LOCATION + OUTPUT_DETAILS,
     )
 
@@ -126,7 +142,7 @@ if __name__ == "__main__":
     batter_plotter.set_plots()
 
     pitcher_plots_input_paths = DataPaths(
-        path_to_input_data=DATA_FILE_LOCATION + PITCHER_DATA_FILE_NAME,
+        path_to_input_data=treatment_output_paths["pitcher"],
         path_to_output_data=OUTPUT_FILE_LOCATION + OUTPUT_DETAILS,
     )
 
@@ -1,4 +1,7 @@
+import argparse
+import sqlite3
 from datetime import datetime
+from typing import Callable
 
 import pandas as pd
 import statsapi
@@ -17,6 +20,25 @@ from mlb_airflow_data_pipeline.db_utils import (
     get_database_path,
     insert_dataframe,
 )
+from mlb_airflow_data_pipeline.write_behind_utils import WriteBehindWriter
+from mlb_airflow_data_pipeline.data_quality_utils import run_data_quality_check
+from mlb_airflow_data_pipeline.parquet_utils import write_partition
+from mlb_airflow_data_pipeline.rolling_window_utils import RollingWindowAggregator
+from mlb_airflow_data_pipeline.snapshot_utils import SnapshotStore
+from mlb_airflow_data_pipeline.storage_backends import (
+    LEAGUE_STANDINGS_TABLE_NAME,
+    PLAYER_STATS_TABLE_NAME,
+    StorageBackend,
+    get_storage_backend,
+)
+from mlb_airflow_data_pipeline.star_schema_utils import (
+    FACT_TABLE_NAME,
+    create_star_schema,
+    insert_player_stats_facts,
+    seed_teams,
+    upsert_players,
+    upsert_teams,
+)
 
 DATE_TIME_EXECUTION = datetime.today().strftime("%Y-%m-%d")
 
@@ -104,18 +126,27 @@ class TeamStats:
 
 
 class DataExtractor:
-    def __init__(self, league_name: str = LEAGUE_NAME) -> None:
+    def __init__(
+        self, league_name: str = LEAGUE_NAME, date: str = DATE_TIME_EXECUTION
+    ) -> None:
         self.league_name = league_name
+        # statsapi serves the current stats, which are stamped with this date
+        self.date = date
         self.team_id_name_mapping: dict[int, str] = {}
         self.league_standings: pd.DataFrame = pd.DataFrame()
         self.league_team_rosters_player_names: dict[int, list[str]] = {}
 
     def get_player_stats_per_league(
         self,
+        on_team_stats: Callable[[pd.DataFrame], None] | None = None,
     ) -> tuple[pd.DataFrame, dict, list]:
         """
         Returns player individual stats per league.
 
+        Args:
+            on_team_stats: If given, called with the stats of each team as soon as
+            they are extracted, dated and with the full set of output columns
+
         Returns:
             pd.DataFrame: Containing stats for a given league
             dict: Keys are team names and values are inactive players
@@ -131,6 +162,14 @@ class DataExtractor:
                     team_player_stats,
                     inactive_player_info,
                 ) = self.get_player_stats_dataframe_per_team(team_number)
+                # a team whose stats could not be handed over is failed as a
+                # whole, so that the result and the callback see the same teams
+                if on_team_stats is not None:
+                    on_team_stats(
+                        team_player_stats.assign(date=self.date).reindex(
+                            columns=expected_output_columns()
+                        )
+                    )
                 league_player_team_stats[team_number] = team_player_stats
                 if inactive_player_info:
                     inactive_players_per_team[team_number] = inactive_player_info
@@ -152,7 +191,7 @@ class DataExtractor:
                     exc_info=True,
                 )
         player_stats = pd.concat(league_player_team_stats.values())
-        player_stats["date"] = DATE_TIME_EXECUTION
+        player_stats["date"] = self.date
 
         assert sorted(player_stats.columns.to_list()) == expected_output_columns()
 
@@ -235,7 +274,7 @@ class DataExtractor:
             league_list.append(division_results)
 
         league_standings = pd.concat(league_list, axis=0)
-        league_standings["date"] = DATE_TIME_EXECUTION
+        league_standings["date"] = self.date
         self.league_standings = league_standings
 
     def set_league_team_rosters_player_names(self) -> None:
@@ -260,36 +299,287 @@ class DataExtractor:
         self.league_team_rosters_player_names = league_team_rosters_player_names  # type: ignore
 
 
-if __name__ == "__main__":
-    logger.info("extraction_started", league=LEAGUE_NAME, date=DATE_TIME_EXECUTION)
-
-    db_path = get_database_path()
-    with create_connection(db_path) as conn:
-        data_extractor = DataExtractor(league_name=LEAGUE_NAME)
-
-        data_extractor.set_league_team_rosters_player_names()
-        logger.info(
-            "league_standings_loaded",
-            standings_shape=data_extractor.league_standings.shape,
+def extract_league_data(
+    league_name: str = LEAGUE_NAME,
+    date: str = DATE_TIME_EXECUTION,
+    on_league_standings: Callable[[pd.DataFrame], None] | None = None,
+) -> tuple[pd.DataFrame, pd.DataFrame, dict, list]:
+    """Extracts the current standings and player stats of a league from
+    statsapi, without persisting them.
+
+    Args:
+        league_name: League to extract
+        date: Date the extracted stats are stamped with
+        on_league_standings: If given, called with the standings as soon as
+            they are extracted, before the stats of the players
+
+    Returns:
+        pd.DataFrame: League standings
+        pd.DataFrame: Containing stats for a given league
+        dict: Keys are team names and values are inactive players
+        list: List of teams for which we failed to get stats
+    """
+    data_extractor = DataExtractor(league_name=league_name, date=date)
+
+    data_extractor.set_league_team_rosters_player_names()
+    logger.info(
+        "league_standings_loaded",
+        standings_shape=data_extractor.league_standings.shape,
+    )
+    if on_league_standings is not None:
+        on_league_standings(data_extractor.league_standings)
+
+    data_extractor.set_team_ids_and_names()
+    logger.info(
+        "team_mapping_created", teams_count=len(data_extractor.team_id_name_mapping)
+    )
+
+    (
+        league_player_team_stats_df,
+        inactive_players_per_team,
+        failed_teams,
+    ) = data_extractor.get_player_stats_per_league()
+
+    return (
+        data_extractor.league_standings,
+        league_player_team_stats_df,
+        inactive_players_per_team,
+        failed_teams,
+    )
+
+
+def persist_league_data(
+    conn: sqlite3.Connection,
+    league_standings_df: pd.DataFrame,
+    player_stats_df: pd.DataFrame,
+    league_name: str,
+    date: str,
+    write_league_standings: bool = True,
+    write_parquet: bool = False,
+    parquet_root: str | None = None,
+    storage_backend: StorageBackend | None = None,
+) -> None:
+    """Persists the extracted standings and player stats of a league for every
+    later reader: the league_standings table, the star schema, the snapshot
+    store and the rolling windows. The SQLite storage backend reads these
+    tables, only another backend, e.g. DuckDB, is given its own typed
+    snapshots. The player_stats_fact table is the stored form of the extracted
+    player stats, which are no longer appended in full to a player_stats
+    table, and the snapshot store only keeps the rows that changed since the
+    previous snapshot. A failed data quality check is logged and does not stop
+    the rest from being persisted.
+
+    Args:
+        conn: Database connection object
+        league_standings_df: League standings of the date
+        player_stats_df: Player stats of the date, indexed by player id
+        league_name: League of the data
+        date: Date of the data in the YYYY-MM-DD format
+        write_league_standings: Whether the standings are appended to the
+            league_standings table, False if the caller already did
+        write_parquet: Whether the snapshots are also written to the Parquet
+            store, only read by read_season_increments so far
+        parquet_root: Root directory of the Parquet store, defaults to
+            get_parquet_root()
+        storage_backend: If given, a backend other than SQLite to which the
+            typed snapshots are also written
+    """
+    # the league column lets the storage backends select the league's rows
+    league_standings_table_df = league_standings_df.assign(league=league_name)
+    if write_league_standings:
+        insert_dataframe(conn, LEAGUE_STANDINGS_TABLE_NAME, league_standings_table_df)
+
+    create_star_schema(conn)
+    # the dimension knows the teams of both leagues before their first run
+    seed_teams(conn)
+    upsert_teams(conn, league_standings_table_df)
+
+    # the drift report must not stop the snapshot from being stored
+    try:
+        run_data_quality_check(conn, player_stats_df, league_name, date)
+    except Exception as e:
+        logger.error("data_quality_check_failed", error=str(e), exc_info=True)
+    snapshot_store = SnapshotStore(conn)
+    snapshot_store.write_snapshot(player_stats_df, league_name, date)
+    RollingWindowAggregator(conn).update_changed(snapshot_store, league_name, date)
+
+    upsert_players(conn, player_stats_df)
+    insert_player_stats_facts(conn, player_stats_df, date)
+
+    if write_parquet:
+        standings_parquet_path = write_partition(
+            league_standings_df,
+            "league_standings",
+            league_name,
+            date,
+            root=parquet_root,
+        )
+        logger.info("league_standings_parquet_saved", file_path=standings_parquet_path)
+        player_stats_parquet_path = write_partition(
+            player_stats_df,
+            "player_stats",
+            league_name,
+            date,
+            root=parquet_root,
+            index_label="player_id",
         )
+        logger.info("player_stats_parquet_saved", file_path=player_stats_parquet_path)
 
-        insert_dataframe(conn, "league_standings", data_extractor.league_standings)
+    if storage_backend is not None:
+        write_storage_backend_snapshots(
+            storage_backend, league_standings_df, player_stats_df, league_name, date
+        )
+    logger.info(
+        "league_data_persisted",
+        league=league_name,
+        date=date,
+        players_total=len(player_stats_df),
+        table=FACT_TABLE_NAME,
+    )
+
+
+def extract_league(
+    conn: sqlite3.Connection,
+    write_behind_writer: WriteBehindWriter,
+    league_name: str = LEAGUE_NAME,
+    date: str = DATE_TIME_EXECUTION,
+    write_parquet: bool = False,
+    parquet_root: str | None = None,
+    storage_backend: StorageBackend | None = None,
+) -> tuple[pd.DataFrame, dict, list]:
+    """Extracts the current standings and player stats of a league from
+    statsapi and persists them with persist_league_data. The standings are
+    written behind the extraction of the player stats.
+
+    Args:
+        conn: Database connection object
+        write_behind_writer: Started writer of the league_standings table,
+            which the caller closes
+        league_name: League to extract
+        date: Date the extracted stats are stamped with
+        write_parquet: Whether the snapshots are also written to the Parquet
+            store, only read by read_season_increments so far
+        parquet_root: Root directory of the Parquet store, defaults to
+            get_parquet_root()
+        storage_backend: If given, a backend other than SQLite to which the
+            typed snapshots are also written
+
+    Returns:
+        pd.DataFrame: Containing stats for a given league
+        dict: Keys are team names and values are inactive players
+        list: List of teams for which we failed to get stats
+    """
+
+    def submit_league_standings(league_standings_df: pd.DataFrame) -> None:
+        write_behind_writer.submit(
+            LEAGUE_STANDINGS_TABLE_NAME,
+            league_standings_df.assign(league=league_name),
+        )
         logger.info(
-            "league_standings_saved", database_path=db_path, table="league_standings"
+            "league_standings_queued",
+            database_path=write_behind_writer.db_path,
+            table=LEAGUE_STANDINGS_TABLE_NAME,
         )
 
-        data_extractor.set_team_ids_and_names()
-        logger.info(
-            "team_mapping_created", teams_count=len(data_extractor.team_id_name_mapping)
+    (
+        league_standings_df,
+        league_player_team_stats_df,
+        inactive_players_per_team,
+        failed_teams,
+    ) = extract_league_data(
+        league_name, date, on_league_standings=submit_league_standings
+    )
+    persist_league_data(
+        conn,
+        league_standings_df,
+        league_player_team_stats_df,
+        league_name,
+        date,
+        write_league_standings=False,
+        write_parquet=write_parquet,
+        parquet_root=parquet_root,
+        storage_backend=storage_backend,
+    )
+    return league_player_team_stats_df, inactive_players_per_team, failed_teams
+
+
+def write_storage_backend_snapshots(
+    storage_backend: StorageBackend,
+    league_standings_df: pd.DataFrame,
+    player_stats_df: pd.DataFrame,
+    league_name: str,
+    date: str,
+) -> None:
+    """Writes the typed snapshots of the standings and player stats of a league
+    to a storage backend other than SQLite, for its analytical reads.
+
+    Args:
+        storage_backend: Storage backend, e.g. DuckDB
+        league_standings_df: League standings of the date
+        player_stats_df: Player stats of the date, indexed by player id
+        league_name: League of the snapshots
+        date: Snapshot date in the YYYY-MM-DD format
+    """
+    with storage_backend.connect() as backend_conn:
+        storage_backend.write_snapshot(
+            backend_conn,
+            LEAGUE_STANDINGS_TABLE_NAME,
+            league_standings_df,
+            league_name,
+            date,
+        )
+        storage_backend.write_snapshot(
+            backend_conn,
+            PLAYER_STATS_TABLE_NAME,
+            player_stats_df,
+            league_name,
+            date,
+            index_label="player_id",
         )
+    logger.info("storage_backend_snapshots_saved", league=league_name, date=date)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Extracts the stats of a league from statsapi and stores them",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "--write_parquet",
+        action="store_true",
+        help="Also write the snapshots to the partitioned Parquet store",
+    )
+    parser.add_argument(
+        "--storage_backend",
+        choices=["sqlite", "duckdb"],
+        default="sqlite",
+        help="Storage backend of the analytical reads, SQLite reads the "
+        "extracted tables and DuckDB is also given typed snapshots",
+    )
+    args = parser.parse_args()
 
+    logger.info("extraction_started", league=LEAGUE_NAME, date=DATE_TIME_EXECUTION)
+
+    db_path = get_database_path()
+    with (
+        create_connection(db_path) as conn,
+        WriteBehindWriter(db_path) as write_behind_writer,
+    ):
         (
             league_player_team_stats_df,
             inactive_players_per_team,
             failed_teams,
-        ) = data_extractor.get_player_stats_per_league()
-
-        insert_dataframe(conn, "player_stats", league_player_team_stats_df)
+        ) = extract_league(
+            conn,
+            write_behind_writer,
+            LEAGUE_NAME,
+            write_parquet=args.write_parquet,
+            storage_backend=(
+                None
+                if args.storage_backend == "sqlite"
+                else get_storage_backend(args.storage_backend)
+            ),
+        )
 
         logger.info(
             "extraction_completed",
@@ -299,7 +589,7 @@ if __name__ == "__main__":
             ),
             failed_teams_count=len(failed_teams),
             database_path=db_path,
-            table="player_stats",
+            table=FACT_TABLE_NAME,
         )
 
         if inactive_players_per_team:
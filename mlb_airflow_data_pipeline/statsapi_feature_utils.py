@@ -1,6 +1,12 @@
+import numpy as np
 import pandas as pd
 
 from mlb_airflow_data_pipeline.logging_setup import get_logger
+from mlb_airflow_data_pipeline.rate_stats_utils import (
+    parse_innings_pitched,
+    recompute_rate_stats,
+    safe_divide,
+)
 
 # Initialize logger for feature utilities
 logger = get_logger("statsapi_feature_utils")
@@ -28,10 +34,15 @@ def create_plate_appearance_normalization(
         data_shape=input_df.shape,
     )
 
-    for feature_name in feature_name_list:
-        input_df[feature_name + "perplateAppearance"] = (
-            input_df[feature_name] / input_df["plateAppearances"]
-        )
+    input_df = pd.concat(
+        [
+            input_df,
+            compute_ratio_features(
+                input_df, feature_name_list, "plateAppearances", "perplateAppearance"
+            ),
+        ],
+        axis=1,
+    )
 
     logger.debug(
         "plate_appearance_normalization_completed",
@@ -46,7 +57,7 @@ def create_innings_pitched_normalization(
     """Generates a list of features normalized by the number of a player's pitched innings.
     This is a better estimator of a player's performance because players can have
     an excellent total number (say, of outs) simply because they have a lot of
-    innings played.
+    innings played. "123.1" innings pitched are read as 123 innings and one out.
 
     Args:
         input_df (pd.DataFrame)
@@ -62,10 +73,13 @@ def create_innings_pitched_normalization(
         data_shape=input_df.shape,
     )
 
-    for feature_name in feature_name_list:
-        input_df[feature_name + "inningsPitched"] = (
-            input_df[feature_name] / input_df["inningsPitched"]
-        )
+    input_df = pd.concat(
+        [
+            input_df,
+            compute_innings_pitched_features(input_df, feature_name_list),
+        ],
+        axis=1,
+    )
 
     logger.debug(
         "innings_pitched_normalization_completed",
@@ -80,6 +94,9 @@ def create_mean_normalization(
     """Generates a list of features feature normalized by the league's mean (set to 100).
     This allows for a direct comparison between different players.
 
+    The league's mean and std of every feature are also repeated on every row,
+    see create_normalized_features to keep them in a side table instead.
+
     Args:
         input_df (pd.DataFrame)
         feature_name_list (list)
@@ -87,17 +104,24 @@ def create_mean_normalization(
     Returns:
         pd.DataFrame
     """
-    for feature_name in feature_name_list:
-        input_df[feature_name + "_mean"] = input_df[feature_name].mean()
-        input_df[feature_name + "_std"] = input_df[feature_name].std()
-        input_df["normalized_" + feature_name] = 100 * (
-            input_df[feature_name] / input_df[feature_name + "_mean"]
-        )
-        input_df[feature_name + "_z_score"] = (
-            input_df[feature_name] - input_df[feature_name + "_mean"]
-        ) / input_df[feature_name + "_std"]
-
-    return input_df
+    league_statistics = compute_league_statistics(input_df, feature_name_list)
+    broadcast_statistics = pd.DataFrame(
+        np.broadcast_to(
+            league_statistics.to_numpy().T.reshape(1, -1),
+            (len(input_df), 2 * len(feature_name_list)),
+        ),
+        index=input_df.index,
+        columns=[feature_name + "_mean" for feature_name in feature_name_list]
+        + [feature_name + "_std" for feature_name in feature_name_list],
+    )
+    return pd.concat(
+        [
+            input_df,
+            broadcast_statistics,
+            compute_mean_normalization_features(input_df, league_statistics),
+        ],
+        axis=1,
+    )
 
 
 def create_babip(input_df: pd.DataFrame) -> pd.DataFrame:
@@ -115,12 +139,8 @@ def create_babip(input_df: pd.DataFrame) -> pd.DataFrame:
     """
     logger.debug("babip_calculation_started", data_shape=input_df.shape)
 
-    input_df["babip"] = (input_df["hits"] - input_df["homeRuns"]) / (
-        input_df["atBats"]
-        - input_df["strikeOuts"]
-        - input_df["homeRuns"]
-        + input_df["sacFlies"]
-    )  # following MLB's formula
+    # following MLB's formula, as defined in the rate stats catalog
+    input_df["babip"] = recompute_rate_stats(input_df, ["babip"])["babip"]
 
     logger.debug("babip_calculation_completed")
     return input_df
@@ -140,3 +160,261 @@ def create_dif_strike_outs_base_on_balls(input_df: pd.DataFrame) -> pd.DataFrame
         input_df["strikeOuts"] - input_df["baseOnBalls"]
     )
     return input_df
+
+
+def compute_league_statistics(
+    input_df: pd.DataFrame, feature_name_list: list
+) -> pd.DataFrame:
+    """Computes the league's mean and standard deviation of every feature.
+
+    Args:
+        input_df (pd.DataFrame)
+        feature_name_list (list)
+
+    Returns:
+        pd.DataFrame: mean and std columns, indexed by feature name
+    """
+    values = input_df[feature_name_list].to_numpy(dtype=float, na_value=np.nan)
+    non_null_count = np.count_nonzero(~np.isnan(values), axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = np.nansum(values, axis=0) / non_null_count
+        stds = np.sqrt(np.nansum((values - means) ** 2, axis=0) / (non_null_count - 1))
+    return pd.DataFrame(
+        {
+            "mean": means,
+            # matching pandas, the std of less than two values is undefined
+            "std": np.where(non_null_count > 1, stds, np.nan),
+        },
+        index=pd.Index(feature_name_list, name="feature"),
+    )
+
+
+def compute_ratio_features(
+    input_df: pd.DataFrame,
+    feature_name_list: list,
+    denominator_name: str,
+    suffix: str,
+) -> pd.DataFrame:
+    """Divides every feature by the denominator column in a single matrix
+    operation. Ratios over a zero denominator are NaN, like the rate stats.
+
+    Args:
+        input_df (pd.DataFrame)
+        feature_name_list (list)
+        denominator_name (str): Column dividing the features
+        suffix (str): Appended to the feature names to name the ratios
+
+    Returns:
+        pd.DataFrame: Ratio features only, with the index of input_df
+    """
+    values = input_df[feature_name_list].to_numpy(dtype=float, na_value=np.nan)
+    denominator = input_df[denominator_name].to_numpy(dtype=float, na_value=np.nan)
+    return pd.DataFrame(
+        safe_divide(values, denominator[:, np.newaxis]),
+        index=input_df.index,
+        columns=[feature_name + suffix for feature_name in feature_name_list],
+    )
+
+
+def compute_innings_pitched_features(
+    input_df: pd.DataFrame, feature_name_list: list
+) -> pd.DataFrame:
+    """Divides every feature by the true number of innings pitched, where
+    "123.1" means 123 innings and one out rather than a tenth of an inning.
+
+    Args:
+        input_df (pd.DataFrame)
+        feature_name_list (list)
+
+    Returns:
+        pd.DataFrame: Ratio features only, with the index of input_df
+    """
+    return compute_ratio_features(
+        input_df[feature_name_list].assign(
+            inningsPitched=parse_innings_pitched(input_df["inningsPitched"])
+        ),
+        feature_name_list,
+        "inningsPitched",
+        "inningsPitched",
+    )
+
+
+def compute_mean_normalization_features(
+    input_df: pd.DataFrame, league_statistics: pd.DataFrame
+) -> pd.DataFrame:
+    """Normalizes the features of the league statistics by the league's mean
+    (set to 100) and computes their z-scores in a single matrix operation.
+
+    Args:
+        input_df (pd.DataFrame)
+        league_statistics (pd.DataFrame): As returned by compute_league_statistics
+
+    Returns:
+        pd.DataFrame: normalized_ and _z_score features only, with the index of
+        input_df
+    """
+    feature_name_list = list(league_statistics.index)
+    values = input_df[feature_name_list].to_numpy(dtype=float, na_value=np.nan)
+    means = league_statistics["mean"].to_numpy()
+    stds = league_statistics["std"].to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        normalized_values = 100 * (values / means)
+        z_scores = (values - means) / stds
+    return pd.DataFrame(
+        np.hstack([normalized_values, z_scores]),
+        index=input_df.index,
+        columns=["normalized_" + feature_name for feature_name in feature_name_list]
+        + [feature_name + "_z_score" for feature_name in feature_name_list],
+    )
+
+
+def create_normalized_features(
+    input_df: pd.DataFrame,
+    plate_appearance_feature_list: list | None = None,
+    innings_pitched_feature_list: list | None = None,
+    mean_feature_list: list | None = None,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Generates the plate appearance, innings pitched and mean normalizations
+    of the requested features and attaches them to the input with a single concat.
+    The normalized features are computed from the columns of input_df.
+
+    Args:
+        input_df (pd.DataFrame)
+        plate_appearance_feature_list (list | None)
+        innings_pitched_feature_list (list | None)
+        mean_feature_list (list | None)
+
+    Returns:
+        pd.DataFrame: input_df with the normalized features
+        pd.DataFrame: League's mean and std of the mean normalized features
+    """
+    feature_frames = []
+    if plate_appearance_feature_list:
+        feature_frames.append(
+            compute_ratio_features(
+                input_df,
+                plate_appearance_feature_list,
+                "plateAppearances",
+                "perplateAppearance",
+            )
+        )
+    if innings_pitched_feature_list:
+        feature_frames.append(
+            compute_innings_pitched_features(input_df, innings_pitched_feature_list)
+        )
+
+    league_statistics = compute_league_statistics(input_df, mean_feature_list or [])
+    if mean_feature_list:
+        feature_frames.append(
+            compute_mean_normalization_features(input_df, league_statistics)
+        )
+
+    logger.debug(
+        "normalized_features_created",
+        features_created=sum(frame.shape[1] for frame in feature_frames),
+        data_shape=input_df.shape,
+    )
+    return pd.concat([input_df, *feature_frames], axis=1), league_statistics
+
+
+def get_grouped_normalization_feature_names(
+    feature_name_list: list, group_keys: list
+) -> list[str]:
+    """Returns the names of the grouped normalized features and z-scores, e.g.
+    normalized_hits_by_team_id and hits_z_score_by_team_id.
+
+    Args:
+        feature_name_list (list)
+        group_keys (list): Columns whose groups the features are normalized within
+
+    Returns:
+        list[str]
+    """
+    return [
+        f"normalized_{feature_name}_by_{group_key}"
+        for group_key in group_keys
+        for feature_name in feature_name_list
+    ] + [
+        f"{feature_name}_z_score_by_{group_key}"
+        for group_key in group_keys
+        for feature_name in feature_name_list
+    ]
+
+
+def compute_grouped_statistics(
+    input_df: pd.DataFrame, feature_name_list: list, group_keys: list
+) -> pd.DataFrame:
+    """Computes the mean and standard deviation of every feature within the
+    groups of every grouping key, e.g. within every team.
+
+    Args:
+        input_df (pd.DataFrame)
+        feature_name_list (list)
+        group_keys (list): Columns whose groups the statistics are computed within
+
+    Returns:
+        pd.DataFrame: mean and std columns, indexed by group key, group and
+        feature name
+    """
+    values_df = input_df[feature_name_list].astype(float)
+    key_statistics = {}
+    for group_key in group_keys:
+        grouped_values = values_df.groupby(input_df[group_key].to_numpy(), sort=True)
+        key_statistics[group_key] = pd.concat(
+            {"mean": grouped_values.mean(), "std": grouped_values.std()}, axis=1
+        ).stack(level=1, future_stack=True)
+    return pd.concat(key_statistics, names=["group_key", "group", "feature"])
+
+
+def compute_grouped_normalization_features(
+    input_df: pd.DataFrame,
+    grouped_statistics: pd.DataFrame,
+    feature_name_list: list,
+    group_keys: list,
+) -> pd.DataFrame:
+    """Normalizes the features by the mean (set to 100) of the player's group
+    and computes their z-scores within it, for every grouping key at once.
+
+    The statistics of every key are broadcast to the rows of their group by
+    position, so each key costs a single indexing operation.
+
+    Args:
+        input_df (pd.DataFrame)
+        grouped_statistics (pd.DataFrame): As returned by compute_grouped_statistics
+        feature_name_list (list)
+        group_keys (list): Columns whose groups the features are normalized within
+
+    Returns:
+        pd.DataFrame: Grouped normalized features only, named as in
+        get_grouped_normalization_feature_names, with the index of input_df
+    """
+    values = input_df[feature_name_list].to_numpy(dtype=float, na_value=np.nan)
+    group_keys_level = grouped_statistics.index.get_level_values("group_key")
+    normalized_values = []
+    z_scores = []
+    for group_key in group_keys:
+        key_statistics = grouped_statistics[group_keys_level == group_key].droplevel(
+            "group_key"
+        )
+        group_means_df = (
+            key_statistics["mean"].unstack("feature").reindex(columns=feature_name_list)
+        )
+        group_stds_df = (
+            key_statistics["std"]
+            .unstack("feature")
+            .reindex(index=group_means_df.index, columns=feature_name_list)
+        )
+        # a trailing row of NaN for the players whose group has no statistics
+        missing_row = np.full((1, len(feature_name_list)), np.nan)
+        group_means = np.vstack([group_means_df.to_numpy(dtype=float), missing_row])
+        group_stds = np.vstack([group_stds_df.to_numpy(dtype=float), missing_row])
+        positions = group_means_df.index.get_indexer(input_df[group_key].to_numpy())
+        with np.errstate(divide="ignore", invalid="ignore"):
+            normalized_values.append(100 * (values / group_means[positions]))
+            z_scores.append((values - group_means[positions]) / group_stds[positions])
+
+    return pd.DataFrame(
+        np.hstack(normalized_values + z_scores),
+        index=input_df.index,
+        columns=get_grouped_normalization_feature_names(feature_name_list, group_keys),
+    )
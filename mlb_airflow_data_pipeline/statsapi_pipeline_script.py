@@ -0,0 +1,322 @@
+import argparse
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from types import TracebackType
+from typing import Optional
+
+import pandas as pd
+from pydantic import BaseModel
+
+from mlb_airflow_data_pipeline.arrow_ipc_utils import (
+    get_arrow_ipc_path,
+    write_arrow_ipc,
+)
+from mlb_airflow_data_pipeline.db_utils import cast_stat_columns, create_connection
+from mlb_airflow_data_pipeline.percentile_rank_utils import (
+    compute_percentile_ranks,
+    get_percentile_ranks_path,
+)
+from mlb_airflow_data_pipeline.statsapi_analysis_script import (
+    DataPlotter,
+    batter_tuple_variable_list,
+    pitcher_tuple_variable_list,
+)
+from mlb_airflow_data_pipeline.statsapi_extraction_script import (
+    DATE_TIME_EXECUTION,
+    extract_league_data,
+    persist_league_data,
+)
+from mlb_airflow_data_pipeline.statsapi_parameters_script import (
+    DATA_FILE_LOCATION,
+    LEAGUE_NAME,
+    OUTPUT_FILE_LOCATION,
+)
+from mlb_airflow_data_pipeline.statsapi_treatment_script import (
+    DataPaths,
+    TreatmentJob,
+    player_input_data_reprs,
+    run_treatment,
+)
+from mlb_airflow_data_pipeline.logging_setup import get_logger
+
+# Initialize structured logger
+logger = get_logger("statsapi_pipeline", league=LEAGUE_NAME)
+
+# key of the extracted stats among the DataFrames of a pipeline run
+FULL_PLAYER_STATS = "full_player_stats"
+
+# player types plotted by the analysis, with their pairs of variables
+player_plot_variables = {
+    "batter": batter_tuple_variable_list,
+    "pitcher": pitcher_tuple_variable_list,
+}
+
+
+class PipelineRun(BaseModel):
+    league_name: str = LEAGUE_NAME
+    date: str = DATE_TIME_EXECUTION
+    # whether the extracted and treated data are also written as handoff files,
+    # in the background, for the report and later reruns of single stages
+    persist_intermediates: bool = False
+    plot: bool = True
+    compact_memory: bool = False
+    data_location: str = DATA_FILE_LOCATION
+    output_location: str = OUTPUT_FILE_LOCATION
+
+    @property
+    def treatment_job(self) -> TreatmentJob:
+        """Treatment job whose input and output paths the intermediates use."""
+        return TreatmentJob(
+            league_name=self.league_name,
+            date=self.date,
+            compact_memory=self.compact_memory,
+            data_location=self.data_location,
+        )
+
+
+class IntermediatePersister:
+    """Writes the intermediate DataFrames of a pipeline run as CSV and Arrow
+    IPC handoff files, and the extracted data to the database, from a
+    background thread, so that the next stages do not wait for the disk.
+
+    The submitted DataFrames are shared with the next stages and must not be
+    modified. Closing the persister, including when leaving its context
+    because of an exception, waits for every submitted file to be written.
+    """
+
+    def __init__(self) -> None:
+        self.executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="intermediate-persister"
+        )
+        self.futures: list[Future] = []
+
+    def __enter__(self) -> "IntermediatePersister":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close(raise_error=exc_type is None)
+
+    def submit(self, df: pd.DataFrame, path: str) -> None:
+        """Queues a DataFrame to be written as a CSV file and the Arrow IPC
+        file next to it.
+
+        Args:
+            df: DataFrame to write, which must not be modified afterwards
+            path: Path of the CSV file
+        """
+        self.futures.append(self.executor.submit(_write_handoff_files, df, path))
+
+    def submit_league_data(
+        self,
+        league_standings_df: pd.DataFrame,
+        player_stats_df: pd.DataFrame,
+        pipeline_run: "PipelineRun",
+    ) -> None:
+        """Queues the extracted data of a league to be persisted in the
+        database of the run's data location, like the staged extraction does.
+
+        Args:
+            league_standings_df: Extracted league standings, which must not be
+                modified afterwards
+            player_stats_df: Extracted player stats, which must not be
+                modified afterwards
+            pipeline_run: League, date and data location of the run
+        """
+        self.futures.append(
+            self.executor.submit(
+                _write_league_data, league_standings_df, player_stats_df, pipeline_run
+            )
+        )
+
+    def close(self, raise_error: bool = True) -> list[str]:
+        """Waits for every submitted file to be written and stops the thread.
+
+        Args:
+            raise_error: Whether to raise the first error of a failed write
+
+        Returns:
+            list[str]: Paths of the CSV files and databases written
+
+        Raises:
+            Exception: If a write failed and raise_error is True
+        """
+        self.executor.shutdown(wait=True)
+        errors = [future.exception() for future in self.futures]
+        written_paths = [
+            future.result()
+            for future, error in zip(self.futures, errors)
+            if error is None
+        ]
+        logger.info(
+            "intermediates_persisted",
+            files_count=len(written_paths),
+            failed_count=len(self.futures) - len(written_paths),
+        )
+        first_error = next((error for error in errors if error is not None), None)
+        if raise_error and first_error is not None:
+            raise first_error
+        return written_paths
+
+
+def _write_handoff_files(df: pd.DataFrame, path: str) -> str:
+    df.to_csv(path)
+    write_arrow_ipc(df, get_arrow_ipc_path(path))
+    logger.debug("intermediate_persisted", file_path=path, data_shape=df.shape)
+    return path
+
+
+def _write_league_data(
+    league_standings_df: pd.DataFrame,
+    player_stats_df: pd.DataFrame,
+    pipeline_run: "PipelineRun",
+) -> str:
+    db_path = os.path.join(pipeline_run.data_location, "mlb_data.db")
+    # the connection is opened by the thread which uses it
+    with create_connection(db_path) as conn:
+        persist_league_data(
+            conn,
+            league_standings_df,
+            player_stats_df,
+            pipeline_run.league_name,
+            pipeline_run.date,
+        )
+    return db_path
+
+
+def extract_player_stats(
+    pipeline_run: PipelineRun,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Extracts the current standings and stats of every player of a league
+    from statsapi, dated with the run's date, without persisting them.
+
+    Args:
+        pipeline_run (PipelineRun): League and date of the run
+
+    Returns:
+        pd.DataFrame: League standings
+        pd.DataFrame: Player stats indexed by player id, as text
+    """
+    league_standings_df, player_stats_df, _, failed_teams = extract_league_data(
+        pipeline_run.league_name, pipeline_run.date
+    )
+    if failed_teams:
+        logger.error("teams_extraction_failed", failed_teams=failed_teams)
+    return league_standings_df, player_stats_df
+
+
+def run_pipeline(
+    pipeline_run: PipelineRun, player_stats_df: Optional[pd.DataFrame] = None
+) -> dict[str, pd.DataFrame]:
+    """Runs the extraction, the treatment of every player type and the
+    analysis plots in a single process, handing the DataFrames from one stage
+    to the next in memory instead of through files. Only when the run persists
+    its intermediates are the extracted data also written to the database of
+    its data location, in the background with the handoff files.
+
+    Args:
+        pipeline_run (PipelineRun): League, date and options of the run
+        player_stats_df (Optional[pd.DataFrame]): Stats already extracted and
+        persisted, extracted from statsapi if None
+
+    Returns:
+        dict[str, pd.DataFrame]: Typed extracted stats under "full_player_stats"
+        and treated data per player type
+    """
+    logger.info(
+        "pipeline_started",
+        league=pipeline_run.league_name,
+        date=pipeline_run.date,
+        persist_intermediates=pipeline_run.persist_intermediates,
+    )
+    league_standings_df = None
+    if player_stats_df is None:
+        league_standings_df, player_stats_df = extract_player_stats(pipeline_run)
+    # the stats are typed as if read back from a file by the treatment
+    input_data = cast_stat_columns(player_stats_df)
+
+    treatment_job = pipeline_run.treatment_job
+    output_paths = treatment_job.get_output_paths()
+    with IntermediatePersister() as persister:
+        if pipeline_run.persist_intermediates:
+            if league_standings_df is not None:
+                persister.submit_league_data(
+                    league_standings_df, player_stats_df, pipeline_run
+                )
+            persister.submit(input_data, treatment_job.input_path)
+
+        output_data = run_treatment(
+            DataPaths(league_name=pipeline_run.league_name, date=pipeline_run.date),
+            [
+                (player_type, input_parameters, None)
+                for player_type, input_parameters in player_input_data_reprs.items()
+            ],
+            compact_memory=pipeline_run.compact_memory,
+            input_data=input_data,
+        )
+
+        if pipeline_run.persist_intermediates:
+            for player_type, player_type_data in output_data.items():
+                output_path = output_paths[player_type]
+                persister.submit(player_type_data, output_path)
+                persister.submit(
+                    compute_percentile_ranks(player_type_data),
+                    get_percentile_ranks_path(output_path),
+                )
+
+        # matplotlib is not thread-safe, the plots are drawn one at a time
+        if pipeline_run.plot:
+            for player_type, representable_variables in player_plot_variables.items():
+                DataPlotter(
+                    data_paths=DataPaths(
+                        path_to_output_data=pipeline_run.output_location
+                        + treatment_job.output_details
+                    ),
+                    representable_variables=representable_variables,
+                    input_data=output_data[player_type],
+                ).set_plots()
+
+    logger.info(
+        "pipeline_completed",
+        league=pipeline_run.league_name,
+        date=pipeline_run.date,
+        players_total=len(input_data),
+    )
+    return {FULL_PLAYER_STATS: input_data, **output_data}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Runs extraction, treatment and analysis in a single process",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+
+    parser.add_argument("--league_name", type=str, default=LEAGUE_NAME)
+    parser.add_argument(
+        "--persist_intermediates",
+        action="store_true",
+        help="Also write the extracted data to the database and the extracted "
+        "and treated data as handoff files",
+    )
+    parser.add_argument("--no_plots", action="store_true")
+    parser.add_argument(
+        "--compact_memory",
+        action="store_true",
+        help="Treat the data with compact dtypes to reduce memory usage",
+    )
+
+    args = parser.parse_args()
+    config = vars(args)
+
+    run_pipeline(
+        PipelineRun(
+            league_name=config["league_name"],
+            persist_intermediates=config["persist_intermediates"],
+            plot=not config["no_plots"],
+            compact_memory=config["compact_memory"],
+        )
+    )
@@ -1,5 +1,6 @@
 import glob
 from datetime import datetime
+from typing import Optional
 
 import matplotlib
 import matplotlib.pyplot as plt
@@ -7,6 +8,13 @@ import pandas as pd
 from matplotlib.ticker import MaxNLocator
 from pydantic import BaseModel
 
+from mlb_airflow_data_pipeline.arrow_ipc_utils import read_handoff_data
+from mlb_airflow_data_pipeline.storage_backends import (
+    LEAGUE_STANDINGS_TABLE_NAME,
+    PLAYER_STATS_TABLE_NAME,
+    StorageBackend,
+    get_storage_backend,
+)
 from mlb_airflow_data_pipeline.statsapi_parameters_script import (
     DATA_FILE_LOCATION,
     LEAGUE_NAME_LOCATION,
@@ -28,9 +36,23 @@ class PlotterInputRepresentation(BaseModel):
     n_best: int
 
 
+# datasets whose snapshots are also kept by the storage backends
+STORAGE_BACKEND_TABLE_NAMES = {
+    "full_player_stats": PLAYER_STATS_TABLE_NAME,
+    "league_standings": LEAGUE_STANDINGS_TABLE_NAME,
+}
+
+
 class PlotGenerator:
-    def __init__(self, input_parameters: PlotterInputRepresentation):
+    def __init__(
+        self,
+        input_parameters: PlotterInputRepresentation,
+        storage_backend: Optional[StorageBackend] = None,
+    ):
         self.input_parameters = input_parameters
+        # if given, the datasets it keeps are read from it in a single query
+        # instead of one file per date
+        self.storage_backend = storage_backend
         self.time_series_datasets: dict[str, list] = {
             stat: [] for stat in self.input_parameters.time_series_stats_is_int.keys()
         }
@@ -59,20 +81,53 @@ class PlotGenerator:
 
         """
 
-        filenames = self._get_filenames()
-
-        for file in filenames:
-            self._generate_data_from_file(file=file)
+        dataset_name = self.input_parameters.dataset_name
+        if (
+            self.storage_backend is not None
+            and dataset_name in STORAGE_BACKEND_TABLE_NAMES
+        ):
+            backend_dates = self._generate_data_from_storage_backend(
+                self.storage_backend, STORAGE_BACKEND_TABLE_NAMES[dataset_name]
+            )
+            # the dates extracted before the backend kept the dataset, or that
+            # it misses, are still read from their files
+            for file in self._get_filenames():
+                if get_file_date(file) not in backend_dates:
+                    self._generate_data_from_file(file=file)
+        else:
+            for file in self._get_filenames():
+                self._generate_data_from_file(file=file)
 
         time_series: dict[str, pd.DataFrame] = self._get_time_series()
 
         return time_series
 
     def _generate_data_from_file(self, file: str) -> None:
-        filename = file.split("/")[-1]
-        date = filename.split("_")[2]
-        date_df = pd.read_csv(file)
-        date_df.rename(columns={"playername": "name"}, inplace=True)
+        self._generate_data_from_dataframe(read_handoff_data(file), get_file_date(file))
+
+    def _generate_data_from_storage_backend(
+        self, storage_backend: StorageBackend, table_name: str
+    ) -> set[str]:
+        name_column = "playername" if table_name == PLAYER_STATS_TABLE_NAME else "name"
+        stats = list(self.input_parameters.time_series_stats_is_int.keys())
+        if self.input_parameters.dataset_name == "league_standings":
+            # the win ratio is derived from the wins and losses
+            stats = ["w", "l"] + [stat for stat in stats if stat != "win-total-ratio"]
+        with storage_backend.connect() as conn:
+            dataset_df = storage_backend.read(
+                conn,
+                table_name,
+                columns=["date", name_column] + list(dict.fromkeys(stats)),
+                filters=[("league", "==", LEAGUE_NAME)],
+            )
+        for date, date_df in dataset_df.groupby("date", sort=True):
+            self._generate_data_from_dataframe(
+                date_df.drop(columns=["date"]), str(date)
+            )
+        return set(dataset_df["date"].astype(str))
+
+    def _generate_data_from_dataframe(self, date_df: pd.DataFrame, date: str) -> None:
+        date_df = date_df.rename(columns={"playername": "name"})
 
         dataset_name = self.input_parameters.dataset_name
         if dataset_name == "league_standings":
@@ -93,6 +148,7 @@ class PlotGenerator:
                 columns=["index"]
             )
             time_series[day].index = pd.to_datetime(time_series[day].index)
+            time_series[day] = time_series[day].sort_index()
 
         return time_series
 
@@ -139,6 +195,17 @@ class PlotGenerator:
         return filenames
 
 
+def get_file_date(file: str) -> str:
+    """Returns the date of a dataset file named {league}_{date}_{dataset}_df.csv
+
+    Args:
+        file (str): Path of the file
+    Returns:
+        str
+    """
+    return file.split("/")[-1].split("_")[2]
+
+
 def sorting_and_index_reset(input_df: pd.DataFrame, date: str) -> pd.DataFrame:
     """Sorting by team name, adding date as a column and then setting it as
     an index
@@ -194,7 +261,10 @@ batter_input_parameters = PlotterInputRepresentation(
 
 
 if __name__ == "__main__":
-    league_plot_generator = PlotGenerator(input_parameters=league_input_parameters)
+    league_plot_generator = PlotGenerator(
+        input_parameters=league_input_parameters,
+        storage_backend=get_storage_backend(),
+    )
     league_plot_generator.get_time_series_stats_plots()
     batter_plot_generator = PlotGenerator(input_parameters=batter_input_parameters)
     batter_plot_generator.get_time_series_stats_plots()
@@ -1,20 +1,56 @@
 import argparse
-from typing import Optional
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Literal, Optional, Sequence
 
-import numpy as np
 import pandas as pd
 from pydantic import BaseModel
 
+from mlb_airflow_data_pipeline.arrow_ipc_utils import (
+    get_arrow_ipc_path,
+    read_handoff_data,
+    write_arrow_ipc,
+)
+from mlb_airflow_data_pipeline.db_utils import create_connection, get_database_path
+from mlb_airflow_data_pipeline.dtype_utils import compact_dtypes
+from mlb_airflow_data_pipeline.filter_expression_utils import (
+    OR_KEY,
+    compile_filter_conditions,
+)
+from mlb_airflow_data_pipeline.star_schema_utils import (
+    count_player_stats_facts,
+    get_player_stats_facts_digest,
+    read_player_stats_facts,
+)
+from mlb_airflow_data_pipeline.streaming_stats_utils import (
+    GroupedRunningStatistics,
+    RunningStatistics,
+)
 from mlb_airflow_data_pipeline.statsapi_extraction_script import (
     DATE_TIME_EXECUTION,
-    PLAYER_DATA_FILE_NAME,
 )
-from mlb_airflow_data_pipeline.statsapi_feature_utils import (
-    create_babip,
-    create_dif_strike_outs_base_on_balls,
-    create_innings_pitched_normalization,
-    create_mean_normalization,
-    create_plate_appearance_normalization,
+from mlb_airflow_data_pipeline.feature_graph_utils import (
+    GROUPED_NORMALIZATION_FEATURE_NAME,
+    MEAN_NORMALIZATION_FEATURE_NAME,
+    FeatureDefinition,
+    FeatureEngine,
+    babip_feature,
+    dif_strike_outs_base_on_balls_feature,
+    grouped_normalization_feature,
+    innings_pitched_feature,
+    mean_normalization_feature,
+    plate_appearance_feature,
+    rate_stats_feature,
+)
+from mlb_airflow_data_pipeline.percentile_rank_utils import (
+    compute_percentile_ranks,
+    get_percentile_ranks_path,
+)
+from mlb_airflow_data_pipeline.feature_store_utils import (
+    FeatureStore,
+    compute_config_hash,
 )
 from mlb_airflow_data_pipeline.statsapi_parameters_script import (
     BATTING_STATS,
@@ -34,19 +70,25 @@ DATA_FILTER_THRESHOLD = 0.6
 
 
 OUTPUT_DETAILS = f"{LEAGUE_NAME}_{DATE_TIME_EXECUTION}"
-BATTER_DATA_FILE_NAME = f"{OUTPUT_DETAILS}_batter_stats_df.csv"
-PITCHER_DATA_FILE_NAME = f"{OUTPUT_DETAILS}_pitcher_stats_df.csv"
 
 
 class DataPaths(BaseModel):
-    path_to_input_data: str
+    path_to_input_data: Optional[str] = None
     path_to_output_data: Optional[str] = None
+    # with the "database" input source, the snapshot of league_name and date
+    # is read from the player stats fact table instead of path_to_input_data
+    input_source: Literal["csv", "database"] = "csv"
+    path_to_database: Optional[str] = None
+    league_name: Optional[str] = None
+    date: Optional[str] = None
 
 
 class DataTreaterInputRepresentation(BaseModel):
     subset_columns: list
     filter_conditions_dict: dict
-    transformation_dict: dict
+    features: list[FeatureDefinition]
+    # output columns of the features to compute, all of them by default
+    requested_features: Optional[list[str]] = None
 
 
 class DataTreater:
@@ -54,11 +96,33 @@ class DataTreater:
         self,
         data_paths: DataPaths,
         input_parameters: DataTreaterInputRepresentation,
+        input_data: Optional[pd.DataFrame] = None,
+        feature_engine: Optional[FeatureEngine] = None,
+        feature_store: Optional[FeatureStore] = None,
+        compact_memory: bool = False,
     ):
         self.data_paths = data_paths
         self.input_parameters = input_parameters
-
-    def set_output_data_file(self) -> None:
+        # preloaded input shared between treaters, which must not modify it
+        self.input_data = input_data
+        # engine shared between treaters to memoize the common features
+        self.feature_engine = (
+            FeatureEngine() if feature_engine is None else feature_engine
+        )
+        # cache of the treated outputs, skipping unchanged reruns
+        self.feature_store = feature_store
+        # whether the loaded input is downcast to compact dtypes
+        self.compact_memory = compact_memory
+        # league's mean and std of the mean normalized features,
+        # set by get_output_data
+        self.league_statistics: Optional[pd.DataFrame] = None
+        # percentile ranks of the output stats, set by set_output_data_file
+        self.percentile_ranks: Optional[pd.DataFrame] = None
+        # records of the snapshot before the filters pushed down to the
+        # database, set when the input is read from it
+        self.records_total: Optional[int] = None
+
+    def set_output_data_file(self) -> pd.DataFrame:
         output_data = self.get_output_data()
         output_path = self.data_paths.path_to_output_data
         output_data.to_csv(output_path)  # type: ignore
@@ -68,32 +132,81 @@ class DataTreater:
             data_shape=output_data.shape,
             columns=list(output_data.columns[:5]),  # First 5 columns for brevity
         )
+        # the next stages memory-map this file instead of parsing the csv
+        arrow_ipc_path = write_arrow_ipc(
+            output_data,
+            get_arrow_ipc_path(output_path),  # type: ignore
+        )
+        logger.info("output_arrow_ipc_file_generated", file_path=arrow_ipc_path)
+
+        if self.league_statistics is not None and not self.league_statistics.empty:
+            league_statistics_path = get_league_statistics_path(output_path)  # type: ignore
+            self.league_statistics.to_csv(league_statistics_path)
+            logger.info(
+                "league_statistics_file_generated",
+                file_path=league_statistics_path,
+                features_count=len(self.league_statistics),
+            )
+
+        self.percentile_ranks = compute_percentile_ranks(output_data)
+        percentile_ranks_path = get_percentile_ranks_path(output_path)  # type: ignore
+        self.percentile_ranks.to_csv(percentile_ranks_path)
+        write_arrow_ipc(
+            self.percentile_ranks, get_arrow_ipc_path(percentile_ranks_path)
+        )
+        logger.info(
+            "percentile_ranks_file_generated",
+            file_path=percentile_ranks_path,
+            stats_count=self.percentile_ranks.shape[1],
+        )
+        return output_data
 
     def get_output_data(self) -> pd.DataFrame:
-        filtered_data = self.get_filter_data()
+        subset_data = self.get_subset_data()
+
+        feature_store_key = None
+        if self.feature_store is not None:
+            feature_store_key = self.feature_store.get_key(
+                self.data_paths.league_name,
+                self.data_paths.date,
+                subset_data,
+                self.input_parameters,
+            )
+            cached_output = self.feature_store.get(feature_store_key)
+            if cached_output is not None:
+                output_data, self.league_statistics = cached_output
+                return output_data
 
-        transformation_dict = self.input_parameters.transformation_dict
+        filtered_data = self.get_filter_data(subset_data)
 
-        for function in transformation_dict.keys():
-            if transformation_dict[function]:
-                filtered_data = function(
-                    filtered_data,
-                    transformation_dict[function],
-                )
-            else:
-                filtered_data = function(filtered_data)
+        output_data, statistics = self.feature_engine.compute(
+            filtered_data,
+            self.input_parameters.features,
+            self.input_parameters.requested_features,
+        )
+        self.league_statistics = statistics.get(MEAN_NORMALIZATION_FEATURE_NAME)
+
+        if feature_store_key is not None:
+            self.feature_store.put(  # type: ignore
+                feature_store_key, output_data, self.league_statistics
+            )
 
         logger.info(
             "data_transformation_completed",
-            transformations_applied=len(
-                [k for k, v in transformation_dict.items() if v]
-            ),
+            features_declared=len(self.input_parameters.features),
+            output_shape=output_data.shape,
         )
-        return filtered_data
+        return output_data
 
-    def get_filter_data(self) -> pd.DataFrame:
+    def get_filter_data(
+        self, subset_data: Optional[pd.DataFrame] = None
+    ) -> pd.DataFrame:
+        if subset_data is None:
+            subset_data = self.get_subset_data()
         filtered_data = filter_data(
-            self.get_subset_data(), self.input_parameters.filter_conditions_dict
+            subset_data,
+            self.input_parameters.filter_conditions_dict,
+            self.records_total,
         )
         logger.info("data_filtering_completed", filtered_shape=filtered_data.shape)
         return filtered_data
@@ -108,39 +221,133 @@ class DataTreater:
         return intermediate_data
 
     def get_input_data(self) -> pd.DataFrame:
-        input_data = pd.read_csv(self.data_paths.path_to_input_data, index_col=0)
+        if self.input_data is not None:
+            return self.input_data
+
+        if self.data_paths.input_source == "database":
+            input_data = self.get_database_input_data()
+        else:
+            input_data = read_handoff_data(self.data_paths.path_to_input_data)  # type: ignore
+            logger.info(
+                "data_input_loaded",
+                file_path=self.data_paths.path_to_input_data,
+                data_shape=input_data.shape,
+            )
+
+        if self.compact_memory:
+            input_data = compact_dtypes(input_data)
+        return input_data
+
+    def get_database_input_data(self) -> pd.DataFrame:
+        """Reads the snapshot of the requested league and date from the player
+        stats fact table, with numeric stat columns. Only the stat columns in
+        subset_columns and the rows matching filter_conditions_dict are read.
+
+        Returns:
+            pd.DataFrame: Player stats indexed by player id
+        """
+        league_name = self.data_paths.league_name
+        date = self.data_paths.date
+        if league_name is None or date is None:
+            raise ValueError(
+                "The database input source requires a league_name and date"
+            )
+
+        stat_columns = [
+            col
+            for col in self.input_parameters.subset_columns
+            if col not in PLAYER_INFORMATION
+        ]
+        # the filters are evaluated by the database, so that the discarded
+        # rows are never loaded
+        filter_expression = None
+        if self.input_parameters.filter_conditions_dict:
+            filter_expression = compile_filter_conditions(
+                self.input_parameters.filter_conditions_dict
+            )
+        path_to_database = self.data_paths.path_to_database or get_database_path()
+        with create_connection(path_to_database) as conn:
+            if filter_expression is not None:
+                self.records_total = count_player_stats_facts(
+                    conn, date=date, league_name=league_name
+                )
+            input_data = read_player_stats_facts(
+                conn,
+                date=date,
+                league_name=league_name,
+                columns=stat_columns,
+                filter_expression=filter_expression,
+            )
+
         logger.info(
             "data_input_loaded",
-            file_path=self.data_paths.path_to_input_data,
+            database_path=path_to_database,
+            league=league_name,
+            date=date,
             data_shape=input_data.shape,
+            records_total=self.records_total,
         )
         return input_data
 
 
-def filter_data(input_df: pd.DataFrame, conditions_dict: dict) -> pd.DataFrame:
+def get_league_statistics_path(output_path: str) -> str:
+    """Returns the path of the league statistics side table of an output file,
+    e.g. national_league_2023-06-01_batter_stats_df_league_statistics.csv.
+    """
+    path = Path(output_path)
+    return str(path.with_name(f"{path.stem}_league_statistics{path.suffix}"))
+
+
+def filter_data(
+    input_df: pd.DataFrame,
+    conditions_dict: dict,
+    records_total: Optional[int] = None,
+) -> pd.DataFrame:
     """Filter data from the input DataFrame as specified by the conditions.
     Raises a warning at runtime if the percentage of good data is below a certain threshold
 
+    The conditions are compiled into a single mask, see compile_filter_conditions
+    for the supported ranges, equalities and "or" groups.
+
     Args:
         input_df (pd.DataFrame)
         conditions_dict (dict)
+        records_total (Optional[int]): Number of records before any filtering,
+        when some were already discarded by the database. Defaults to the
+        length of input_df
 
     Returns:
         pd.DataFrame
     """
-    conditions = np.logical_and.reduce(
-        [(input_df[key] >= value) for key, value in conditions_dict.items()]
-    )
+    conditions = compile_filter_conditions(conditions_dict).evaluate(input_df)
 
     return_df = input_df[conditions].copy()
 
-    good_data_percentage = len(return_df) / len(input_df)
+    if records_total is None:
+        records_total = len(input_df)
+    check_data_quality(len(return_df), records_total, conditions_dict)
+
+    return return_df
+
+
+def check_data_quality(
+    records_kept: int, records_total: int, conditions_dict: dict
+) -> None:
+    """Logs the percentage of records kept by the filters, with a warning if
+    it is below DATA_FILTER_THRESHOLD.
+
+    Args:
+        records_kept (int): Number of records kept by the filters
+        records_total (int): Number of records before any filtering
+        conditions_dict (dict)
+    """
+    good_data_percentage = records_kept / records_total if records_total else 0.0
 
     logger.info(
         "data_quality_check",
         good_data_percentage=round(good_data_percentage, 3),
-        records_kept=len(return_df),
-        records_total=len(input_df),
+        records_kept=records_kept,
+        records_total=records_total,
         filter_conditions=conditions_dict,
     )
 
@@ -152,8 +359,263 @@ def filter_data(input_df: pd.DataFrame, conditions_dict: dict) -> pd.DataFrame:
             filter_conditions=conditions_dict,
         )
 
-    return return_df
 
+def run_treatment(
+    data_paths: DataPaths,
+    player_configs: Sequence[tuple[str, DataTreaterInputRepresentation, Optional[str]]],
+    max_workers: Optional[int] = None,
+    feature_store: Optional[FeatureStore] = None,
+    compact_memory: bool = False,
+    input_data: Optional[pd.DataFrame] = None,
+) -> dict[str, pd.DataFrame]:
+    """Loads the input data once and runs the pipeline of every player type
+    concurrently on it, each one writing its own output file. The row-wise
+    features are computed once and shared between the player types.
+
+    The input is shared read-only: every pipeline works on its own subset copy.
+    When it is read from the database, the OR of the filters of the player
+    types is evaluated by the database.
+
+    Args:
+        data_paths (DataPaths): Input data location, the output path is ignored
+        player_configs (Sequence): (player type, input parameters, output path) tuples,
+        no file is written for a player type whose output path is None
+        max_workers (Optional[int]): Number of threads, one per player type by default
+        feature_store (Optional[FeatureStore]): Cache of the treated outputs
+        compact_memory (bool): Whether the input is loaded with compact dtypes
+        input_data (Optional[pd.DataFrame]): Input already in memory, e.g. handed
+        over by the extraction, read from data_paths if None
+
+    Returns:
+        dict[str, pd.DataFrame]: Treated data per player type
+    """
+    subset_columns = list(
+        dict.fromkeys(
+            col
+            for _, input_parameters, _ in player_configs
+            for col in input_parameters.subset_columns
+        )
+    )
+    records_total = None
+    if input_data is None:
+        # the database only returns the rows kept by at least one player type,
+        # unless one of them keeps every row
+        filter_conditions_dict = {}
+        if data_paths.input_source == "database" and all(
+            input_parameters.filter_conditions_dict
+            for _, input_parameters, _ in player_configs
+        ):
+            filter_conditions_dict = {
+                OR_KEY: [
+                    input_parameters.filter_conditions_dict
+                    for _, input_parameters, _ in player_configs
+                ]
+            }
+        input_data_treater = DataTreater(
+            data_paths=data_paths,
+            input_parameters=DataTreaterInputRepresentation(
+                subset_columns=subset_columns,
+                filter_conditions_dict=filter_conditions_dict,
+                features=[],
+            ),
+            compact_memory=compact_memory,
+        )
+        input_data = input_data_treater.get_input_data()
+        records_total = input_data_treater.records_total
+    elif compact_memory:
+        input_data = compact_dtypes(input_data)
+    # features shared by the player types, e.g. ratios of the same stats,
+    # are computed once on the whole input
+    feature_engine = FeatureEngine(input_data[subset_columns])
+
+    def treat_player_type(
+        player_type: str,
+        input_parameters: DataTreaterInputRepresentation,
+        output_path: Optional[str],
+    ) -> pd.DataFrame:
+        logger.info("processing_player_type", player_type=player_type)
+        try:
+            data_treater = DataTreater(
+                data_paths=data_paths.model_copy(
+                    update={"path_to_output_data": output_path}
+                ),
+                input_parameters=input_parameters,
+                input_data=input_data,
+                feature_engine=feature_engine,
+                feature_store=feature_store,
+            )
+            # the good data percentage is taken over the whole snapshot
+            data_treater.records_total = records_total
+            if output_path is None:
+                output_data = data_treater.get_output_data()
+            else:
+                output_data = data_treater.set_output_data_file()
+        except Exception as e:
+            logger.error(
+                "player_type_failed",
+                player_type=player_type,
+                error=str(e),
+                exc_info=True,
+            )
+            raise
+        logger.info("player_type_completed", player_type=player_type)
+        return output_data
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(player_configs)) as executor:
+        futures = {
+            player_type: executor.submit(
+                treat_player_type, player_type, input_parameters, output_path
+            )
+            for player_type, input_parameters, output_path in player_configs
+        }
+        return {player_type: future.result() for player_type, future in futures.items()}
+
+
+def run_chunked_treatment(
+    data_paths: DataPaths,
+    input_parameters: DataTreaterInputRepresentation,
+    chunk_size: int,
+) -> Optional[pd.DataFrame]:
+    """Treats a CSV input too large for memory in chunks of rows.
+
+    A first pass accumulates the league's means and stds of the mean
+    normalized features over the filtered rows, and those of every group for
+    the grouped normalization. A second pass computes the
+    features of every chunk with these statistics and appends the chunk to
+    the output file, so memory stays bounded by the chunk size. The data
+    quality is checked once, on the counts of the whole input.
+
+    The percentile ranks need every row at once, so neither they nor the
+    Arrow IPC handoff are written. Those left by a previous treatment of the
+    same output are deleted, so that readers do not mistake them for this
+    one's.
+
+    Args:
+        data_paths (DataPaths): Paths to the CSV input and output files
+        input_parameters (DataTreaterInputRepresentation): Treatment configuration
+        chunk_size (int): Number of input rows read at once
+
+    Returns:
+        Optional[pd.DataFrame]: League statistics, None if no feature is
+        mean normalized
+
+    Raises:
+        ValueError: If the input is not a CSV file, or a feature other than
+        the mean and grouped normalizations needs statistics of the whole data
+    """
+    if data_paths.input_source != "csv":
+        raise ValueError("The chunked treatment requires the csv input source")
+
+    features = input_parameters.features
+    statistics_features = [
+        definition
+        for definition in features
+        if definition.statistics_function is not None
+    ]
+    for definition in statistics_features:
+        if definition.name not in (
+            MEAN_NORMALIZATION_FEATURE_NAME,
+            GROUPED_NORMALIZATION_FEATURE_NAME,
+        ):
+            raise ValueError(f"Feature {definition.name} cannot be computed in chunks")
+
+    filter_conditions = compile_filter_conditions(
+        input_parameters.filter_conditions_dict
+    )
+
+    def read_chunks():
+        for chunk in pd.read_csv(
+            data_paths.path_to_input_data, index_col=0, chunksize=chunk_size
+        ):
+            chunk = chunk[input_parameters.subset_columns]
+            yield chunk, chunk[filter_conditions.evaluate(chunk)].copy()
+
+    def read_filtered_chunks():
+        for _, filtered_chunk in read_chunks():
+            yield filtered_chunk
+
+    feature_engine = FeatureEngine()
+    running_statistics = {
+        definition.name: GroupedRunningStatistics(
+            [col for col in definition.inputs if col not in definition.group_keys],
+            definition.group_keys,
+        )
+        if definition.group_keys
+        else RunningStatistics(definition.inputs)
+        for definition in statistics_features
+    }
+    if running_statistics:
+        for filtered_chunk in read_filtered_chunks():
+            # the normalized features may themselves be computed, e.g. babip
+            inputs_chunk, _ = feature_engine.compute(
+                filtered_chunk,
+                features,
+                [
+                    col
+                    for definition in statistics_features
+                    for col in definition.inputs
+                ],
+            )
+            for definition in statistics_features:
+                running_statistics[definition.name].update(inputs_chunk)
+
+    statistics = {
+        name: statistics.to_frame() for name, statistics in running_statistics.items()
+    }
+
+    def with_accumulated_statistics(
+        definition: FeatureDefinition,
+    ) -> FeatureDefinition:
+        if definition.name not in statistics:
+            return definition
+        accumulated_statistics = statistics[definition.name]
+        return definition.model_copy(
+            update={"statistics_function": lambda _: accumulated_statistics}
+        )
+
+    chunked_features = [with_accumulated_statistics(d) for d in features]
+
+    output_path: str = data_paths.path_to_output_data  # type: ignore
+    records_total = 0
+    rows_written = 0
+    for chunk_index, (chunk, filtered_chunk) in enumerate(read_chunks()):
+        output_chunk, _ = feature_engine.compute(
+            filtered_chunk, chunked_features, input_parameters.requested_features
+        )
+        output_chunk.to_csv(
+            output_path, mode="w" if chunk_index == 0 else "a", header=chunk_index == 0
+        )
+        records_total += len(chunk)
+        rows_written += len(output_chunk)
+    check_data_quality(
+        rows_written, records_total, input_parameters.filter_conditions_dict
+    )
+
+    league_statistics = statistics.get(MEAN_NORMALIZATION_FEATURE_NAME)
+    league_statistics_path = get_league_statistics_path(output_path)
+    if league_statistics is not None:
+        league_statistics.to_csv(league_statistics_path)
+    percentile_ranks_path = get_percentile_ranks_path(output_path)
+    stale_paths = [
+        get_arrow_ipc_path(output_path),
+        percentile_ranks_path,
+        get_arrow_ipc_path(percentile_ranks_path),
+    ] + ([league_statistics_path] if league_statistics is None else [])
+    for stale_path in stale_paths:
+        if os.path.exists(stale_path):
+            os.remove(stale_path)
+            logger.info("stale_side_file_removed", file_path=stale_path)
+    logger.info(
+        "chunked_treatment_completed",
+        file_path=output_path,
+        chunk_size=chunk_size,
+        rows_written=rows_written,
+    )
+    return league_statistics
+
+
+# players are also compared within these groups, on top of the whole league
+normalization_group_keys = ["team_id"]
 
 # setting up information for the batter extraction
 batting_stats_list = PLAYER_INFORMATION + BATTING_STATS
@@ -180,18 +642,21 @@ batter_mean_norm_stats = [
     "difstrikeOutsbaseOnBalls",
 ]
 
-
-batter_transformation_dict = {
-    create_babip: None,
-    create_dif_strike_outs_base_on_balls: None,
-    create_plate_appearance_normalization: batter_plate_norm_stats,
-    create_mean_normalization: batter_mean_norm_stats,
-}
+# the features can be declared in any order, e.g. babip is always
+# computed before the mean normalization using it
+batter_features = [
+    rate_stats_feature(["avg", "obp", "slg", "ops"]),
+    babip_feature(),
+    dif_strike_outs_base_on_balls_feature(),
+    plate_appearance_feature(batter_plate_norm_stats),
+    mean_normalization_feature(batter_mean_norm_stats),
+    grouped_normalization_feature(batter_mean_norm_stats, normalization_group_keys),
+]
 
 batter_input_data_repr = DataTreaterInputRepresentation(
     subset_columns=batting_stats_list,
     filter_conditions_dict=batter_filter_conditions_dict,
-    transformation_dict=batter_transformation_dict,
+    features=batter_features,
 )
 
 # same thing for pitchers
@@ -209,16 +674,20 @@ pitcher_mean_norm_stats = [
     "homeRunsPer9",
 ]
 
-
-pitcher_transformation_dict = {
-    create_innings_pitched_normalization: pitcher_innings_norm_stats,
-    create_mean_normalization: pitcher_mean_norm_stats,
-}
+# the other pitching rates need counting stats such as the hits allowed or the
+# pitches thrown, which the extracted stats mix up with the batting ones of
+# players who both bat and pitch
+pitcher_features = [
+    rate_stats_feature(["era"]),
+    innings_pitched_feature(pitcher_innings_norm_stats),
+    mean_normalization_feature(pitcher_mean_norm_stats),
+    grouped_normalization_feature(pitcher_mean_norm_stats, normalization_group_keys),
+]
 
 pitcher_input_data_repr = DataTreaterInputRepresentation(
     subset_columns=pitching_stats_list,
     filter_conditions_dict=pitcher_filter_conditions_dict,
-    transformation_dict=pitcher_transformation_dict,
+    features=pitcher_features,
 )
 
 # same thing for defenders
@@ -239,85 +708,305 @@ defender_mean_norm_stats = [
     "fielding",
 ]
 
-defender_transformation_dict = {
-    create_mean_normalization: defender_mean_norm_stats,
-}
+defender_features = [
+    mean_normalization_feature(defender_mean_norm_stats),
+    grouped_normalization_feature(defender_mean_norm_stats, normalization_group_keys),
+]
 
 defender_input_data_repr = DataTreaterInputRepresentation(
     subset_columns=defending_stats_list,
     filter_conditions_dict=defender_filter_conditions_dict,
-    transformation_dict=defender_transformation_dict,
+    features=defender_features,
 )
 
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser(
-        description="Optional input arguments for treatment script",
-        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
-    )
+player_input_data_reprs = {
+    "batter": batter_input_data_repr,
+    "pitcher": pitcher_input_data_repr,
+    "defender": defender_input_data_repr,
+}
 
-    parser.add_argument("--date", type=str)
-    parser.add_argument("--league_name", type=str)
 
-    args = parser.parse_args()
-    config = vars(args)
+class TreatmentJob(BaseModel):
+    league_name: str
+    date: str
+    input_source: Literal["csv", "database"] = "csv"
+    compact_memory: bool = False
+    # if set, the csv input is treated in chunks of this many rows
+    chunk_size: Optional[int] = None
+    # whether unchanged reruns are served from the feature store
+    use_feature_store: bool = True
+    data_location: str = DATA_FILE_LOCATION
+
+    @property
+    def output_details(self) -> str:
+        return f"{self.league_name}_{self.date}"
+
+    @property
+    def input_path(self) -> str:
+        return f"{self.data_location}{self.output_details}_full_player_stats_df.csv"
+
+    @property
+    def manifest_path(self) -> str:
+        return f"{self.data_location}{self.output_details}_treatment_manifest.json"
+
+    def get_output_paths(self) -> dict[str, str]:
+        return {
+            player_type: (
+                f"{self.data_location}{self.output_details}_{player_type}_stats_df.csv"
+            )
+            for player_type in player_input_data_reprs.keys()
+        }
 
-    input_date = config.get("date")
-    input_league_name = config.get("league_name")
 
-    if input_date:
-        DATE_TIME_EXECUTION = config["date"]
+def get_job_fingerprint(job: TreatmentJob) -> dict:
+    """Describes what the outputs of a job are computed from: the treatment
+    configuration of every player type and the input the job reads.
 
-    if input_league_name:
-        LEAGUE_NAME = config["league_name"]
+    Args:
+        job (TreatmentJob)
 
-    PLAYER_DATA_FILE_NAME = (
-        f"{LEAGUE_NAME}_{DATE_TIME_EXECUTION}_full_player_stats_df.csv"
-    )
+    Returns:
+        dict: Fingerprint of the job
+    """
+    fingerprint: dict = {
+        "config_hashes": {
+            player_type: compute_config_hash(input_parameters)
+            for player_type, input_parameters in player_input_data_reprs.items()
+        },
+        "compact_memory": job.compact_memory,
+    }
+    if job.input_source == "csv":
+        input_stat = os.stat(job.input_path)
+        fingerprint["input"] = {
+            "path": job.input_path,
+            "mtime_ns": input_stat.st_mtime_ns,
+            "size": input_stat.st_size,
+        }
+    else:
+        # only the facts of the job's league and date are watched, the other
+        # leagues and dates written to the database leave the job up to date
+        path_to_database = os.path.join(job.data_location, "mlb_data.db")
+        with create_connection(path_to_database) as conn:
+            fingerprint["input"] = {
+                "path": path_to_database,
+                **get_player_stats_facts_digest(
+                    conn, date=job.date, league_name=job.league_name
+                ),
+            }
+    return fingerprint
+
+
+def is_job_up_to_date(job: TreatmentJob) -> bool:
+    """Checks whether every output of a job exists and was computed from the
+    current input and treatment configuration.
+
+    Args:
+        job (TreatmentJob)
+
+    Returns:
+        bool: True if the job can be skipped
+    """
+    if not os.path.exists(job.manifest_path):
+        return False
+    if not all(os.path.exists(path) for path in job.get_output_paths().values()):
+        return False
+    with open(job.manifest_path, "r") as manifest_file:
+        manifest = json.load(manifest_file)
+    return bool(manifest == get_job_fingerprint(job))
+
+
+def run_treatment_job(job: TreatmentJob, force: bool = False) -> str:
+    """Treats the data of a single league and date, unless its outputs are
+    already up to date. A manifest of what the outputs were computed from
+    is written next to them.
+
+    Args:
+        job (TreatmentJob)
+        force (bool): Whether to treat the data even if the outputs are up to date
 
-    OUTPUT_DETAILS = f"{LEAGUE_NAME}_{DATE_TIME_EXECUTION}"
+    Returns:
+        str: "completed", "skipped" or "missing_input"
+    """
+    if job.input_source == "csv" and not os.path.exists(job.input_path):
+        logger.warning(
+            "treatment_input_missing",
+            league=job.league_name,
+            date=job.date,
+            file_path=job.input_path,
+        )
+        return "missing_input"
 
-    BATTER_DATA_FILE_NAME = f"{OUTPUT_DETAILS}_batter_stats_df.csv"
-    PITCHER_DATA_FILE_NAME = f"{OUTPUT_DETAILS}_pitcher_stats_df.csv"
-    DEFENDER_DATA_FILE_NAME = f"{OUTPUT_DETAILS}_defender_stats_df.csv"
+    if not force and is_job_up_to_date(job):
+        logger.info("treatment_skipped", league=job.league_name, date=job.date)
+        return "skipped"
 
     logger.info(
         "treatment_started",
-        league=LEAGUE_NAME,
-        date=DATE_TIME_EXECUTION,
-        player_types=["batter", "pitcher", "defender"],
+        league=job.league_name,
+        date=job.date,
+        player_types=list(player_input_data_reprs.keys()),
     )
-
-    # Process each player type
+    fingerprint = get_job_fingerprint(job)
+    input_paths = DataPaths(
+        path_to_input_data=job.input_path,
+        input_source=job.input_source,
+        path_to_database=os.path.join(job.data_location, "mlb_data.db"),
+        league_name=job.league_name,
+        date=job.date,
+    )
+    output_paths = job.get_output_paths()
     player_configs = [
-        ("batter", batter_input_data_repr, BATTER_DATA_FILE_NAME),
-        ("pitcher", pitcher_input_data_repr, PITCHER_DATA_FILE_NAME),
-        ("defender", defender_input_data_repr, DEFENDER_DATA_FILE_NAME),
+        (player_type, input_parameters, output_paths[player_type])
+        for player_type, input_parameters in player_input_data_reprs.items()
     ]
+    if job.chunk_size is not None:
+        for player_type, input_parameters, output_path in player_configs:
+            run_chunked_treatment(
+                input_paths.model_copy(update={"path_to_output_data": output_path}),
+                input_parameters,
+                job.chunk_size,
+            )
+    else:
+        run_treatment(
+            input_paths,
+            player_configs,
+            feature_store=(
+                FeatureStore(root=os.path.join(job.data_location, "feature_store"))
+                if job.use_feature_store
+                else None
+            ),
+            compact_memory=job.compact_memory,
+        )
 
-    for player_type, input_params, output_filename in player_configs:
-        logger.info("processing_player_type", player_type=player_type)
+    # the fingerprint is taken before treating, so that an input changed
+    # in the meantime is treated again by the next run
+    with open(job.manifest_path, "w") as manifest_file:
+        json.dump(fingerprint, manifest_file)
 
-        try:
-            input_paths = DataPaths(
-                path_to_input_data=DATA_FILE_LOCATION + PLAYER_DATA_FILE_NAME,
-                path_to_output_data=DATA_FILE_LOCATION + output_filename,
-            )
+    logger.info("treatment_completed", player_types_processed=len(player_configs))
+    return "completed"
 
-            data_treater = DataTreater(
-                data_paths=input_paths, input_parameters=input_params
-            )
 
-            data_treater.set_output_data_file()
+def run_batch_treatment(
+    jobs: list[TreatmentJob], max_workers: Optional[int] = None, force: bool = False
+) -> dict[tuple[str, str], str]:
+    """Runs independent (league, date) treatment jobs on a process pool,
+    skipping the jobs whose outputs are up to date. A failed job does not
+    stop the others.
 
-            logger.info("player_type_completed", player_type=player_type)
+    Args:
+        jobs (list[TreatmentJob])
+        max_workers (Optional[int]): Number of processes, one per CPU by default
+        force (bool): Whether to treat the data even if the outputs are up to date
 
-        except Exception as e:
-            logger.error(
-                "player_type_failed",
-                player_type=player_type,
-                error=str(e),
-                exc_info=True,
-            )
-            raise
+    Returns:
+        dict[tuple[str, str], str]: Status of each (league, date) job, "failed"
+        for the jobs that raised
+    """
+    statuses = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            (job.league_name, job.date): executor.submit(run_treatment_job, job, force)
+            for job in jobs
+        }
+        for job_key, future in futures.items():
+            try:
+                statuses[job_key] = future.result()
+            except Exception as e:
+                logger.error(
+                    "treatment_job_failed",
+                    league=job_key[0],
+                    date=job_key[1],
+                    error=str(e),
+                )
+                statuses[job_key] = "failed"
 
-    logger.info("treatment_completed", player_types_processed=len(player_configs))
+    logger.info(
+        "batch_treatment_completed",
+        jobs_count=len(jobs),
+        statuses={
+            status: list(statuses.values()).count(status)
+            for status in set(statuses.values())
+        },
+    )
+    return statuses
+
+
+def get_date_range(start_date: str, end_date: str) -> list[str]:
+    """Returns every date from start_date to end_date, both included, in the
+    YYYY-MM-DD format.
+    """
+    return [
+        date.strftime("%Y-%m-%d")
+        for date in pd.date_range(start_date, end_date, freq="D")
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Optional input arguments for treatment script",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+
+    parser.add_argument("--date", type=str, default=DATE_TIME_EXECUTION)
+    parser.add_argument("--league_name", type=str, default=LEAGUE_NAME)
+    parser.add_argument("--input_source", choices=["csv", "database"], default="csv")
+    parser.add_argument(
+        "--compact_memory",
+        action="store_true",
+        help="Load the input with compact dtypes to reduce memory usage",
+    )
+    parser.add_argument(
+        "--chunk_size",
+        type=int,
+        help="Treat the csv input in chunks of this many rows to bound memory usage",
+    )
+    parser.add_argument(
+        "--no_feature_store",
+        action="store_true",
+        help="Treat the data without reading or writing the feature store",
+    )
+    # batch mode, treating every league and date of a range
+    parser.add_argument("--start_date", type=str)
+    parser.add_argument("--end_date", type=str)
+    parser.add_argument("--league_names", nargs="+", type=str)
+    parser.add_argument("--max_workers", type=int)
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Treat the data in batch mode even if the outputs are up to date",
+    )
+
+    args = parser.parse_args()
+    config = vars(args)
+
+    if config["start_date"]:
+        batch_jobs = [
+            TreatmentJob(
+                league_name=league_name,
+                date=date,
+                input_source=config["input_source"],
+                compact_memory=config["compact_memory"],
+                chunk_size=config["chunk_size"],
+                use_feature_store=not config["no_feature_store"],
+            )
+            for league_name in config["league_names"] or [config["league_name"]]
+            for date in get_date_range(
+                config["start_date"], config["end_date"] or config["start_date"]
+            )
+        ]
+        run_batch_treatment(
+            batch_jobs, max_workers=config["max_workers"], force=config["force"]
+        )
+    else:
+        run_treatment_job(
+            TreatmentJob(
+                league_name=config["league_name"],
+                date=config["date"],
+                input_source=config["input_source"],
+                compact_memory=config["compact_memory"],
+                chunk_size=config["chunk_size"],
+                use_feature_store=not config["no_feature_store"],
+            ),
+            force=True,
+        )
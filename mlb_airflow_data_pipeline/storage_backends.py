@@ -0,0 +1,349 @@
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator, Literal, Protocol
+
+import duckdb
+import pandas as pd
+
+from mlb_airflow_data_pipeline.db_utils import (
+    cast_stat_columns,
+    create_connection,
+    get_database_path,
+    insert_dataframe,
+)
+from mlb_airflow_data_pipeline.star_schema_utils import (
+    PLAYER_STATS_VIEW_NAME,
+    create_star_schema,
+    insert_player_stats_facts,
+    seed_teams,
+    upsert_players,
+)
+from mlb_airflow_data_pipeline.statsapi_parameters_script import DATA_FILE_LOCATION
+from mlb_airflow_data_pipeline.zone_map_utils import FILTER_OPERATORS, Filter
+
+AGGREGATION_FUNCTIONS = ["sum", "avg", "min", "max", "count"]
+
+PLAYER_STATS_TABLE_NAME = "player_stats"
+LEAGUE_STANDINGS_TABLE_NAME = "league_standings"
+
+# the SQLite backend keeps the snapshots where the extraction already stores
+# them, the player stats in the star schema and the standings in their table
+SQLITE_TABLE_NAMES = {PLAYER_STATS_TABLE_NAME: PLAYER_STATS_VIEW_NAME}
+
+
+class StorageBackend(Protocol):
+    """Storage engine holding the dated snapshots of the pipeline tables."""
+
+    def connect(self) -> Any:
+        """Returns a context manager yielding a connection to the storage."""
+        ...
+
+    def write_snapshot(
+        self,
+        conn: Any,
+        table_name: str,
+        df: pd.DataFrame,
+        league_name: str,
+        date: str,
+        index_label: str | None = None,
+    ) -> None:
+        """Writes the snapshot of a league and date, replacing any previous one."""
+        ...
+
+    def read(
+        self,
+        conn: Any,
+        table_name: str,
+        columns: list[str] | None = None,
+        filters: list[Filter] | None = None,
+    ) -> pd.DataFrame:
+        """Reads the columns of the rows matching all the filters."""
+        ...
+
+    def aggregate(
+        self,
+        conn: Any,
+        table_name: str,
+        group_by: list[str],
+        aggregations: dict[str, str],
+        filters: list[Filter] | None = None,
+    ) -> pd.DataFrame:
+        """Aggregates the rows matching all the filters inside the engine."""
+        ...
+
+
+def compile_filters(filters: list[Filter] | None) -> tuple[str, list]:
+    """Compiles (column, operator, value) filters into a parametrized SQL
+    WHERE clause. Besides the comparison operators, "in" takes a list of values.
+
+    Args:
+        filters: Filters that must all hold
+
+    Returns:
+        str: WHERE clause, empty if there are no filters
+        list: Parameters of the clause
+    """
+    if not filters:
+        return "", []
+
+    conditions = []
+    params = []
+    for column, operator_name, value in filters:
+        if operator_name == "in":
+            conditions.append(f'"{column}" IN ({", ".join("?" for _ in value)})')
+            params.extend(value)
+        elif operator_name in FILTER_OPERATORS:
+            conditions.append(f'"{column}" {operator_name} ?')
+            params.append(value)
+        else:
+            raise ValueError(f"Unsupported filter operator {operator_name}")
+    return f"WHERE {' AND '.join(conditions)}", params
+
+
+def compile_aggregations(aggregations: dict[str, str]) -> str:
+    """Compiles {column: function} aggregations into a SQL select list.
+    Each aggregate is named after its function and column, e.g. sum_homeRuns.
+
+    Args:
+        aggregations: Aggregation function of each column
+
+    Returns:
+        str: Select list of the aggregates
+    """
+    select_list = []
+    for column, function in aggregations.items():
+        if function not in AGGREGATION_FUNCTIONS:
+            raise ValueError(f"Unsupported aggregation function {function}")
+        select_list.append(f'{function.upper()}("{column}") AS "{function}_{column}"')
+    return ", ".join(select_list)
+
+
+def _prepare_snapshot(
+    df: pd.DataFrame, league_name: str, date: str, index_label: str | None
+) -> pd.DataFrame:
+    if index_label is not None:
+        df = df.rename_axis(index_label).reset_index()
+    snapshot_df = cast_stat_columns(
+        df.drop(columns=["league", "date"], errors="ignore")
+    )
+    snapshot_df.insert(0, "date", date)
+    snapshot_df.insert(0, "league", league_name)
+    return snapshot_df
+
+
+def _build_select_query(
+    table_name: str, columns: list[str] | None, filters: list[Filter] | None
+) -> tuple[str, list]:
+    select_columns = "*" if columns is None else ", ".join(f'"{c}"' for c in columns)
+    where_clause, params = compile_filters(filters)
+    return f"SELECT {select_columns} FROM {table_name} {where_clause}", params
+
+
+def _build_aggregate_query(
+    table_name: str,
+    group_by: list[str],
+    aggregations: dict[str, str],
+    filters: list[Filter] | None,
+) -> tuple[str, list]:
+    group_columns = ", ".join(f'"{col}"' for col in group_by)
+    where_clause, params = compile_filters(filters)
+    query = f"""
+        SELECT {group_columns}, {compile_aggregations(aggregations)}
+        FROM {table_name} {where_clause}
+        GROUP BY {group_columns}
+        ORDER BY {group_columns}
+    """
+    return query, params
+
+
+class SQLiteBackend:
+    """Storage backend over the tables the extraction fills in the SQLite
+    database, so that it keeps no copy of its own. The player stats are
+    written to and read from the star schema, whose teams dimension gives the
+    league of each row, and the standings from the league_standings table,
+    whose TEXT stats are typed when read.
+    """
+
+    def __init__(self, db_path: str | None = None):
+        self.db_path = get_database_path() if db_path is None else db_path
+
+    def connect(self) -> Any:
+        return create_connection(self.db_path)
+
+    def write_snapshot(
+        self,
+        conn: sqlite3.Connection,
+        table_name: str,
+        df: pd.DataFrame,
+        league_name: str,
+        date: str,
+        index_label: str | None = None,
+    ) -> None:
+        if table_name == PLAYER_STATS_TABLE_NAME:
+            create_star_schema(conn)
+            seed_teams(conn)
+            upsert_players(conn, df)
+            insert_player_stats_facts(conn, df, date)
+            return
+
+        snapshot_df = _prepare_snapshot(df, league_name, date, index_label)
+        if self._table_exists(conn, table_name):
+            conn.execute(
+                f"DELETE FROM {table_name} WHERE league = ? AND date = ?",
+                (league_name, date),
+            )
+        insert_dataframe(conn, table_name, snapshot_df)
+
+    def read(
+        self,
+        conn: sqlite3.Connection,
+        table_name: str,
+        columns: list[str] | None = None,
+        filters: list[Filter] | None = None,
+    ) -> pd.DataFrame:
+        query, params = _build_select_query(
+            SQLITE_TABLE_NAMES.get(table_name, table_name), columns, filters
+        )
+        try:
+            return cast_stat_columns(pd.read_sql_query(query, conn, params=params))
+        except Exception as e:
+            raise Exception(f"Failed to read table {table_name}: {e}")
+
+    def aggregate(
+        self,
+        conn: sqlite3.Connection,
+        table_name: str,
+        group_by: list[str],
+        aggregations: dict[str, str],
+        filters: list[Filter] | None = None,
+    ) -> pd.DataFrame:
+        query, params = _build_aggregate_query(
+            SQLITE_TABLE_NAMES.get(table_name, table_name),
+            group_by,
+            aggregations,
+            filters,
+        )
+        try:
+            return pd.read_sql_query(query, conn, params=params)
+        except Exception as e:
+            raise Exception(f"Failed to aggregate table {table_name}: {e}")
+
+    def _table_exists(self, conn: sqlite3.Connection, table_name: str) -> bool:
+        cursor = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name=?",
+            (table_name,),
+        )
+        return cursor.fetchone() is not None
+
+
+class DuckDBBackend:
+    """Storage backend writing typed snapshots to an embedded DuckDB file,
+    whose columnar engine runs filters and aggregations vectorized."""
+
+    def __init__(self, db_path: str | None = None):
+        self.db_path = get_duckdb_path() if db_path is None else db_path
+
+    @contextmanager
+    def connect(self) -> Iterator[duckdb.DuckDBPyConnection]:
+        conn = duckdb.connect(self.db_path)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def write_snapshot(
+        self,
+        conn: duckdb.DuckDBPyConnection,
+        table_name: str,
+        df: pd.DataFrame,
+        league_name: str,
+        date: str,
+        index_label: str | None = None,
+    ) -> None:
+        snapshot_df = _prepare_snapshot(df, league_name, date, index_label)
+        conn.register("snapshot_df", snapshot_df)
+        try:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table_name} AS "
+                "SELECT * FROM snapshot_df LIMIT 0"
+            )
+            # columns the statsapi started to serve are added to the table
+            table_columns = {
+                row[0] for row in conn.execute(f"DESCRIBE {table_name}").fetchall()
+            }
+            for column, column_type, *_ in conn.execute(
+                "DESCRIBE snapshot_df"
+            ).fetchall():
+                if column not in table_columns:
+                    conn.execute(
+                        f'ALTER TABLE {table_name} ADD COLUMN "{column}" {column_type}'
+                    )
+            conn.execute(
+                f"DELETE FROM {table_name} WHERE league = ? AND date = ?",
+                [league_name, date],
+            )
+            conn.execute(f"INSERT INTO {table_name} BY NAME SELECT * FROM snapshot_df")
+        except duckdb.Error as e:
+            raise Exception(f"Failed to insert DataFrame into table {table_name}: {e}")
+        finally:
+            conn.unregister("snapshot_df")
+
+    def read(
+        self,
+        conn: duckdb.DuckDBPyConnection,
+        table_name: str,
+        columns: list[str] | None = None,
+        filters: list[Filter] | None = None,
+    ) -> pd.DataFrame:
+        query, params = _build_select_query(table_name, columns, filters)
+        try:
+            return conn.execute(query, params).df()
+        except duckdb.Error as e:
+            raise Exception(f"Failed to read table {table_name}: {e}")
+
+    def aggregate(
+        self,
+        conn: duckdb.DuckDBPyConnection,
+        table_name: str,
+        group_by: list[str],
+        aggregations: dict[str, str],
+        filters: list[Filter] | None = None,
+    ) -> pd.DataFrame:
+        query, params = _build_aggregate_query(
+            table_name, group_by, aggregations, filters
+        )
+        try:
+            return conn.execute(query, params).df()
+        except duckdb.Error as e:
+            raise Exception(f"Failed to aggregate table {table_name}: {e}")
+
+
+def get_duckdb_path() -> str:
+    """Returns the path to the DuckDB database file.
+
+    Returns:
+        str: Path to the database file in the data directory
+    """
+    data_dir = Path(DATA_FILE_LOCATION)
+    data_dir.mkdir(exist_ok=True)
+    return str(data_dir / "mlb_data.duckdb")
+
+
+def get_storage_backend(
+    backend_name: Literal["sqlite", "duckdb"] = "sqlite", db_path: str | None = None
+) -> StorageBackend:
+    """Returns the storage backend with the given name.
+
+    Args:
+        backend_name: Name of the backend
+        db_path: Path to the database file, defaults to the backend's own path
+
+    Returns:
+        StorageBackend: Storage backend
+    """
+    if backend_name == "sqlite":
+        return SQLiteBackend(db_path)
+    if backend_name == "duckdb":
+        return DuckDBBackend(db_path)
+    raise ValueError(f"Unknown storage backend {backend_name}")
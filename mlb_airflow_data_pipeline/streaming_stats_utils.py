@@ -0,0 +1,134 @@
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+
+class RunningStatistics:
+    """Mean and variance of several features accumulated over chunks of
+    rows in a single pass, so that the data never has to fit in memory.
+
+    Each chunk's count, mean and sum of squared deviations are computed
+    directly and merged into the running ones with Chan's parallel
+    formulation of Welford's algorithm, which stays numerically stable
+    where a running sum of squares would not. Missing values are ignored,
+    as pandas does.
+    """
+
+    def __init__(self, feature_name_list: list[str]):
+        self.feature_name_list = list(feature_name_list)
+        self.count = np.zeros(len(self.feature_name_list))
+        self.mean = np.zeros(len(self.feature_name_list))
+        # sum of squared deviations from the mean
+        self.m2 = np.zeros(len(self.feature_name_list))
+
+    def update(self, chunk_df: pd.DataFrame) -> None:
+        """Accumulates the features of a chunk of rows.
+
+        Args:
+            chunk_df: Chunk holding the feature columns
+        """
+        values = chunk_df[self.feature_name_list].to_numpy(dtype=float, na_value=np.nan)
+        is_present = ~np.isnan(values)
+        chunk_count = is_present.sum(axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            chunk_mean = np.where(
+                chunk_count > 0, np.nansum(values, axis=0) / chunk_count, 0.0
+            )
+        chunk_m2 = np.nansum((values - chunk_mean) ** 2, axis=0)
+        self._merge(chunk_count, chunk_mean, chunk_m2)
+
+    def merge(self, other: "RunningStatistics") -> None:
+        """Merges the statistics accumulated by another instance over the
+        same features, e.g. on another worker.
+
+        Args:
+            other: Statistics of other rows
+        """
+        if other.feature_name_list != self.feature_name_list:
+            raise ValueError("Cannot merge statistics of different features")
+        self._merge(other.count, other.mean, other.m2)
+
+    def _merge(
+        self, other_count: np.ndarray, other_mean: np.ndarray, other_m2: np.ndarray
+    ) -> None:
+        total_count = self.count + other_count
+        delta = other_mean - self.mean
+        with np.errstate(divide="ignore", invalid="ignore"):
+            other_weight = np.where(total_count > 0, other_count / total_count, 0.0)
+        self.mean = self.mean + delta * other_weight
+        self.m2 = self.m2 + other_m2 + delta**2 * self.count * other_weight
+        self.count = total_count
+
+    def to_frame(self) -> pd.DataFrame:
+        """Returns the accumulated statistics in the format of
+        compute_league_statistics.
+
+        Returns:
+            pd.DataFrame: mean and std columns, indexed by feature name
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return pd.DataFrame(
+                {
+                    "mean": np.where(self.count > 0, self.mean, np.nan),
+                    # sample std, undefined for less than two values
+                    "std": np.where(
+                        self.count > 1, np.sqrt(self.m2 / (self.count - 1)), np.nan
+                    ),
+                },
+                index=pd.Index(self.feature_name_list, name="feature"),
+            )
+
+
+class GroupedRunningStatistics:
+    """Mean and variance of several features accumulated over chunks of rows
+    within the groups of every grouping key, e.g. per team, so that the rows
+    of a group can be spread over several chunks.
+    """
+
+    def __init__(self, feature_name_list: list[str], group_keys: list[str]):
+        self.feature_name_list = list(feature_name_list)
+        self.group_keys = list(group_keys)
+        self._statistics: dict[str, dict[Any, RunningStatistics]] = {
+            group_key: {} for group_key in self.group_keys
+        }
+
+    def update(self, chunk_df: pd.DataFrame) -> None:
+        """Accumulates the features of a chunk of rows into their groups.
+
+        Args:
+            chunk_df: Chunk holding the feature and group key columns
+        """
+        for group_key, group_statistics in self._statistics.items():
+            for group, group_df in chunk_df.groupby(
+                chunk_df[group_key].to_numpy(), sort=False
+            ):
+                if group not in group_statistics:
+                    group_statistics[group] = RunningStatistics(self.feature_name_list)
+                group_statistics[group].update(group_df)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Returns the accumulated statistics in the format of
+        compute_grouped_statistics.
+
+        Returns:
+            pd.DataFrame: mean and std columns, indexed by group key, group
+            and feature name
+        """
+        frames = [
+            group_statistics[group]
+            .to_frame()
+            .assign(group_key=group_key, group=group)
+            .set_index(["group_key", "group"], append=True)
+            .reorder_levels(["group_key", "group", "feature"])
+            for group_key, group_statistics in self._statistics.items()
+            for group in sorted(group_statistics)
+        ]
+        if not frames:
+            return pd.DataFrame(
+                {"mean": [], "std": []},
+                index=pd.MultiIndex.from_tuples(
+                    [], names=["group_key", "group", "feature"]
+                ),
+            )
+        return pd.concat(frames)
@@ -0,0 +1,143 @@
+import queue
+import sqlite3
+import threading
+from types import TracebackType
+
+import pandas as pd
+
+from mlb_airflow_data_pipeline.db_utils import create_connection, insert_dataframe
+from mlb_airflow_data_pipeline.logging_setup import get_logger
+
+logger = get_logger("write_behind_utils")
+
+# sentinel telling the writer thread that no more frames will be submitted
+_STOP = None
+
+
+class WriteBehindWriter:
+    """Persists DataFrames to the SQLite database from a background thread,
+    so that database writes overlap with the network calls of the extraction.
+
+    Frames are submitted to a bounded queue, which blocks the producer when
+    the writer falls behind. The writer drains whatever is queued, groups it
+    by table and commits each group at once. Closing the writer, including
+    when leaving its context because of an exception, persists every frame
+    submitted so far.
+    """
+
+    def __init__(self, db_path: str, max_queue_size: int = 8, batch_size: int = 5):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self.thread = threading.Thread(
+            target=self._run, name="write-behind-writer", daemon=True
+        )
+        self.is_stopped = False
+        self.error: Exception | None = None
+        self.rows_written: dict[str, int] = {}
+
+    def __enter__(self) -> "WriteBehindWriter":
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close(raise_error=exc_type is None)
+
+    def start(self) -> None:
+        """Starts the writer thread."""
+        self.thread.start()
+
+    def submit(self, table_name: str, df: pd.DataFrame) -> None:
+        """Queues a DataFrame to be appended to a table, blocking while the
+        queue is full.
+
+        Args:
+            table_name: Name of the target table
+            df: DataFrame to insert
+
+        Raises:
+            Exception: If the writer thread failed on a previous batch
+        """
+        self._raise_error()
+        self.queue.put((table_name, df))
+
+    def close(self, raise_error: bool = True) -> None:
+        """Waits for every queued frame to be persisted and stops the thread.
+
+        Args:
+            raise_error: Whether to raise the error of a failed batch
+
+        Raises:
+            Exception: If the writer thread failed and raise_error is True
+        """
+        if self.thread.is_alive():
+            self.queue.put(_STOP)
+            self.thread.join()
+        logger.info("write_behind_closed", rows_written=self.rows_written)
+        if raise_error:
+            self._raise_error()
+
+    def _run(self) -> None:
+        try:
+            with create_connection(self.db_path) as conn:
+                self._consume(conn)
+        except Exception as e:
+            self.error = e
+            logger.error("write_behind_connection_failed", error=str(e))
+            if not self.is_stopped:
+                self._consume(None)
+
+    def _consume(self, conn: sqlite3.Connection | None) -> None:
+        while not self.is_stopped:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get())
+
+            if _STOP in batch:
+                self.is_stopped = True
+                batch = [item for item in batch if item is not _STOP]
+
+            # once a batch failed, the remaining frames are only drained
+            # so that the producer is never blocked on a full queue
+            if conn is not None and self.error is None and batch:
+                self._write_batch(conn, batch)
+
+    def _write_batch(
+        self, conn: sqlite3.Connection, batch: list[tuple[str, pd.DataFrame]]
+    ) -> None:
+        frames_per_table: dict[str, list[pd.DataFrame]] = {}
+        for table_name, df in batch:
+            frames_per_table.setdefault(table_name, []).append(df)
+
+        for table_name, frames in frames_per_table.items():
+            try:
+                table_df = pd.concat(frames)
+                insert_dataframe(conn, table_name, table_df)
+            except Exception as e:
+                self.error = e
+                logger.error(
+                    "write_behind_batch_failed",
+                    table=table_name,
+                    frames_count=len(frames),
+                    error=str(e),
+                )
+                return
+            rows_count = len(table_df)
+            self.rows_written[table_name] = (
+                self.rows_written.get(table_name, 0) + rows_count
+            )
+            logger.debug(
+                "write_behind_batch_committed",
+                table=table_name,
+                frames_count=len(frames),
+                rows_count=rows_count,
+            )
+
+    def _raise_error(self) -> None:
+        if self.error is not None:
+            raise Exception(f"Write-behind writer failed: {self.error}")
@@ -0,0 +1,125 @@
+import json
+import operator
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+ZONE_MAP_FILE_NAME = "_zone_map.json"
+
+# a filter is a (column, operator, value) tuple, e.g. ("homeRuns", ">=", 30)
+Filter = tuple[str, str, Any]
+
+FILTER_OPERATORS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+
+
+def compute_zone_map(df: pd.DataFrame) -> dict:
+    """Computes the min, max and non-null count of every numeric column.
+
+    Args:
+        df: Typed snapshot of a single partition
+
+    Returns:
+        dict: Row count of the partition and statistics per numeric column
+    """
+    numeric_df = df.select_dtypes(include="number")
+    column_stats = pd.DataFrame(
+        {
+            "min": numeric_df.min(),
+            "max": numeric_df.max(),
+            "count": numeric_df.count(),
+        }
+    )
+    return {
+        "row_count": len(df),
+        "columns": {
+            column: {
+                "min": None if pd.isna(stats["min"]) else float(stats["min"]),
+                "max": None if pd.isna(stats["max"]) else float(stats["max"]),
+                "count": int(stats["count"]),
+            }
+            for column, stats in column_stats.iterrows()
+        },
+    }
+
+
+def write_zone_map(zone_map: dict, partition_path: Path) -> Path:
+    """Writes the zone map of a partition next to its data file.
+
+    Args:
+        zone_map: Zone map as returned by compute_zone_map
+        partition_path: Partition directory
+
+    Returns:
+        Path: Path to the zone map file
+    """
+    zone_map_path = partition_path / ZONE_MAP_FILE_NAME
+    with open(zone_map_path, "w") as zone_map_file:
+        json.dump(zone_map, zone_map_file)
+    return zone_map_path
+
+
+def read_zone_map(partition_path: Path) -> dict | None:
+    """Reads the zone map of a partition.
+
+    Args:
+        partition_path: Partition directory
+
+    Returns:
+        dict | None: Zone map, None if the partition has none
+    """
+    zone_map_path = partition_path / ZONE_MAP_FILE_NAME
+    if not zone_map_path.exists():
+        return None
+    with open(zone_map_path, "r") as zone_map_file:
+        zone_map: dict = json.load(zone_map_file)
+    return zone_map
+
+
+def zone_map_can_match(zone_map: dict | None, filters: list[Filter]) -> bool:
+    """Checks whether a partition may contain rows matching all the filters.
+    The check is conservative: a partition is only excluded when its min/max
+    range proves that no row can match.
+
+    Args:
+        zone_map: Zone map of the partition, None if unknown
+        filters: Filters that must all hold
+
+    Returns:
+        bool: False if the partition can be skipped
+    """
+    if zone_map is None:
+        return True
+
+    for column, operator_name, value in filters:
+        if operator_name not in FILTER_OPERATORS:
+            raise ValueError(f"Unsupported filter operator {operator_name}")
+
+        column_stats = zone_map["columns"].get(column)
+        if column_stats is None:
+            continue
+        if column_stats["count"] == 0:
+            return False
+
+        column_min, column_max = column_stats["min"], column_stats["max"]
+        if operator_name == "==" and not column_min <= value <= column_max:
+            return False
+        if operator_name == "!=" and column_min == column_max == value:
+            return False
+        if operator_name == ">" and not column_max > value:
+            return False
+        if operator_name == ">=" and not column_max >= value:
+            return False
+        if operator_name == "<" and not column_min < value:
+            return False
+        if operator_name == "<=" and not column_min <= value:
+            return False
+
+    return True
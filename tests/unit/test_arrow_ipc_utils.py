@@ -0,0 +1,74 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mlb_airflow_data_pipeline.arrow_ipc_utils import (
+    get_arrow_ipc_path,
+    read_arrow_ipc,
+    read_handoff_data,
+    write_arrow_ipc,
+)
+
+
+@pytest.fixture
+def player_stats_df() -> pd.DataFrame:
+    """Create treated player stats, indexed by player id."""
+    return pd.DataFrame(
+        {
+            "playername": ["Aaron Judge", "Juan Soto", "Pete Alonso"],
+            "team_id": [147, 135, 121],
+            "homeRuns": [37, 35, 46],
+            "avg": [0.267, np.nan, 0.217],
+        },
+        index=[592450, 665742, 624413],
+    )
+
+
+def test_get_arrow_ipc_path() -> None:
+    """Test that the Arrow IPC file sits next to the CSV file."""
+    assert (
+        get_arrow_ipc_path("/data/national_league_2023-06-01_batter_stats_df.csv")
+        == "/data/national_league_2023-06-01_batter_stats_df.arrow"
+    )
+
+
+def test_write_arrow_ipc_round_trip(tmp_path, player_stats_df: pd.DataFrame) -> None:
+    """Test that the data, index and dtypes are read back as written."""
+    arrow_ipc_path = write_arrow_ipc(player_stats_df, str(tmp_path / "stats.arrow"))
+
+    result_df = read_arrow_ipc(arrow_ipc_path)
+
+    pd.testing.assert_frame_equal(result_df, player_stats_df)
+    assert not os.path.exists(tmp_path / "stats.arrow.tmp")
+
+
+def test_read_arrow_ipc_selects_columns(
+    tmp_path, player_stats_df: pd.DataFrame
+) -> None:
+    """Test that only the requested columns are read, with the index."""
+    arrow_ipc_path = write_arrow_ipc(player_stats_df, str(tmp_path / "stats.arrow"))
+
+    result_df = read_arrow_ipc(arrow_ipc_path, columns=["homeRuns"])
+
+    pd.testing.assert_frame_equal(result_df, player_stats_df[["homeRuns"]])
+
+
+def test_read_handoff_data_prefers_arrow_ipc(
+    tmp_path, player_stats_df: pd.DataFrame
+) -> None:
+    """Test that the Arrow IPC file is read unless the CSV file is newer."""
+    csv_path = str(tmp_path / "stats.csv")
+    player_stats_df.to_csv(csv_path)
+    pd.testing.assert_frame_equal(read_handoff_data(csv_path), player_stats_df)
+
+    arrow_ipc_path = write_arrow_ipc(
+        player_stats_df.assign(homeRuns=0), get_arrow_ipc_path(csv_path)
+    )
+    assert read_handoff_data(csv_path)["homeRuns"].tolist() == [0, 0, 0]
+
+    # a csv rewritten after the Arrow IPC file, e.g. by the chunked treatment
+    arrow_ipc_mtime_ns = os.stat(arrow_ipc_path).st_mtime_ns
+    os.utime(arrow_ipc_path, ns=(arrow_ipc_mtime_ns, arrow_ipc_mtime_ns - 10**9))
+    assert read_handoff_data(csv_path)["homeRuns"].tolist() == [37, 35, 46]
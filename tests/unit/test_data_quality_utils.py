@@ -0,0 +1,117 @@
+import os
+import sqlite3
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mlb_airflow_data_pipeline.data_quality_utils import (
+    DataQualityProfileStore,
+    detect_drift,
+    profile_snapshot,
+    run_data_quality_check,
+)
+from mlb_airflow_data_pipeline.db_utils import create_connection
+
+CURRENT_DIR: str = os.path.dirname(os.path.realpath(__file__))
+
+EXAMPLE_DATA_PATH: str = os.path.join(
+    CURRENT_DIR, "national_league_example_full_player_stats_df.csv"
+)
+
+
+@pytest.fixture
+def db_connection(tmp_path) -> Iterator[sqlite3.Connection]:
+    """Create a database connection for testing."""
+    with create_connection(str(tmp_path / "data_quality.db")) as conn:
+        yield conn
+
+
+@pytest.fixture
+def snapshot_df() -> pd.DataFrame:
+    """Read the example snapshot with its stats as text, as extracted."""
+    return pd.read_csv(EXAMPLE_DATA_PATH, index_col=0, dtype=str).assign(
+        date="2023-06-01"
+    )
+
+
+def test_profile_snapshot() -> None:
+    """Test the counts and values of a small snapshot's profile."""
+    snapshot_df: pd.DataFrame = pd.DataFrame(
+        {
+            "playername": ["Aaron Judge", "Juan Soto", None],
+            "homeRuns": ["19", "-.--", "abc"],
+            "avg": [".261", "1.5", None],
+        }
+    )
+
+    profile: pd.DataFrame = profile_snapshot(snapshot_df)
+
+    assert list(profile.index) == ["playername", "homeRuns", "avg"]
+    assert profile.loc["playername", "null_count"] == 1
+    assert profile.loc["homeRuns", "placeholder_count"] == 1
+    assert profile.loc["homeRuns", "coercion_failure_count"] == 1
+    assert profile.loc["homeRuns", "mean"] == 19.0
+    assert profile.loc["avg", "null_count"] == 1
+    assert profile.loc["avg", "out_of_range_count"] == 1
+    assert profile.loc["avg", ["min", "max"]].tolist() == [0.261, 1.5]
+    assert np.isnan(profile.loc["playername", "mean"])
+
+
+def test_profile_matches_pandas(snapshot_df: pd.DataFrame) -> None:
+    """Test that the single-pass statistics match the per-column ones."""
+    profile: pd.DataFrame = profile_snapshot(snapshot_df)
+
+    for column_name in ["homeRuns", "era", "team_id"]:
+        values: pd.Series = pd.to_numeric(snapshot_df[column_name], errors="coerce")
+        assert profile.loc[column_name, "min"] == values.min()
+        assert profile.loc[column_name, "max"] == values.max()
+        assert profile.loc[column_name, "mean"] == pytest.approx(values.mean())
+    assert profile["coercion_failure_count"].sum() == 0
+
+
+def test_drift_from_previous_snapshot(
+    db_connection: sqlite3.Connection, snapshot_df: pd.DataFrame
+) -> None:
+    """Test that a drifted snapshot is flagged against the stored profile."""
+    first_drifts: pd.DataFrame = run_data_quality_check(
+        db_connection, snapshot_df, "national_league", "2023-06-01"
+    )
+    drifted_df: pd.DataFrame = snapshot_df.assign(date="2023-06-02")
+    drifted_df.loc[drifted_df.index[:100], "homeRuns"] = None
+    drifted_df.loc[drifted_df.index[0], "avg"] = "n/a"
+
+    drifts: pd.DataFrame = run_data_quality_check(
+        db_connection, drifted_df, "national_league", "2023-06-02"
+    )
+
+    assert first_drifts.empty
+    assert set(zip(drifts["column_name"], drifts["check"])) == {
+        ("homeRuns", "null_rate"),
+        ("avg", "coercion_failures"),
+    }
+    stored_profile: pd.DataFrame = DataQualityProfileStore(db_connection).read_profile(
+        "national_league", "2023-06-02"
+    )
+    pd.testing.assert_frame_equal(
+        stored_profile,
+        profile_snapshot(drifted_df),
+        check_dtype=False,
+        check_like=True,
+    )
+
+
+def test_drift_of_columns_and_rows(snapshot_df: pd.DataFrame) -> None:
+    """Test that missing columns and a drop of rows are flagged."""
+    profile: pd.DataFrame = profile_snapshot(snapshot_df)
+    drifted_profile: pd.DataFrame = profile_snapshot(
+        snapshot_df.iloc[:200].drop(columns=["babip"])
+    )
+
+    drifts: pd.DataFrame = detect_drift(drifted_profile, profile)
+
+    assert ("babip", "missing_column") in set(
+        zip(drifts["column_name"], drifts["check"])
+    )
+    assert ("*", "row_count") in set(zip(drifts["column_name"], drifts["check"]))
@@ -7,6 +7,7 @@ import pandas as pd
 import pytest
 
 from mlb_airflow_data_pipeline.db_utils import (
+    cast_stat_columns,
     create_connection,
     create_table,
     insert_dataframe,
@@ -124,6 +125,30 @@ def test_insert_dataframe_append_not_replace(
     assert count == 4
 
 
+def test_insert_dataframe_append_adds_new_columns(
+    db_connection: sqlite3.Connection, test_table_sql: str
+) -> None:
+    """Test that appending a DataFrame with new columns adds them to the table."""
+    create_table(db_connection, test_table_sql)
+    insert_dataframe(
+        db_connection, "test_table", pd.DataFrame({"id": [1], "name": ["Alice"]})
+    )
+    insert_dataframe(
+        db_connection,
+        "test_table",
+        pd.DataFrame({"id": [2], "name": ["Bob"], "hits": [3], "avg": [0.25]}),
+    )
+
+    column_types = {
+        row[1]: row[2] for row in db_connection.execute("PRAGMA table_info(test_table)")
+    }
+    result_df = read_table(db_connection, "test_table")
+
+    assert column_types["hits"] == "INTEGER"
+    assert column_types["avg"] == "REAL"
+    assert result_df["hits"].isna().tolist() == [True, False]
+
+
 def test_insert_dataframe_empty_dataframe(
     db_connection: sqlite3.Connection, empty_dataframe: pd.DataFrame
 ) -> None:
@@ -165,3 +190,21 @@ def test_read_table_empty_table(
 
     assert len(result_df) == 0
     assert list(result_df.columns) == ["id", "name"]
+
+
+def test_cast_stat_columns_types_numeric_columns() -> None:
+    """Test that stat columns stored as text are cast to numeric types."""
+    text_df = pd.DataFrame(
+        {
+            "playername": ["Aaron Judge", "Juan Soto"],
+            "hits": ["24", "30"],
+            "avg": [".261", "-.--"],
+        }
+    )
+    result_df = cast_stat_columns(text_df)
+
+    assert result_df["hits"].tolist() == [24, 30]
+    assert result_df["avg"].iloc[0] == 0.261
+    assert pd.isna(result_df["avg"].iloc[1])
+    assert result_df["playername"].tolist() == ["Aaron Judge", "Juan Soto"]
+    assert text_df["hits"].tolist() == ["24", "30"]
@@ -0,0 +1,42 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pandas.api.types as pdtypes
+
+from mlb_airflow_data_pipeline.dtype_utils import (
+    compact_column,
+    compact_dtypes,
+    get_memory_usage_bytes,
+)
+
+CURRENT_DIR: str = os.path.dirname(os.path.realpath(__file__))
+
+EXAMPLE_DATA_PATH: str = os.path.join(
+    CURRENT_DIR, "national_league_example_full_player_stats_df.csv"
+)
+
+
+def test_compact_column() -> None:
+    assert compact_column(pd.Series([1, 2, 3])).dtype == np.dtype("int16")
+    assert compact_column(pd.Series([1.0, 2.0, 40000.0])).dtype == np.dtype("int32")
+    # counting stats with missing values become nullable integers
+    assert compact_column(pd.Series([1.0, np.nan])).dtype == pd.Int16Dtype()
+    assert compact_column(pd.Series([0.25, 0.5])).dtype == np.dtype("float32")
+    assert compact_column(pd.Series(["a", "b"])).dtype == pd.Series(["a"]).dtype
+
+
+def test_compact_dtypes() -> None:
+    input_df: pd.DataFrame = pd.read_csv(EXAMPLE_DATA_PATH, index_col=0)
+    compact_df: pd.DataFrame = compact_dtypes(input_df)
+
+    assert get_memory_usage_bytes(compact_df) < 0.6 * get_memory_usage_bytes(input_df)
+    assert isinstance(compact_df["playername"].dtype, pd.CategoricalDtype)
+    assert isinstance(compact_df["team_id"].dtype, pd.CategoricalDtype)
+    assert pdtypes.is_integer_dtype(compact_df["homeRuns"])
+    # rates holding statsapi placeholders are parsed
+    assert compact_df["babip"].dtype == np.dtype("float32")
+    pd.testing.assert_index_equal(compact_df.index, input_df.index)
+    np.testing.assert_allclose(
+        compact_df["avg"].astype(float), input_df["avg"], rtol=1e-6
+    )
@@ -0,0 +1,143 @@
+import pandas as pd
+import pytest
+
+from mlb_airflow_data_pipeline.feature_graph_utils import (
+    FeatureDefinition,
+    FeatureEngine,
+    babip_feature,
+    mean_normalization_feature,
+    plate_appearance_feature,
+    resolve_feature_order,
+)
+
+
+@pytest.fixture
+def example_df() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "hits": [30.0, 20.0, 10.0, 5.0],
+            "homeRuns": [5.0, 4.0, 1.0, 0.0],
+            "atBats": [100.0, 80.0, 40.0, 20.0],
+            "strikeOuts": [20.0, 10.0, 8.0, 5.0],
+            "sacFlies": [2.0, 1.0, 0.0, 0.0],
+            "plateAppearances": [110.0, 90.0, 45.0, 22.0],
+        },
+        index=[101, 102, 103, 104],
+    )
+
+
+def counting_feature(
+    name: str, inputs: list[str], calls: list[str]
+) -> FeatureDefinition:
+    def function(df: pd.DataFrame) -> pd.DataFrame:
+        calls.append(name)
+        return pd.DataFrame({name: df.sum(axis=1)})
+
+    return FeatureDefinition(
+        name=name, inputs=inputs, outputs=[name], function=function
+    )
+
+
+def test_resolve_feature_order_is_topological_and_pruned() -> None:
+    calls: list[str] = []
+    feature_definitions: list[FeatureDefinition] = [
+        counting_feature("c", ["a", "b"], calls),
+        counting_feature("b", ["a", "x"], calls),
+        counting_feature("a", ["x"], calls),
+        counting_feature("unused", ["x"], calls),
+    ]
+    ordered_names: list[str] = [
+        definition.name
+        for definition in resolve_feature_order(feature_definitions, ["c"], ["x"])
+    ]
+    assert ordered_names == ["a", "b", "c"]
+
+
+def test_resolve_feature_order_errors() -> None:
+    calls: list[str] = []
+    with pytest.raises(ValueError, match="cyclically"):
+        resolve_feature_order(
+            [counting_feature("a", ["b"], calls), counting_feature("b", ["a"], calls)],
+            ["a"],
+            [],
+        )
+    with pytest.raises(ValueError, match="not declared nor available"):
+        resolve_feature_order([counting_feature("a", ["y"], calls)], ["a"], ["x"])
+    with pytest.raises(ValueError, match="declared more than once"):
+        resolve_feature_order(
+            [counting_feature("a", ["x"], calls), counting_feature("a", ["x"], calls)],
+            ["a"],
+            ["x"],
+        )
+
+
+def test_feature_engine_compute(example_df: pd.DataFrame) -> None:
+    output_df, statistics = FeatureEngine().compute(
+        example_df,
+        [
+            mean_normalization_feature(["babip", "hits"]),
+            plate_appearance_feature(["hits"]),
+            babip_feature(),
+        ],
+    )
+
+    expected_babip: pd.Series = (example_df["hits"] - example_df["homeRuns"]) / (
+        example_df["atBats"]
+        - example_df["strikeOuts"]
+        - example_df["homeRuns"]
+        + example_df["sacFlies"]
+    )
+    pd.testing.assert_series_equal(
+        output_df["babip"], expected_babip, check_names=False
+    )
+    pd.testing.assert_series_equal(
+        output_df["normalized_babip"],
+        100 * expected_babip / expected_babip.mean(),
+        check_names=False,
+    )
+    assert list(output_df.columns[: example_df.shape[1]]) == list(example_df.columns)
+    assert statistics["mean_normalization"].loc["babip", "mean"] == pytest.approx(
+        expected_babip.mean()
+    )
+
+
+def test_feature_engine_memoizes_row_wise_features(example_df: pd.DataFrame) -> None:
+    calls: list[str] = []
+    feature_definitions: list[FeatureDefinition] = [
+        counting_feature("a", ["hits", "homeRuns"], calls),
+        counting_feature("b", ["a", "atBats"], calls),
+        mean_normalization_feature(["b"]),
+    ]
+    feature_engine: FeatureEngine = FeatureEngine(example_df)
+
+    first_df, first_statistics = feature_engine.compute(
+        example_df.loc[[101, 102, 103]], feature_definitions
+    )
+    second_df, second_statistics = feature_engine.compute(
+        example_df.loc[[102, 103, 104]], feature_definitions
+    )
+
+    assert calls == ["a", "b"]
+    assert second_df["b"].tolist() == [104.0, 51.0, 25.0]
+    # the mean normalization depends on the rows, so it is not shared
+    assert first_statistics["mean_normalization"].loc["b", "mean"] == pytest.approx(
+        first_df["b"].mean()
+    )
+    assert second_statistics["mean_normalization"].loc["b", "mean"] == pytest.approx(
+        second_df["b"].mean()
+    )
+
+
+def test_feature_engine_memo_distinguishes_functions(example_df: pd.DataFrame) -> None:
+    calls: list[str] = []
+    first_definition: FeatureDefinition = counting_feature("a", ["hits"], calls)
+    second_definition: FeatureDefinition = first_definition.model_copy(
+        update={"function": lambda df: pd.DataFrame({"a": -df["hits"]})}
+    )
+    feature_engine: FeatureEngine = FeatureEngine(example_df)
+
+    first_df, _ = feature_engine.compute(example_df, [first_definition])
+    second_df, _ = feature_engine.compute(example_df, [second_definition])
+
+    assert first_df["a"].tolist() == [30.0, 20.0, 10.0, 5.0]
+    assert second_df["a"].tolist() == [-30.0, -20.0, -10.0, -5.0]
@@ -0,0 +1,160 @@
+import fcntl
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mlb_airflow_data_pipeline.feature_graph_utils import FeatureDefinition
+from mlb_airflow_data_pipeline.feature_store_utils import (
+    LOCK_FILE_NAME,
+    FeatureStore,
+    compute_config_hash,
+    compute_input_hash,
+)
+from mlb_airflow_data_pipeline.statsapi_treatment_script import (
+    DataTreaterInputRepresentation,
+    batter_input_data_repr,
+)
+
+
+@pytest.fixture
+def example_df() -> pd.DataFrame:
+    return pd.DataFrame(
+        {"playername": ["A", "B", "C"], "hits": [10.0, 20.0, 30.0]},
+        index=[101, 102, 103],
+    )
+
+
+def test_compute_input_hash(example_df: pd.DataFrame) -> None:
+    assert compute_input_hash(example_df) == compute_input_hash(example_df.copy())
+    assert compute_input_hash(example_df) != compute_input_hash(
+        example_df.assign(hits=[10.0, 20.0, 31.0])
+    )
+    assert compute_input_hash(example_df) != compute_input_hash(
+        example_df.set_axis([101, 102, 104])
+    )
+
+
+def test_compute_input_hash_ignores_inferred_float_dtype() -> None:
+    int_df = pd.DataFrame({"hits": [10, 20, 30]}, index=[101, 102, 103])
+    float_df = pd.DataFrame({"hits": [10.0, 20.0, 30.0]}, index=[101, 102, 103])
+    text_df = pd.DataFrame({"hits": ["10", "20", "30"]}, index=[101, 102, 103])
+
+    assert compute_input_hash(int_df) == compute_input_hash(float_df)
+    assert compute_input_hash(int_df) == compute_input_hash(text_df)
+    assert compute_input_hash(float_df) != compute_input_hash(
+        float_df.assign(hits=[10.0, 20.0, np.nan])
+    )
+
+
+def test_compute_config_hash() -> None:
+    assert compute_config_hash(batter_input_data_repr) == compute_config_hash(
+        batter_input_data_repr.model_copy()
+    )
+    changed_input_data_repr: DataTreaterInputRepresentation = (
+        batter_input_data_repr.model_copy(
+            update={"filter_conditions_dict": {"plateAppearances": 50}}
+        )
+    )
+    assert compute_config_hash(batter_input_data_repr) != compute_config_hash(
+        changed_input_data_repr
+    )
+
+
+def scaled_hits_representation(function) -> DataTreaterInputRepresentation:
+    return DataTreaterInputRepresentation(
+        subset_columns=["hits"],
+        filter_conditions_dict={},
+        features=[
+            FeatureDefinition(
+                name="scaled", inputs=["hits"], outputs=["scaled"], function=function
+            )
+        ],
+    )
+
+
+def scaled_hits(factor: float):
+    return lambda df: pd.DataFrame({"scaled": df["hits"] * factor})
+
+
+def test_compute_config_hash_sees_constants_and_closures() -> None:
+    config_hash: str = compute_config_hash(scaled_hits_representation(scaled_hits(2)))
+
+    assert config_hash == compute_config_hash(
+        scaled_hits_representation(scaled_hits(2))
+    )
+    assert config_hash != compute_config_hash(
+        scaled_hits_representation(scaled_hits(3))
+    )
+    assert compute_config_hash(
+        scaled_hits_representation(lambda df: pd.DataFrame({"scaled": df * 2}))
+    ) != compute_config_hash(
+        scaled_hits_representation(lambda df: pd.DataFrame({"scaled": df * 3}))
+    )
+
+
+def test_feature_store_round_trip(tmp_path, example_df: pd.DataFrame) -> None:
+    feature_store: FeatureStore = FeatureStore(root=str(tmp_path))
+    key = feature_store.get_key(
+        "national_league", "2023-06-01", example_df, batter_input_data_repr
+    )
+    assert feature_store.get(key) is None
+
+    statistics_df: pd.DataFrame = pd.DataFrame(
+        {"mean": [20.0], "std": [10.0]}, index=pd.Index(["hits"], name="feature")
+    )
+    feature_store.put(key, example_df, statistics_df)
+    cached = feature_store.get(key)
+    assert cached is not None
+    cached_df, cached_statistics_df = cached
+
+    pd.testing.assert_frame_equal(cached_df, example_df)
+    pd.testing.assert_frame_equal(cached_statistics_df, statistics_df)
+
+
+def test_feature_store_evicts_least_recently_used(
+    tmp_path, example_df: pd.DataFrame
+) -> None:
+    feature_store: FeatureStore = FeatureStore(root=str(tmp_path))
+    keys = [
+        feature_store.get_key(
+            "national_league", date, example_df, batter_input_data_repr
+        )
+        for date in ["2023-06-01", "2023-06-02", "2023-06-03"]
+    ]
+    for access_time, key in enumerate(keys[:2]):
+        entry_path = feature_store.put(key, example_df)
+        os.utime(entry_path, (access_time, access_time))
+    entry_size: int = feature_store.get_size_bytes() // 2
+
+    # reading the oldest entry makes the second one the least recently used
+    assert feature_store.get(keys[0]) is not None
+    feature_store.max_size_bytes = 2 * entry_size
+    feature_store.put(keys[2], example_df)
+
+    assert feature_store.get(keys[0]) is not None
+    assert feature_store.get(keys[1]) is None
+    assert feature_store.get(keys[2]) is not None
+
+
+def test_feature_store_put_waits_for_lock_file(
+    tmp_path, example_df: pd.DataFrame
+) -> None:
+    feature_store: FeatureStore = FeatureStore(root=str(tmp_path))
+    key = feature_store.get_key(
+        "national_league", "2023-06-01", example_df, batter_input_data_repr
+    )
+
+    # another process of the batch holds the store's lock file
+    with open(tmp_path / LOCK_FILE_NAME, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        put_thread = threading.Thread(target=feature_store.put, args=(key, example_df))
+        put_thread.start()
+        put_thread.join(timeout=0.2)
+        assert put_thread.is_alive()
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    put_thread.join()
+    assert feature_store.get(key) is not None
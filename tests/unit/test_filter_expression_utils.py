@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from mlb_airflow_data_pipeline.filter_expression_utils import (
+    FilterExpression,
+    compile_filter_conditions,
+)
+
+
+@pytest.fixture
+def player_stats() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "playername": ["Aaron Judge", "Anthony Rizzo", "Pete Alonso", "Max Muncy"],
+            "team_id": [147, 147, 121, 119],
+            "plateAppearances": [250.0, 80.0, 240.0, np.nan],
+            "homeRuns": pd.array([19, 4, 20, None], dtype="Int16"),
+        }
+    )
+
+
+def test_legacy_conditions_are_minimums(player_stats: pd.DataFrame) -> None:
+    filter_expression: FilterExpression = compile_filter_conditions(
+        {"plateAppearances": 100, "homeRuns": 19}
+    )
+
+    assert filter_expression.filters == [
+        ("plateAppearances", ">=", 100),
+        ("homeRuns", ">=", 19),
+    ]
+    assert filter_expression.evaluate(player_stats).tolist() == [
+        True,
+        False,
+        True,
+        False,
+    ]
+
+
+def test_ranges_equalities_and_or_groups(player_stats: pd.DataFrame) -> None:
+    filter_expression: FilterExpression = compile_filter_conditions(
+        {
+            "plateAppearances": {">=": 50, "<": 245},
+            "or": [{"team_id": {"in": [147]}}, {"homeRuns": {"==": 20}}],
+        }
+    )
+
+    assert filter_expression.get_columns() == [
+        "plateAppearances",
+        "team_id",
+        "homeRuns",
+    ]
+    assert filter_expression.evaluate(player_stats).tolist() == [
+        False,
+        True,
+        True,
+        False,
+    ]
+    sql, params = filter_expression.to_sql()
+    assert sql == (
+        '"plateAppearances" >= ? AND "plateAppearances" < ? '
+        'AND (("team_id" IN (?)) OR ("homeRuns" = ?))'
+    )
+    assert params == [50, 245, 147, 20]
+
+
+def test_missing_values_never_match(player_stats: pd.DataFrame) -> None:
+    filter_expression: FilterExpression = compile_filter_conditions(
+        {"homeRuns": {"!=": 4}}
+    )
+
+    assert filter_expression.evaluate(player_stats).tolist() == [
+        True,
+        False,
+        True,
+        False,
+    ]
+
+
+def test_empty_conditions_keep_every_row(player_stats: pd.DataFrame) -> None:
+    filter_expression: FilterExpression = compile_filter_conditions({})
+
+    assert filter_expression.evaluate(player_stats).all()
+    assert filter_expression.to_sql() == ("1 = 1", [])
+
+
+def test_invalid_conditions() -> None:
+    with pytest.raises(ValueError):
+        compile_filter_conditions({"homeRuns": {"~": 4}})
+    with pytest.raises(ValueError):
+        compile_filter_conditions({"or": []})
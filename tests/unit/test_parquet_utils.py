@@ -0,0 +1,157 @@
+import pandas as pd
+import pandas.api.types as pdtypes
+import pytest
+
+from mlb_airflow_data_pipeline.parquet_utils import (
+    get_partition_path,
+    read_partitions,
+    write_partition,
+)
+from mlb_airflow_data_pipeline.zone_map_utils import read_zone_map, write_zone_map
+
+
+@pytest.fixture
+def parquet_root(tmp_path) -> str:
+    """Create a temporary Parquet store for testing."""
+    return str(tmp_path / "parquet")
+
+
+@pytest.fixture
+def sample_player_stats() -> pd.DataFrame:
+    """Create a sample player stats snapshot as returned by the extraction."""
+    return pd.DataFrame(
+        {
+            "playername": ["Aaron Judge", "Juan Soto", "Mookie Betts"],
+            "team_id": [147, 135, 119],
+            "homeRuns": ["6", "4", "5"],
+            "avg": [".261", ".240", "-.--"],
+            "date": ["2023-05-01"] * 3,
+        },
+        index=[592450, 665742, 605141],
+    )
+
+
+def test_write_partition_creates_partitioned_file(
+    parquet_root: str, sample_player_stats: pd.DataFrame
+) -> None:
+    """Test that a snapshot is written under its league/season/date partition."""
+    file_path = write_partition(
+        sample_player_stats,
+        "player_stats",
+        "american_league",
+        "2023-05-01",
+        season=2023,
+        root=parquet_root,
+        index_label="player_id",
+    )
+
+    expected_partition = get_partition_path(
+        parquet_root, "player_stats", "american_league", 2023, "2023-05-01"
+    )
+    assert file_path.parent == expected_partition
+    assert file_path.exists()
+
+
+def test_read_partitions_returns_typed_columns(
+    parquet_root: str, sample_player_stats: pd.DataFrame
+) -> None:
+    """Test that the stats are read back with numeric types."""
+    write_partition(
+        sample_player_stats,
+        "player_stats",
+        "american_league",
+        "2023-05-01",
+        season=2023,
+        root=parquet_root,
+        index_label="player_id",
+    )
+    result_df = read_partitions("player_stats", root=parquet_root)
+
+    assert result_df["player_id"].tolist() == [592450, 665742, 605141]
+    assert pdtypes.is_integer_dtype(result_df["homeRuns"])
+    assert pdtypes.is_float_dtype(result_df["avg"])
+    assert result_df["avg"].isna().sum() == 1
+    assert result_df["date"].unique().tolist() == ["2023-05-01"]
+    assert result_df["league"].unique().tolist() == ["american_league"]
+
+
+def test_read_partitions_prunes_partitions_and_columns(
+    parquet_root: str, sample_player_stats: pd.DataFrame
+) -> None:
+    """Test that only the requested partitions and columns are read."""
+    for league_name in ["american_league", "national_league"]:
+        for date in ["2023-05-01", "2023-05-02"]:
+            write_partition(
+                sample_player_stats,
+                "player_stats",
+                league_name,
+                date,
+                season=2023,
+                root=parquet_root,
+            )
+
+    result_df = read_partitions(
+        "player_stats",
+        league_name="national_league",
+        dates=["2023-05-02"],
+        columns=["playername", "homeRuns"],
+        root=parquet_root,
+    )
+
+    assert len(result_df) == 3
+    assert list(result_df.columns) == [
+        "playername",
+        "homeRuns",
+        "league",
+        "season",
+        "date",
+    ]
+    assert result_df["league"].unique().tolist() == ["national_league"]
+    assert result_df["date"].unique().tolist() == ["2023-05-02"]
+
+
+def test_read_partitions_missing_table(parquet_root: str) -> None:
+    """Test that reading a table that was never written raises an error."""
+    with pytest.raises(FileNotFoundError, match="No Parquet dataset found"):
+        read_partitions("player_stats", root=parquet_root)
+
+
+def test_read_partitions_skips_partitions_with_zone_maps(
+    parquet_root: str, sample_player_stats: pd.DataFrame
+) -> None:
+    """Test that partitions whose zone map excludes the filter are never read."""
+    for date in ["2023-05-01", "2023-05-02"]:
+        write_partition(
+            sample_player_stats,
+            "player_stats",
+            "american_league",
+            date,
+            season=2023,
+            root=parquet_root,
+        )
+
+    # the zone map of the first partition is made to exclude the filter, so
+    # its rows can only be returned if the partition is not skipped
+    skipped_partition = get_partition_path(
+        parquet_root, "player_stats", "american_league", 2023, "2023-05-01"
+    )
+    zone_map = read_zone_map(skipped_partition)
+    assert zone_map is not None
+    zone_map["columns"]["homeRuns"]["max"] = 0.0
+    write_zone_map(zone_map, skipped_partition)
+
+    result_df = read_partitions(
+        "player_stats", filters=[("homeRuns", ">=", 6)], root=parquet_root
+    )
+
+    assert result_df["date"].unique().tolist() == ["2023-05-02"]
+    assert result_df["playername"].tolist() == ["Aaron Judge"]
+
+    empty_df = read_partitions(
+        "player_stats",
+        columns=["playername"],
+        filters=[("homeRuns", ">=", 50)],
+        root=parquet_root,
+    )
+    assert len(empty_df) == 0
+    assert "playername" in empty_df.columns
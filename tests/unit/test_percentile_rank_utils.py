@@ -0,0 +1,71 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mlb_airflow_data_pipeline.db_utils import cast_stat_columns
+from mlb_airflow_data_pipeline.percentile_rank_utils import (
+    compute_percentile_ranks,
+    get_leaderboard,
+    get_stat_columns,
+)
+
+CURRENT_DIR: str = os.path.dirname(os.path.realpath(__file__))
+
+EXAMPLE_DATA_PATH: str = os.path.join(
+    CURRENT_DIR, "national_league_example_full_player_stats_df.csv"
+)
+
+
+@pytest.fixture
+def example_df() -> pd.DataFrame:
+    return cast_stat_columns(pd.read_csv(EXAMPLE_DATA_PATH, index_col=0))
+
+
+def test_percentile_ranks_match_pandas(example_df: pd.DataFrame) -> None:
+    stat_columns: list[str] = get_stat_columns(example_df)
+
+    percentile_ranks_df: pd.DataFrame = compute_percentile_ranks(example_df)
+
+    assert "team_id" not in stat_columns
+    assert "playername" not in stat_columns
+    assert percentile_ranks_df.shape == (len(example_df), len(stat_columns))
+    np.testing.assert_allclose(
+        percentile_ranks_df.to_numpy(),
+        example_df[stat_columns].rank(pct=True).to_numpy(),
+    )
+
+
+def test_percentile_ranks_with_ties_and_missing_values() -> None:
+    input_df: pd.DataFrame = pd.DataFrame({"homeRuns": [3.0, np.nan, 1.0, 3.0, 0.0]})
+
+    percentile_ranks_df: pd.DataFrame = compute_percentile_ranks(input_df)
+
+    np.testing.assert_array_equal(
+        percentile_ranks_df["homeRuns_percentile_rank"],
+        [0.875, np.nan, 0.5, 0.875, 0.25],
+    )
+
+
+def test_get_leaderboard(example_df: pd.DataFrame) -> None:
+    percentile_ranks_df: pd.DataFrame = compute_percentile_ranks(
+        example_df, ["rbi", "atBatsPerHomeRun"]
+    )
+
+    top_df: pd.DataFrame = get_leaderboard(example_df, percentile_ranks_df, "rbi")
+    bottom_df: pd.DataFrame = get_leaderboard(
+        example_df, percentile_ranks_df, "rbi", top_n=5, ascending=True
+    )
+
+    assert top_df["rbi"].tolist() == example_df["rbi"].nlargest(10).tolist()
+    assert bottom_df["rbi"].tolist() == example_df["rbi"].nsmallest(5).tolist()
+    # players without the stat come last
+    assert (
+        get_leaderboard(
+            example_df, percentile_ranks_df, "atBatsPerHomeRun", top_n=len(example_df)
+        )["atBatsPerHomeRun"]
+        .iloc[-1:]
+        .isna()
+        .all()
+    )
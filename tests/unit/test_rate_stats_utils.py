@@ -0,0 +1,101 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mlb_airflow_data_pipeline.rate_stats_utils import (
+    compute_rate_stats,
+    innings_to_outs,
+    parse_innings_pitched,
+    recompute_rate_stats,
+    safe_divide,
+)
+
+CURRENT_DIR: str = os.path.dirname(os.path.realpath(__file__))
+
+EXAMPLE_DATA_PATH: str = os.path.join(
+    CURRENT_DIR, "national_league_example_full_player_stats_df.csv"
+)
+
+
+@pytest.fixture
+def example_df() -> pd.DataFrame:
+    return pd.read_csv(EXAMPLE_DATA_PATH, index_col=0)
+
+
+def test_innings_to_outs() -> None:
+    innings_pitched: np.ndarray = np.array([["123.1", "0.2"], ["45", "-.--"]])
+
+    outs: np.ndarray = innings_to_outs(innings_pitched)
+
+    assert outs.shape == (2, 2)
+    np.testing.assert_array_equal(outs, [[370.0, 2.0], [135.0, np.nan]])
+    # a fraction of an inning can only be one or two outs
+    assert np.isnan(innings_to_outs([12.5])).all()
+    np.testing.assert_allclose(parse_innings_pitched([20.1]), [61 / 3])
+
+
+def test_safe_divide() -> None:
+    np.testing.assert_array_equal(
+        safe_divide([1.0, 1.0, 0.0, 1.0], [2.0, 0.0, 0.0, np.nan]),
+        [0.5, np.nan, np.nan, np.nan],
+    )
+
+
+def test_compute_rate_stats() -> None:
+    rate_stats: dict[str, np.ndarray] = compute_rate_stats(
+        {
+            "hits": np.array([30, 0]),
+            "atBats": np.array([100, 0]),
+            "baseOnBalls": np.array([10, 0]),
+            "hitByPitch": np.array([2, 0]),
+            "sacFlies": np.array([3, 0]),
+            "totalBases": np.array([50, 0]),
+            "earnedRuns": np.array([7, 1]),
+            "inningsPitched": np.array(["20.1", "0.0"]),
+        },
+        ["avg", "ops", "era"],
+    )
+
+    np.testing.assert_allclose(rate_stats["avg"], [0.3, np.nan])
+    np.testing.assert_allclose(rate_stats["ops"], [42 / 115 + 0.5, np.nan])
+    np.testing.assert_allclose(rate_stats["era"], [9 * 7 / (61 / 3), np.nan])
+
+
+def test_compute_rate_stats_invalid_input() -> None:
+    with pytest.raises(ValueError):
+        compute_rate_stats({"hits": np.array([1])}, ["unknown"])
+    with pytest.raises(ValueError):
+        compute_rate_stats({"hits": np.array([1])}, ["avg"])
+
+
+def test_recompute_rate_stats_match_rounded_ones(example_df: pd.DataFrame) -> None:
+    rate_stat_names: list[str] = [
+        "avg",
+        "obp",
+        "slg",
+        "ops",
+        "babip",
+        "stolenBasePercentage",
+        "era",
+        "fielding",
+    ]
+
+    rate_stats_df: pd.DataFrame = recompute_rate_stats(example_df, rate_stat_names)
+
+    assert list(rate_stats_df.columns) == rate_stat_names
+    pd.testing.assert_index_equal(rate_stats_df.index, example_df.index)
+    for rate_stat_name in rate_stat_names:
+        rounded_values: pd.Series = pd.to_numeric(
+            example_df[rate_stat_name], errors="coerce"
+        )
+        is_present: pd.Series = (
+            rounded_values.notna() & rate_stats_df[rate_stat_name].notna()
+        )
+        assert is_present.any()
+        np.testing.assert_allclose(
+            rate_stats_df.loc[is_present, rate_stat_name],
+            rounded_values[is_present],
+            atol=0.0051,
+        )
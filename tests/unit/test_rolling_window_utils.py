@@ -0,0 +1,288 @@
+import sqlite3
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mlb_airflow_data_pipeline.db_utils import create_connection, read_table
+from mlb_airflow_data_pipeline.rolling_window_utils import (
+    DELTAS_TABLE_NAME,
+    RollingWindowAggregator,
+    compute_daily_increments,
+    read_season_increments,
+)
+from mlb_airflow_data_pipeline.parquet_utils import write_partition
+from mlb_airflow_data_pipeline.snapshot_utils import SnapshotStore
+
+PLAYER_IDS: list[int] = [592450, 665742, 605141]
+
+
+@pytest.fixture
+def db_connection(tmp_path) -> Iterator[sqlite3.Connection]:
+    """Create a database connection for testing."""
+    with create_connection(str(tmp_path / "rolling_windows.db")) as conn:
+        yield conn
+
+
+@pytest.fixture
+def cumulative_snapshots() -> dict[str, pd.DataFrame]:
+    """Create cumulative snapshots over 12 days, skipping some dates."""
+    rng: np.random.Generator = np.random.default_rng(0)
+    dates: list[str] = [
+        date.strftime("%Y-%m-%d")
+        for date in pd.date_range("2023-05-01", "2023-05-12")
+        if date.day not in (4, 5, 9)
+    ]
+    daily_increments: np.ndarray = rng.integers(0, 5, (len(dates), 3, 2))
+    cumulative_stats: np.ndarray = daily_increments.cumsum(axis=0)
+    return {
+        date: pd.DataFrame(
+            {
+                "playername": ["Aaron Judge", "Juan Soto", "Mookie Betts"],
+                # stats are extracted as text
+                "plateAppearances": cumulative_stats[i, :, 0].astype(str),
+                "homeRuns": cumulative_stats[i, :, 1].astype(str),
+            },
+            index=PLAYER_IDS,
+        )
+        for i, date in enumerate(dates)
+    }
+
+
+def expected_window(
+    cumulative_snapshots: dict[str, pd.DataFrame], date: str, window_days: int
+) -> pd.DataFrame:
+    """Window sums recomputed from the whole history."""
+    dates: list[str] = sorted(cumulative_snapshots)
+    window_start: str = (pd.Timestamp(date) - pd.Timedelta(days=window_days)).strftime(
+        "%Y-%m-%d"
+    )
+    total_df: pd.DataFrame = pd.DataFrame(
+        0.0, index=PLAYER_IDS, columns=["plateAppearances", "homeRuns"]
+    )
+    for previous_date, current_date in zip(dates, dates[1:]):
+        if window_start < current_date <= date:
+            total_df += cumulative_snapshots[current_date][total_df.columns].astype(
+                float
+            ) - cumulative_snapshots[previous_date][total_df.columns].astype(float)
+    return total_df
+
+
+def test_rolling_windows_match_full_history(
+    db_connection: sqlite3.Connection, cumulative_snapshots: dict[str, pd.DataFrame]
+) -> None:
+    aggregator: RollingWindowAggregator = RollingWindowAggregator(
+        db_connection, stats=["plateAppearances", "homeRuns"], window_days=[3, 7]
+    )
+    for date, snapshot_df in cumulative_snapshots.items():
+        aggregator.update(snapshot_df, "american_league", date)
+
+        for window_days in [3, 7]:
+            window_df: pd.DataFrame = aggregator.read_window(
+                "american_league", window_days
+            )
+            expected_df: pd.DataFrame = expected_window(
+                cumulative_snapshots, date, window_days
+            )
+            window_df = window_df.reindex(PLAYER_IDS).fillna(0.0)
+            np.testing.assert_allclose(
+                window_df[["plateAppearances", "homeRuns"]].to_numpy(),
+                expected_df.to_numpy(),
+            )
+
+    window_df = aggregator.read_window("american_league", 7)
+    assert "homeRunsperplateAppearance" in window_df.columns
+    assert (window_df["date"] == "2023-05-12").all()
+
+    # only the increments still inside the longest window are kept
+    deltas_df: pd.DataFrame = read_table(db_connection, DELTAS_TABLE_NAME)
+    assert deltas_df["date"].min() > "2023-05-05"
+
+
+def test_rolling_windows_update_changed_matches_full_update(
+    tmp_path,
+    db_connection: sqlite3.Connection,
+    cumulative_snapshots: dict[str, pd.DataFrame],
+) -> None:
+    aggregator: RollingWindowAggregator = RollingWindowAggregator(
+        db_connection, stats=["plateAppearances", "homeRuns"], window_days=[3, 7]
+    )
+    snapshot_store: SnapshotStore = SnapshotStore(db_connection)
+    with create_connection(str(tmp_path / "full_update.db")) as full_update_conn:
+        full_update_aggregator: RollingWindowAggregator = RollingWindowAggregator(
+            full_update_conn,
+            stats=["plateAppearances", "homeRuns"],
+            window_days=[3, 7],
+        )
+        for date, snapshot_df in cumulative_snapshots.items():
+            snapshot_store.write_snapshot(snapshot_df, "american_league", date)
+            aggregator.update_changed(snapshot_store, "american_league", date)
+            full_update_aggregator.update(snapshot_df, "american_league", date)
+
+            for window_days in [3, 7]:
+                pd.testing.assert_frame_equal(
+                    aggregator.read_window("american_league", window_days),
+                    full_update_aggregator.read_window("american_league", window_days),
+                )
+
+
+def test_rolling_windows_update_changed_reads_changed_players(
+    db_connection: sqlite3.Connection,
+    cumulative_snapshots: dict[str, pd.DataFrame],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    aggregator: RollingWindowAggregator = RollingWindowAggregator(
+        db_connection, stats=["plateAppearances", "homeRuns"], window_days=[3, 7]
+    )
+    snapshot_store: SnapshotStore = SnapshotStore(db_connection)
+    updated_rows: list[int] = []
+    update = aggregator.update
+
+    def spy_update(snapshot_df: pd.DataFrame, league_name: str, date: str) -> int:
+        updated_rows.append(len(snapshot_df))
+        return update(snapshot_df, league_name, date)
+
+    monkeypatch.setattr(aggregator, "update", spy_update)
+
+    first_df: pd.DataFrame = cumulative_snapshots["2023-05-01"]
+    # on a quiet day, only one player played
+    quiet_day_df: pd.DataFrame = first_df.copy()
+    quiet_day_df.loc[PLAYER_IDS[0], "plateAppearances"] = "100"
+    for date, snapshot_df in [("2023-05-01", first_df), ("2023-05-02", quiet_day_df)]:
+        snapshot_store.write_snapshot(snapshot_df, "american_league", date)
+        aggregator.update_changed(snapshot_store, "american_league", date)
+
+    assert updated_rows == [len(PLAYER_IDS), 1]
+    window_df: pd.DataFrame = aggregator.read_window("american_league", 3)
+    assert window_df.loc[PLAYER_IDS[0], "plateAppearances"] == 100 - float(
+        first_df.loc[PLAYER_IDS[0], "plateAppearances"]
+    )
+
+
+def test_rolling_windows_keep_absent_players_baseline(
+    db_connection: sqlite3.Connection, cumulative_snapshots: dict[str, pd.DataFrame]
+) -> None:
+    """Test that a player missing from some snapshots, e.g. on the injured
+    list, is diffed against their last snapshot when they come back."""
+    aggregator: RollingWindowAggregator = RollingWindowAggregator(
+        db_connection, stats=["plateAppearances", "homeRuns"], window_days=[3, 7]
+    )
+    dates: list[str] = sorted(cumulative_snapshots)
+    absent_dates: list[str] = dates[2:4]
+    # the stats of the absent player do not change until they come back
+    expected_snapshots: dict[str, pd.DataFrame] = dict(cumulative_snapshots)
+    for date in absent_dates:
+        expected_snapshots[date] = cumulative_snapshots[date].copy()
+        expected_snapshots[date].loc[PLAYER_IDS[2]] = cumulative_snapshots[
+            dates[1]
+        ].loc[PLAYER_IDS[2]]
+
+    for date, snapshot_df in cumulative_snapshots.items():
+        if date in absent_dates:
+            snapshot_df = snapshot_df.drop(PLAYER_IDS[2])
+        aggregator.update(snapshot_df, "american_league", date)
+
+        for window_days in [3, 7]:
+            window_df: pd.DataFrame = aggregator.read_window(
+                "american_league", window_days
+            )
+            expected_df: pd.DataFrame = expected_window(
+                expected_snapshots, date, window_days
+            )
+            window_df = window_df.reindex(PLAYER_IDS).fillna(0.0)
+            np.testing.assert_allclose(
+                window_df[["plateAppearances", "homeRuns"]].to_numpy(),
+                expected_df.to_numpy(),
+            )
+
+
+def test_rolling_windows_skip_processed_dates(
+    db_connection: sqlite3.Connection, cumulative_snapshots: dict[str, pd.DataFrame]
+) -> None:
+    aggregator: RollingWindowAggregator = RollingWindowAggregator(
+        db_connection, stats=["plateAppearances", "homeRuns"], window_days=[7]
+    )
+    dates: list[str] = sorted(cumulative_snapshots)
+    assert (
+        aggregator.update(cumulative_snapshots[dates[0]], "american_league", dates[0])
+        == 0
+    )
+    aggregator.update(cumulative_snapshots[dates[1]], "american_league", dates[1])
+    window_df: pd.DataFrame = aggregator.read_window("american_league", 7)
+
+    assert (
+        aggregator.update(cumulative_snapshots[dates[1]], "american_league", dates[1])
+        == 0
+    )
+    pd.testing.assert_frame_equal(
+        aggregator.read_window("american_league", 7), window_df
+    )
+    assert aggregator.get_last_date("american_league") == dates[1]
+    assert aggregator.get_last_date("national_league") is None
+
+    with pytest.raises(ValueError, match="No rolling window of 14 days"):
+        aggregator.read_window("american_league", 14)
+
+
+def test_daily_increments_match_consecutive_snapshots(
+    tmp_path, cumulative_snapshots: dict[str, pd.DataFrame]
+) -> None:
+    """Test that the increments rebuilt from the stored snapshots match the
+    differences between consecutive snapshots of every player."""
+    dates: list[str] = sorted(cumulative_snapshots)
+    for i, date in enumerate(dates):
+        snapshot_df: pd.DataFrame = cumulative_snapshots[date].assign(
+            # the second player is traded halfway through
+            team_id=[147, 121 if i < len(dates) // 2 else 119, 119]
+        )
+        # the third player only appears from the third snapshot on
+        if i < 2:
+            snapshot_df = snapshot_df.drop(index=PLAYER_IDS[2])
+        write_partition(
+            snapshot_df, "player_stats", "MLB", date, 2023, str(tmp_path), "player_id"
+        )
+
+    increments_df: pd.DataFrame = read_season_increments(
+        "MLB", 2023, stats=["plateAppearances", "homeRuns"], root=str(tmp_path)
+    )
+
+    assert len(increments_df) == 3 * len(dates) - 2
+    for player_id in PLAYER_IDS:
+        player_df: pd.DataFrame = increments_df[increments_df["player_id"] == player_id]
+        player_dates: list[str] = list(player_df["date"])
+        assert player_dates == sorted(player_dates)
+        assert pd.isna(player_df["previous_date"].iloc[0])
+        assert list(player_df["previous_date"].iloc[1:]) == player_dates[:-1]
+        # the first snapshot of a player is taken against zero
+        first_snapshot_df = cumulative_snapshots[player_dates[0]]
+        assert player_df["homeRuns"].iloc[0] == float(
+            first_snapshot_df.loc[player_id, "homeRuns"]
+        )
+        assert player_df[["plateAppearances", "homeRuns"]].sum().tolist() == [
+            float(cumulative_snapshots[dates[-1]].loc[player_id, col])
+            for col in ["plateAppearances", "homeRuns"]
+        ]
+
+    # gaps between snapshots are reported
+    assert increments_df["days_elapsed"].max() == 3
+    assert increments_df["is_team_change"].sum() == 1
+    traded_df: pd.DataFrame = increments_df[increments_df["is_team_change"]]
+    assert traded_df["player_id"].tolist() == [PLAYER_IDS[1]]
+    assert traded_df["team_id"].tolist() == [119]
+
+
+def test_daily_increments_keep_missing_stats() -> None:
+    """Test that a stat missing on one day keeps its previous cumulative value."""
+    snapshots_df: pd.DataFrame = pd.DataFrame(
+        {
+            "player_id": [1, 1, 1],
+            "date": ["2023-05-01", "2023-05-02", "2023-05-03"],
+            "team_id": [147, 147, 147],
+            "homeRuns": ["1", "-.--", "3"],
+        }
+    )
+
+    increments_df: pd.DataFrame = compute_daily_increments(snapshots_df, ["homeRuns"])
+
+    assert increments_df["homeRuns"].tolist() == [1.0, 0.0, 2.0]
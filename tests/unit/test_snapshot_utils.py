@@ -0,0 +1,243 @@
+import sqlite3
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mlb_airflow_data_pipeline.db_utils import create_connection, read_table
+from mlb_airflow_data_pipeline.snapshot_utils import (
+    SnapshotDateIndex,
+    SnapshotStore,
+    align_snapshots,
+    compute_row_hashes,
+)
+
+
+@pytest.fixture
+def db_connection(tmp_path) -> Iterator[sqlite3.Connection]:
+    """Create a database connection for testing."""
+    with create_connection(str(tmp_path / "snapshots.db")) as conn:
+        yield conn
+
+
+@pytest.fixture
+def daily_snapshots() -> dict[str, pd.DataFrame]:
+    """Create three consecutive cumulative snapshots, indexed by player id."""
+    return {
+        "2023-05-01": pd.DataFrame(
+            {"playername": ["Aaron Judge", "Juan Soto", "Pete Alonso"]},
+            index=[592450, 665742, 624413],
+        ).assign(homeRuns=["6", "4", "9"], date="2023-05-01"),
+        "2023-05-02": pd.DataFrame(
+            {"playername": ["Aaron Judge", "Juan Soto", "Mookie Betts"]},
+            index=[592450, 665742, 605141],
+        ).assign(homeRuns=["7", "4", "5"], date="2023-05-02"),
+        "2023-05-03": pd.DataFrame(
+            {"playername": ["Aaron Judge", "Juan Soto", "Mookie Betts"]},
+            index=[592450, 665742, 605141],
+        ).assign(homeRuns=["7", "4", "5"], date="2023-05-03"),
+    }
+
+
+def test_compute_row_hashes_is_dtype_independent() -> None:
+    """Test that the same values hash the same whether stored as text or numbers."""
+    text_df = pd.DataFrame({"hits": ["24", "30"], "runs": ["1", "2"]})
+    numeric_df = pd.DataFrame({"hits": [24, 30], "runs": [1, 2]})
+
+    text_hashes = compute_row_hashes(text_df, ["hits", "runs"])
+    numeric_hashes = compute_row_hashes(numeric_df, ["runs", "hits"])
+
+    assert text_hashes.tolist() == numeric_hashes.tolist()
+    assert text_hashes.iloc[0] != text_hashes.iloc[1]
+
+
+def test_compute_row_hashes_ignores_inferred_float_dtype() -> None:
+    """Test that integers hash the same once a missing value makes pandas
+    infer the column as float."""
+    int_df = pd.DataFrame({"hits": [24, 30, 12], "playername": ["a", "b", "c"]})
+    float_df = pd.DataFrame(
+        {"hits": [24.0, 30.0, np.nan], "playername": ["a", "b", None]}
+    )
+    assert float_df["hits"].dtype == np.dtype("float64")
+
+    int_hashes = compute_row_hashes(int_df, ["hits", "playername"])
+    float_hashes = compute_row_hashes(float_df, ["hits", "playername"])
+
+    assert int_hashes.iloc[:2].tolist() == float_hashes.iloc[:2].tolist()
+    assert int_hashes.iloc[2] != float_hashes.iloc[2]
+
+
+def test_write_snapshot_stores_only_changed_rows(
+    db_connection: sqlite3.Connection, daily_snapshots: dict[str, pd.DataFrame]
+) -> None:
+    """Test that only new, changed and removed players are written."""
+    snapshot_store = SnapshotStore(db_connection)
+
+    rows_written = [
+        snapshot_store.write_snapshot(snapshot_df, "american_league", date)
+        for date, snapshot_df in daily_snapshots.items()
+    ]
+
+    # day 2: Judge changed, Betts is new and Alonso was removed; day 3: no changes
+    assert rows_written == [3, 3, 0]
+    assert len(read_table(db_connection, "player_stats_snapshots")) == 6
+    assert snapshot_store.get_dates("american_league") == list(daily_snapshots)
+
+
+@pytest.mark.parametrize("date", ["2023-05-01", "2023-05-02", "2023-05-03"])
+def test_read_snapshot_rebuilds_full_snapshot(
+    db_connection: sqlite3.Connection,
+    daily_snapshots: dict[str, pd.DataFrame],
+    date: str,
+) -> None:
+    """Test that every date is rebuilt exactly as it was written."""
+    snapshot_store = SnapshotStore(db_connection)
+    for snapshot_date, snapshot_df in daily_snapshots.items():
+        snapshot_store.write_snapshot(snapshot_df, "american_league", snapshot_date)
+
+    result_df = snapshot_store.read_snapshot("american_league", date)
+    expected_df = daily_snapshots[date].sort_index()
+
+    assert result_df.index.tolist() == expected_df.index.tolist()
+    assert result_df["playername"].tolist() == expected_df["playername"].tolist()
+    assert result_df["homeRuns"].tolist() == expected_df["homeRuns"].tolist()
+    assert result_df["date"].unique().tolist() == [date]
+
+
+def test_write_snapshot_rerun_is_idempotent(
+    db_connection: sqlite3.Connection, daily_snapshots: dict[str, pd.DataFrame]
+) -> None:
+    """Test that writing the same date twice does not duplicate rows."""
+    snapshot_store = SnapshotStore(db_connection)
+    first_snapshot_df = daily_snapshots["2023-05-01"]
+
+    snapshot_store.write_snapshot(first_snapshot_df, "american_league", "2023-05-01")
+    snapshot_store.write_snapshot(first_snapshot_df, "american_league", "2023-05-01")
+
+    assert len(read_table(db_connection, "player_stats_snapshots")) == 3
+    result_df = snapshot_store.read_snapshot(
+        "american_league", "2023-05-01", columns=["homeRuns"]
+    )
+    assert list(result_df.columns) == ["homeRuns", "date"]
+
+
+@pytest.mark.parametrize(
+    "date, expected_date",
+    [
+        ("2023-04-30", None),
+        ("2023-05-01", "2023-05-01"),
+        ("2023-05-09", "2023-05-01"),
+        ("2023-05-10", "2023-05-10"),
+        ("2023-06-01", "2023-05-20"),
+    ],
+)
+def test_snapshot_date_index_nearest_date(date: str, expected_date: str) -> None:
+    """Test that the latest date on or before the requested one is found."""
+    date_index = SnapshotDateIndex(["2023-05-20", "2023-05-01", "2023-05-10"])
+    assert date_index.get_nearest_date(date) == expected_date
+
+
+def test_get_stats_as_of_uses_nearest_snapshot(
+    db_connection: sqlite3.Connection, daily_snapshots: dict[str, pd.DataFrame]
+) -> None:
+    """Test that a date without a snapshot falls back to the previous one."""
+    snapshot_store = SnapshotStore(db_connection)
+    for date in ["2023-05-01", "2023-05-02"]:
+        snapshot_store.write_snapshot(daily_snapshots[date], "american_league", date)
+
+    result_df = snapshot_store.get_stats_as_of(
+        "american_league", "2023-05-15", columns=["homeRuns"]
+    )
+
+    assert result_df["date"].unique().tolist() == ["2023-05-02"]
+    assert result_df.loc[592450, "homeRuns"] == "7"
+
+    with pytest.raises(ValueError, match="No american_league snapshot available"):
+        snapshot_store.get_stats_as_of("american_league", "2023-04-01")
+
+
+def test_get_stats_diff_aligns_players(
+    db_connection: sqlite3.Connection, daily_snapshots: dict[str, pd.DataFrame]
+) -> None:
+    """Test that both snapshots only keep the players they have in common."""
+    snapshot_store = SnapshotStore(db_connection)
+    for date in ["2023-05-01", "2023-05-02"]:
+        snapshot_store.write_snapshot(daily_snapshots[date], "american_league", date)
+
+    current_df, previous_df = snapshot_store.get_stats_diff(
+        "american_league", "2023-05-02", "2023-05-01", columns=["homeRuns"]
+    )
+
+    assert current_df.index.tolist() == [592450, 665742]
+    assert previous_df.index.tolist() == [592450, 665742]
+    assert current_df["homeRuns"].tolist() == ["7", "4"]
+    assert previous_df["homeRuns"].tolist() == ["6", "4"]
+
+
+def test_get_changed_players_compares_row_hashes(
+    db_connection: sqlite3.Connection, daily_snapshots: dict[str, pd.DataFrame]
+) -> None:
+    """Test that only new, changed and removed players are returned."""
+    snapshot_store = SnapshotStore(db_connection)
+    for date, snapshot_df in daily_snapshots.items():
+        snapshot_store.write_snapshot(snapshot_df, "american_league", date)
+
+    changes_df = snapshot_store.get_changed_players("american_league", "2023-05-01")
+
+    assert changes_df["change_type"].to_dict() == {
+        592450: "changed",
+        605141: "new",
+        624413: "removed",
+    }
+    assert changes_df["previous_row_hash"].notna().tolist() == [True, False, True]
+    assert snapshot_store.get_changed_players("american_league", "2023-05-02").empty
+
+
+def test_get_changed_players_ignores_reverted_stats(
+    db_connection: sqlite3.Connection, daily_snapshots: dict[str, pd.DataFrame]
+) -> None:
+    """Test that a player whose stats came back to their value is unchanged."""
+    snapshot_store = SnapshotStore(db_connection)
+    first_snapshot_df = daily_snapshots["2023-05-01"]
+    snapshot_store.write_snapshot(first_snapshot_df, "american_league", "2023-05-01")
+    snapshot_store.write_snapshot(
+        first_snapshot_df.assign(homeRuns=["7", "4", "9"]),
+        "american_league",
+        "2023-05-02",
+    )
+    snapshot_store.write_snapshot(first_snapshot_df, "american_league", "2023-05-03")
+
+    changes_df = snapshot_store.get_changed_players(
+        "american_league", "2023-05-01", "2023-05-03"
+    )
+
+    assert changes_df.empty
+
+
+def test_read_changed_stats_returns_changed_rows_only(
+    db_connection: sqlite3.Connection, daily_snapshots: dict[str, pd.DataFrame]
+) -> None:
+    """Test that the stats of the new and changed players are rebuilt."""
+    snapshot_store = SnapshotStore(db_connection)
+    for date, snapshot_df in daily_snapshots.items():
+        snapshot_store.write_snapshot(snapshot_df, "american_league", date)
+
+    result_df = snapshot_store.read_changed_stats(
+        "american_league", "2023-05-01", columns=["homeRuns"]
+    )
+
+    assert result_df.index.tolist() == [592450, 605141]
+    assert result_df["homeRuns"].tolist() == ["7", "5"]
+    assert result_df["date"].unique().tolist() == ["2023-05-03"]
+
+
+def test_align_snapshots_drops_duplicated_players() -> None:
+    """Test that duplicated player rows only keep their first occurrence."""
+    current_df = pd.DataFrame({"hits": [3, 2, 1]}, index=[3, 2, 2])
+    previous_df = pd.DataFrame({"hits": [1, 0]}, index=[2, 1])
+
+    aligned_current_df, aligned_previous_df = align_snapshots(current_df, previous_df)
+
+    assert aligned_current_df["hits"].tolist() == [2]
+    assert aligned_previous_df["hits"].tolist() == [1]
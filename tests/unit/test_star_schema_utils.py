@@ -0,0 +1,149 @@
+import sqlite3
+from typing import Iterator
+
+import pandas as pd
+import pytest
+
+from mlb_airflow_data_pipeline.db_utils import create_connection, read_table
+from mlb_airflow_data_pipeline.filter_expression_utils import (
+    compile_filter_conditions,
+)
+from mlb_airflow_data_pipeline.star_schema_utils import (
+    count_player_stats_facts,
+    create_star_schema,
+    get_player_stats_facts_digest,
+    insert_player_stats_facts,
+    read_player_stats_facts,
+    seed_teams,
+    upsert_players,
+)
+
+
+@pytest.fixture
+def db_connection(tmp_path) -> Iterator[sqlite3.Connection]:
+    """Create a database connection with the star schema for testing."""
+    with create_connection(str(tmp_path / "star_schema.db")) as conn:
+        create_star_schema(conn)
+        seed_teams(conn)
+        yield conn
+
+
+@pytest.fixture
+def sample_player_stats() -> pd.DataFrame:
+    """Create a sample player stats snapshot, indexed by player id."""
+    return pd.DataFrame(
+        {
+            "playername": ["Aaron Judge", "Anthony Rizzo", "Pete Alonso"],
+            "team_id": [147, 147, 121],
+            "homeRuns": ["6", "4", "9"],
+            "avg": [".261", "-.--", ".250"],
+            "date": ["2023-05-01"] * 3,
+        },
+        index=[592450, 519203, 624413],
+    )
+
+
+def test_seed_teams_fills_both_leagues(db_connection: sqlite3.Connection) -> None:
+    """Test that the teams dimension holds every MLB team with its league."""
+    teams_df = read_table(db_connection, "teams")
+
+    assert len(teams_df) == 30
+    assert teams_df["league"].value_counts().to_dict() == {
+        "american_league": 15,
+        "national_league": 15,
+    }
+
+
+def test_upsert_players_updates_existing_names(
+    db_connection: sqlite3.Connection, sample_player_stats: pd.DataFrame
+) -> None:
+    """Test that upserting the same player twice keeps a single row."""
+    upsert_players(db_connection, sample_player_stats)
+    renamed_player_stats = sample_player_stats.assign(
+        playername=["Aaron James Judge", "Anthony Rizzo", "Pete Alonso"]
+    )
+    upsert_players(db_connection, renamed_player_stats)
+
+    players_df = read_table(db_connection, "players").set_index("player_id")
+
+    assert len(players_df) == 3
+    assert players_df.loc[592450, "playername"] == "Aaron James Judge"
+
+
+def test_player_stats_facts_round_trip(
+    db_connection: sqlite3.Connection, sample_player_stats: pd.DataFrame
+) -> None:
+    """Test that the facts are stored as numbers and joined back to the names."""
+    upsert_players(db_connection, sample_player_stats)
+    insert_player_stats_facts(db_connection, sample_player_stats, "2023-05-01")
+    insert_player_stats_facts(db_connection, sample_player_stats, "2023-05-01")
+
+    result_df = read_player_stats_facts(
+        db_connection,
+        date="2023-05-01",
+        league_name="american_league",
+        columns=["homeRuns", "avg"],
+    )
+
+    assert result_df.index.tolist() == [519203, 592450]
+    assert result_df["team_name"].unique().tolist() == ["New York Yankees"]
+    assert result_df["homeRuns"].tolist() == [4.0, 6.0]
+    assert pd.isna(result_df.loc[519203, "avg"])
+    assert len(read_table(db_connection, "player_stats_fact")) == 3
+
+
+def test_player_stats_facts_filter_pushdown(
+    db_connection: sqlite3.Connection, sample_player_stats: pd.DataFrame
+) -> None:
+    """Test that the filters evaluated by the database match the in-memory ones."""
+    upsert_players(db_connection, sample_player_stats)
+    insert_player_stats_facts(db_connection, sample_player_stats, "2023-05-01")
+    filter_expression = compile_filter_conditions(
+        {"or": [{"homeRuns": {">": 5}}, {"playername": {"in": ["Anthony Rizzo"]}}]}
+    )
+
+    filtered_df = read_player_stats_facts(
+        db_connection, columns=["homeRuns"], filter_expression=filter_expression
+    )
+
+    assert sorted(filtered_df.index) == [519203, 592450, 624413]
+    assert count_player_stats_facts(db_connection) == 3
+    avg_expression = compile_filter_conditions({"avg": {"!=": 0.25}})
+    assert (
+        count_player_stats_facts(db_connection, filter_expression=avg_expression) == 1
+    )
+    pd.testing.assert_frame_equal(
+        read_player_stats_facts(
+            db_connection, columns=["avg"], filter_expression=avg_expression
+        ),
+        read_player_stats_facts(db_connection, columns=["avg"]).pipe(
+            lambda df: df[avg_expression.evaluate(df)]
+        ),
+    )
+
+
+def test_player_stats_facts_digest_ignores_other_leagues_and_dates(
+    db_connection: sqlite3.Connection, sample_player_stats: pd.DataFrame
+) -> None:
+    """Test that the digest only changes with the facts of its league and date."""
+    upsert_players(db_connection, sample_player_stats)
+    insert_player_stats_facts(db_connection, sample_player_stats, "2023-05-01")
+    digest = get_player_stats_facts_digest(
+        db_connection, date="2023-05-01", league_name="american_league"
+    )
+    assert digest["rows_count"] == 2
+
+    insert_player_stats_facts(db_connection, sample_player_stats, "2023-05-02")
+    mets_stats = sample_player_stats.loc[[624413]].assign(homeRuns=["10"])
+    insert_player_stats_facts(db_connection, mets_stats, "2023-05-01")
+    assert digest == get_player_stats_facts_digest(
+        db_connection, date="2023-05-01", league_name="american_league"
+    )
+
+    yankees_stats = sample_player_stats.loc[[592450, 519203]].assign(
+        homeRuns=["7", "4"]
+    )
+    insert_player_stats_facts(db_connection, yankees_stats, "2023-05-01")
+    assert digest != get_player_stats_facts_digest(
+        db_connection, date="2023-05-01", league_name="american_league"
+    )
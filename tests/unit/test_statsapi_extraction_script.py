@@ -1,12 +1,17 @@
 from typing import Any
+from unittest.mock import patch
 
 import pandas as pd
 
 from mlb_airflow_data_pipeline.statsapi_extraction_script import (
+    DataExtractor,
     _extract_player_name,
     _generate_player_stats,
     _insert_col_in_first_position,
 )
+from mlb_airflow_data_pipeline.statsapi_parameters_script import (
+    expected_output_columns,
+)
 
 
 def test__insert_col_in_first_position() -> None:
@@ -33,3 +38,59 @@ def test__generate_player_stats(
     generated_result: dict[str, Any] = _generate_player_stats(player_stats)
     expected_result: list[str] = player_stats_list
     assert sorted(generated_result.keys()) == expected_result
+
+
+def team_player_stats(team_number: int) -> tuple[pd.DataFrame, dict]:
+    stat_columns: list[str] = [
+        col for col in expected_output_columns() if col != "date"
+    ]
+    return pd.DataFrame([[team_number] * len(stat_columns)], columns=stat_columns), {}
+
+
+def test_data_extractor_streams_team_stats() -> None:
+    """Test that every team's dated stats are handed to the callback."""
+    data_extractor: DataExtractor = DataExtractor(league_name="american_league")
+    data_extractor.league_team_rosters_player_names = {147: [], 110: []}
+    data_extractor.team_id_name_mapping = {147: "Yankees", 110: "Orioles"}
+
+    streamed_team_stats: list[pd.DataFrame] = []
+    with patch.object(
+        DataExtractor,
+        "get_player_stats_dataframe_per_team",
+        side_effect=team_player_stats,
+    ):
+        player_stats, _, failed_teams = data_extractor.get_player_stats_per_league(
+            on_team_stats=streamed_team_stats.append
+        )
+
+    assert failed_teams == []
+    assert len(streamed_team_stats) == 2
+    assert all(
+        team_stats.columns.to_list() == expected_output_columns()
+        for team_stats in streamed_team_stats
+    )
+    assert streamed_team_stats[0]["date"].notna().all()
+    assert len(player_stats) == 2
+
+
+def test_data_extractor_fails_team_when_callback_fails() -> None:
+    """Test that a team the callback rejects is failed and left out."""
+    data_extractor: DataExtractor = DataExtractor(league_name="american_league")
+    data_extractor.league_team_rosters_player_names = {147: [], 110: []}
+    data_extractor.team_id_name_mapping = {147: "Yankees", 110: "Orioles"}
+
+    def on_team_stats(team_stats: pd.DataFrame) -> None:
+        if team_stats["team_id"].iloc[0] == 110:
+            raise RuntimeError("write failure")
+
+    with patch.object(
+        DataExtractor,
+        "get_player_stats_dataframe_per_team",
+        side_effect=team_player_stats,
+    ):
+        player_stats, _, failed_teams = data_extractor.get_player_stats_per_league(
+            on_team_stats=on_team_stats
+        )
+
+    assert failed_teams == ["Orioles"]
+    assert player_stats["team_id"].tolist() == [147]
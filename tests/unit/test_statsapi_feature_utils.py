@@ -0,0 +1,163 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mlb_airflow_data_pipeline.statsapi_feature_utils import (
+    compute_grouped_normalization_features,
+    compute_grouped_statistics,
+    compute_league_statistics,
+    create_babip,
+    create_innings_pitched_normalization,
+    create_mean_normalization,
+    create_normalized_features,
+    create_plate_appearance_normalization,
+)
+
+CURRENT_DIR: str = os.path.dirname(os.path.realpath(__file__))
+
+EXAMPLE_DATA_PATH: str = os.path.join(
+    CURRENT_DIR, "national_league_example_full_player_stats_df.csv"
+)
+
+plate_appearance_features: list[str] = ["hits", "homeRuns", "strikeOuts"]
+mean_features: list[str] = ["hits", "rbi", "baseOnBalls"]
+
+
+@pytest.fixture
+def example_df() -> pd.DataFrame:
+    example_df: pd.DataFrame = pd.read_csv(EXAMPLE_DATA_PATH, index_col=0)
+    return example_df[example_df["plateAppearances"] > 0]
+
+
+def test_compute_league_statistics(example_df: pd.DataFrame) -> None:
+    example_df = example_df.assign(rbi=example_df["rbi"].where(example_df["rbi"] > 10))
+    league_statistics: pd.DataFrame = compute_league_statistics(
+        example_df, mean_features
+    )
+
+    expected_statistics: pd.DataFrame = example_df[mean_features].agg(["mean", "std"]).T
+    np.testing.assert_allclose(
+        league_statistics.to_numpy(), expected_statistics.to_numpy()
+    )
+    assert list(league_statistics.index) == mean_features
+
+
+def test_create_normalized_features(example_df: pd.DataFrame) -> None:
+    output_df, league_statistics = create_normalized_features(
+        example_df,
+        plate_appearance_feature_list=plate_appearance_features,
+        mean_feature_list=mean_features,
+    )
+
+    assert output_df.shape == (
+        len(example_df),
+        example_df.shape[1] + len(plate_appearance_features) + 2 * len(mean_features),
+    )
+    pd.testing.assert_series_equal(
+        output_df["hitsperplateAppearance"],
+        example_df["hits"] / example_df["plateAppearances"],
+        check_names=False,
+    )
+    pd.testing.assert_series_equal(
+        output_df["normalized_rbi"],
+        100 * example_df["rbi"] / example_df["rbi"].mean(),
+        check_names=False,
+    )
+    pd.testing.assert_series_equal(
+        output_df["rbi_z_score"],
+        (example_df["rbi"] - example_df["rbi"].mean()) / example_df["rbi"].std(),
+        check_names=False,
+    )
+    assert league_statistics.shape == (len(mean_features), 2)
+
+
+def test_legacy_normalizations_match_engine(example_df: pd.DataFrame) -> None:
+    legacy_df: pd.DataFrame = create_mean_normalization(
+        create_plate_appearance_normalization(
+            example_df.copy(), plate_appearance_features
+        ),
+        mean_features,
+    )
+    output_df, league_statistics = create_normalized_features(
+        example_df,
+        plate_appearance_feature_list=plate_appearance_features,
+        mean_feature_list=mean_features,
+    )
+
+    pd.testing.assert_frame_equal(
+        legacy_df[output_df.columns], output_df, check_dtype=False
+    )
+    for feature_name in mean_features:
+        assert (
+            legacy_df[feature_name + "_mean"]
+            == league_statistics.loc[feature_name, "mean"]
+        ).all()
+        assert (
+            legacy_df[feature_name + "_std"]
+            == league_statistics.loc[feature_name, "std"]
+        ).all()
+
+
+def test_create_babip_matches_rate_stats_catalog() -> None:
+    input_df: pd.DataFrame = pd.DataFrame(
+        {
+            "hits": [150, 0],
+            "homeRuns": [30, 0],
+            "atBats": [500, 0],
+            "strikeOuts": [120, 0],
+            "sacFlies": [5, 0],
+        }
+    )
+    output_df: pd.DataFrame = create_babip(input_df)
+
+    assert output_df["babip"].iloc[0] == pytest.approx(120 / 355)
+    # like every ratio over a zero denominator
+    assert np.isnan(output_df["babip"].iloc[1])
+
+
+def test_create_innings_pitched_normalization() -> None:
+    input_df: pd.DataFrame = pd.DataFrame(
+        {"outs": [30.0, 12.0, 5.0], "inningsPitched": [10.0, 4.0, 0.0]}
+    )
+    output_df: pd.DataFrame = create_innings_pitched_normalization(input_df, ["outs"])
+
+    assert output_df["outsinningsPitched"].tolist()[:2] == [3.0, 3.0]
+    assert np.isnan(output_df["outsinningsPitched"].iloc[2])
+
+
+def test_innings_pitched_normalization_reads_outs() -> None:
+    input_df: pd.DataFrame = pd.DataFrame(
+        {"outs": [370.0, 2.0], "inningsPitched": ["123.1", "0.2"]}
+    )
+    output_df: pd.DataFrame = create_innings_pitched_normalization(input_df, ["outs"])
+
+    np.testing.assert_allclose(output_df["outsinningsPitched"], [3.0, 3.0])
+
+
+def test_grouped_normalization_matches_groupby(example_df: pd.DataFrame) -> None:
+    example_df = example_df.assign(is_regular=example_df["plateAppearances"] > 300)
+    group_keys: list[str] = ["team_id", "is_regular"]
+    grouped_statistics: pd.DataFrame = compute_grouped_statistics(
+        example_df, mean_features, group_keys
+    )
+
+    output_df: pd.DataFrame = compute_grouped_normalization_features(
+        example_df, grouped_statistics, mean_features, group_keys
+    )
+
+    assert output_df.shape == (len(example_df), 2 * len(mean_features) * 2)
+    for group_key in group_keys:
+        grouped_hits = example_df.groupby(group_key)["hits"]
+        pd.testing.assert_series_equal(
+            output_df[f"normalized_hits_by_{group_key}"],
+            100 * example_df["hits"] / grouped_hits.transform("mean"),
+            check_names=False,
+        )
+        pd.testing.assert_series_equal(
+            output_df[f"hits_z_score_by_{group_key}"],
+            (example_df["hits"] - grouped_hits.transform("mean"))
+            / grouped_hits.transform("std"),
+            check_names=False,
+        )
@@ -0,0 +1,246 @@
+import os
+from contextlib import contextmanager
+from typing import Iterator
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from mlb_airflow_data_pipeline.arrow_ipc_utils import read_arrow_ipc
+from mlb_airflow_data_pipeline.db_utils import (
+    cast_stat_columns,
+    create_connection,
+    read_table,
+)
+from mlb_airflow_data_pipeline.rolling_window_utils import CUMULATIVE_TABLE_NAME
+from mlb_airflow_data_pipeline.snapshot_utils import (
+    SNAPSHOT_TABLE_NAME,
+    SnapshotStore,
+)
+from mlb_airflow_data_pipeline.star_schema_utils import (
+    FACT_TABLE_NAME,
+    TEAMS_TABLE_NAME,
+)
+from mlb_airflow_data_pipeline.statsapi_extraction_script import DataExtractor
+from mlb_airflow_data_pipeline.statsapi_pipeline_script import (
+    FULL_PLAYER_STATS,
+    IntermediatePersister,
+    PipelineRun,
+    run_pipeline,
+)
+from mlb_airflow_data_pipeline.storage_backends import (
+    LEAGUE_STANDINGS_TABLE_NAME,
+    PLAYER_STATS_TABLE_NAME,
+    get_storage_backend,
+)
+from mlb_airflow_data_pipeline.statsapi_treatment_script import (
+    DataPaths,
+    player_input_data_reprs,
+    run_treatment,
+)
+
+CURRENT_DIR: str = os.path.dirname(os.path.realpath(__file__))
+
+EXAMPLE_DATA_PATH: str = os.path.join(
+    CURRENT_DIR, "national_league_example_full_player_stats_df.csv"
+)
+
+
+@pytest.fixture
+def player_stats_df() -> pd.DataFrame:
+    """Create extracted player stats, as text like statsapi returns them."""
+    return pd.read_csv(EXAMPLE_DATA_PATH, index_col=0, dtype=str).set_axis(
+        pd.read_csv(EXAMPLE_DATA_PATH, index_col=0).index
+    )
+
+
+def test_run_pipeline_matches_staged_treatment(
+    tmp_path, player_stats_df: pd.DataFrame
+) -> None:
+    """Test that the in-memory run treats the data like the file-based one."""
+    pipeline_run = PipelineRun(
+        league_name="national_league",
+        date="2023-06-01",
+        plot=False,
+        data_location=f"{tmp_path}/",
+    )
+
+    output_data = run_pipeline(pipeline_run, player_stats_df)
+
+    # the text stats are typed like the file, placeholders becoming missing
+    expected_data = run_treatment(
+        DataPaths(),
+        [
+            (player_type, input_parameters, None)
+            for player_type, input_parameters in player_input_data_reprs.items()
+        ],
+        input_data=cast_stat_columns(pd.read_csv(EXAMPLE_DATA_PATH, index_col=0)),
+    )
+    assert set(output_data) == {FULL_PLAYER_STATS, *player_input_data_reprs}
+    for player_type, expected_df in expected_data.items():
+        pd.testing.assert_frame_equal(
+            output_data[player_type], expected_df, check_dtype=False
+        )
+    assert os.listdir(tmp_path) == []
+
+
+def test_run_pipeline_persists_intermediates(
+    tmp_path, player_stats_df: pd.DataFrame
+) -> None:
+    """Test that the intermediates are written as handoff files and plotted."""
+    pipeline_run = PipelineRun(
+        league_name="national_league",
+        date="2023-06-01",
+        persist_intermediates=True,
+        data_location=f"{tmp_path}/data_",
+        output_location=f"{tmp_path}/output_",
+    )
+
+    output_data = run_pipeline(pipeline_run, player_stats_df)
+
+    for player_type in player_input_data_reprs:
+        prefix = f"{tmp_path}/data_national_league_2023-06-01_{player_type}_stats_df"
+        pd.testing.assert_frame_equal(
+            read_arrow_ipc(f"{prefix}.arrow"), output_data[player_type]
+        )
+        assert os.path.exists(f"{prefix}.csv")
+        assert os.path.exists(f"{prefix}_percentile_ranks.arrow")
+    assert os.path.exists(
+        f"{tmp_path}/data_national_league_2023-06-01_full_player_stats_df.arrow"
+    )
+    assert any(
+        file_name.startswith("output_national_league_2023-06-01_")
+        and file_name.endswith(".png")
+        for file_name in os.listdir(tmp_path)
+    )
+
+
+@contextmanager
+def patch_statsapi(player_stats_df: pd.DataFrame) -> Iterator[list[int]]:
+    """Patch the statsapi calls of the extractor to serve the example stats,
+    yielding the ids of their teams."""
+    team_ids: list[int] = sorted(player_stats_df["team_id"].astype(int).unique())
+
+    def set_league_team_rosters_player_names(data_extractor: DataExtractor) -> None:
+        data_extractor.league_standings = pd.DataFrame(
+            {
+                "team_id": team_ids,
+                "name": [f"Team {team_id}" for team_id in team_ids],
+                "w": ["30"] * len(team_ids),
+                "l": ["25"] * len(team_ids),
+                "date": data_extractor.date,
+            }
+        )
+        data_extractor.league_team_rosters_player_names = {
+            team_id: [] for team_id in team_ids
+        }
+
+    def get_player_stats_dataframe_per_team(
+        _: DataExtractor, team_number: int
+    ) -> tuple[pd.DataFrame, dict]:
+        return (
+            player_stats_df[player_stats_df["team_id"].astype(int) == team_number],
+            {},
+        )
+
+    with (
+        patch.object(
+            DataExtractor,
+            "set_league_team_rosters_player_names",
+            set_league_team_rosters_player_names,
+        ),
+        patch.object(
+            DataExtractor,
+            "get_player_stats_dataframe_per_team",
+            get_player_stats_dataframe_per_team,
+        ),
+    ):
+        yield team_ids
+
+
+def test_run_pipeline_persists_extraction(
+    tmp_path, player_stats_df: pd.DataFrame
+) -> None:
+    """Test that an extracting run persisting its intermediates persists the
+    stats of its date like the staged extraction, for the database source,
+    the snapshots and the windows."""
+    pipeline_run = PipelineRun(
+        league_name="national_league",
+        date="2023-06-01",
+        persist_intermediates=True,
+        plot=False,
+        data_location=f"{tmp_path}/",
+    )
+    with patch_statsapi(player_stats_df) as team_ids:
+        output_data = run_pipeline(pipeline_run)
+
+    players_total: int = len(output_data[FULL_PLAYER_STATS])
+    assert players_total == len(player_stats_df)
+    assert set(output_data[FULL_PLAYER_STATS]["date"]) == {"2023-06-01"}
+    with create_connection(str(tmp_path / "mlb_data.db")) as conn:
+        for table_name in [
+            SNAPSHOT_TABLE_NAME,
+            FACT_TABLE_NAME,
+            CUMULATIVE_TABLE_NAME,
+        ]:
+            assert len(read_table(conn, table_name)) == players_total
+        assert SnapshotStore(conn).get_dates("national_league") == ["2023-06-01"]
+        league_standings_df = read_table(conn, "league_standings")
+        assert len(league_standings_df) == len(team_ids)
+        assert set(league_standings_df["date"]) == {"2023-06-01"}
+        # the teams dimension is seeded with both leagues
+        teams_df = read_table(conn, TEAMS_TABLE_NAME)
+        assert set(teams_df["league"]) == {"american_league", "national_league"}
+        # the snapshot store replaces the full daily player_stats append
+        assert not conn.execute(
+            "SELECT name FROM sqlite_master WHERE name = 'player_stats'"
+        ).fetchone()
+
+    # the SQLite backend reads the extracted tables instead of typed copies
+    storage_backend = get_storage_backend(
+        "sqlite", db_path=str(tmp_path / "mlb_data.db")
+    )
+    with storage_backend.connect() as conn:
+        league_filters = [("league", "==", "national_league")]
+        standings_df = storage_backend.read(
+            conn, LEAGUE_STANDINGS_TABLE_NAME, filters=league_filters
+        )
+        backend_player_stats_df = storage_backend.read(
+            conn, PLAYER_STATS_TABLE_NAME, filters=league_filters
+        )
+    assert standings_df["w"].tolist() == [30] * len(team_ids)
+    assert len(backend_player_stats_df) == players_total
+    # the Parquet store is only written on request
+    assert not os.path.exists(tmp_path / "parquet")
+
+
+def test_run_pipeline_extracts_without_persisting(
+    tmp_path, player_stats_df: pd.DataFrame
+) -> None:
+    """Test that an extracting run not persisting its intermediates writes
+    nothing to disk."""
+    pipeline_run = PipelineRun(
+        league_name="national_league",
+        date="2023-06-01",
+        plot=False,
+        data_location=f"{tmp_path}/",
+    )
+    with patch_statsapi(player_stats_df):
+        output_data = run_pipeline(pipeline_run)
+
+    assert len(output_data[FULL_PLAYER_STATS]) == len(player_stats_df)
+    assert os.listdir(tmp_path) == []
+
+
+def test_intermediate_persister_raises_failed_write(tmp_path) -> None:
+    """Test that a failed write is raised when the persister is closed."""
+    persister = IntermediatePersister()
+    persister.submit(pd.DataFrame({"hits": [1]}), str(tmp_path / "stats.csv"))
+    persister.submit(
+        pd.DataFrame({"hits": [1]}), str(tmp_path / "missing" / "stats.csv")
+    )
+
+    with pytest.raises(OSError):
+        persister.close()
+
+    assert persister.close(raise_error=False) == [str(tmp_path / "stats.csv")]
@@ -0,0 +1,88 @@
+import pandas as pd
+import pytest
+
+from mlb_airflow_data_pipeline import statsapi_time_series_creation_analysis_script
+
+from mlb_airflow_data_pipeline.storage_backends import (
+    LEAGUE_STANDINGS_TABLE_NAME,
+    get_storage_backend,
+)
+from mlb_airflow_data_pipeline.statsapi_time_series_creation_analysis_script import (
+    LEAGUE_NAME,
+    PlotGenerator,
+    league_input_parameters,
+)
+
+
+def test_get_time_series_reads_storage_backend(
+    tmp_path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that the standings time series are read from the storage backend."""
+    monkeypatch.setattr(
+        statsapi_time_series_creation_analysis_script,
+        "DATA_FILE_LOCATION",
+        f"{tmp_path}/",
+    )
+    storage_backend = get_storage_backend(
+        "sqlite", db_path=str(tmp_path / "mlb_data.db")
+    )
+    with storage_backend.connect() as conn:
+        for date, wins in [("2023-05-02", [12, 10]), ("2023-05-01", [11, 10])]:
+            storage_backend.write_snapshot(
+                conn,
+                LEAGUE_STANDINGS_TABLE_NAME,
+                pd.DataFrame(
+                    {"name": ["New York Mets", "Atlanta Braves"], "w": wins, "l": 9}
+                ),
+                LEAGUE_NAME,
+                date,
+            )
+
+    time_series = PlotGenerator(
+        input_parameters=league_input_parameters, storage_backend=storage_backend
+    ).get_time_series()
+
+    wins_df = time_series["w"]
+    assert wins_df.index.strftime("%Y-%m-%d").tolist() == ["2023-05-01", "2023-05-02"]
+    assert wins_df["New York Mets"].tolist() == [11, 12]
+    assert time_series["win-total-ratio"]["Atlanta Braves"].tolist() == [
+        10 / 19,
+        10 / 19,
+    ]
+
+
+def test_get_time_series_reads_files_of_dates_missing_from_backend(
+    tmp_path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that the standings files of the dates the storage backend does not
+    keep are still part of the time series."""
+    monkeypatch.setattr(
+        statsapi_time_series_creation_analysis_script,
+        "DATA_FILE_LOCATION",
+        f"{tmp_path}/",
+    )
+    for date, wins in [("2023-05-01", 11), ("2023-05-02", 0)]:
+        pd.DataFrame({"name": ["New York Mets"], "w": [wins], "l": [9]}).to_csv(
+            tmp_path / f"{LEAGUE_NAME}_{date}_league_standings_df.csv"
+        )
+
+    storage_backend = get_storage_backend(
+        "sqlite", db_path=str(tmp_path / "mlb_data.db")
+    )
+    with storage_backend.connect() as conn:
+        storage_backend.write_snapshot(
+            conn,
+            LEAGUE_STANDINGS_TABLE_NAME,
+            pd.DataFrame({"name": ["New York Mets"], "w": [12], "l": [9]}),
+            LEAGUE_NAME,
+            "2023-05-02",
+        )
+
+    time_series = PlotGenerator(
+        input_parameters=league_input_parameters, storage_backend=storage_backend
+    ).get_time_series()
+
+    # the backend's snapshot of 2023-05-02 is used instead of its file
+    wins_df = time_series["w"]
+    assert wins_df.index.strftime("%Y-%m-%d").tolist() == ["2023-05-01", "2023-05-02"]
+    assert wins_df["New York Mets"].tolist() == [11, 12]
@@ -1,19 +1,39 @@
 import os
+import shutil
 
+import numpy as np
 import pandas as pd
 import pandas.api.types as pdtypes
 import pytest
 
-from mlb_airflow_data_pipeline.statsapi_feature_utils import (
-    create_mean_normalization,
-    create_plate_appearance_normalization,
+from mlb_airflow_data_pipeline import statsapi_treatment_script
+from mlb_airflow_data_pipeline.arrow_ipc_utils import read_arrow_ipc
+from mlb_airflow_data_pipeline.db_utils import create_connection
+from mlb_airflow_data_pipeline.feature_store_utils import FeatureStore
+from mlb_airflow_data_pipeline.star_schema_utils import (
+    create_star_schema,
+    insert_player_stats_facts,
+    read_player_stats_facts,
+    seed_teams,
+    upsert_players,
 )
+from mlb_airflow_data_pipeline.statsapi_parameters_script import BATTING_STATS
 from mlb_airflow_data_pipeline.statsapi_treatment_script import (
     DataPaths,
     DataTreater,
     DataTreaterInputRepresentation,
-    batter_transformation_dict,
+    TreatmentJob,
+    batter_features,
+    batter_mean_norm_stats,
+    batter_plate_norm_stats,
     batting_stats_list,
+    defender_input_data_repr,
+    get_date_range,
+    pitcher_input_data_repr,
+    run_batch_treatment,
+    run_chunked_treatment,
+    run_treatment,
+    run_treatment_job,
 )
 
 CURRENT_DIR: str = os.path.dirname(os.path.realpath(__file__))
@@ -32,7 +52,7 @@ batter_input_paths: DataPaths = DataPaths(
 batter_input_data_repr: DataTreaterInputRepresentation = DataTreaterInputRepresentation(
     subset_columns=batting_stats_list,
     filter_conditions_dict=batter_filter_conditions_dict,
-    transformation_dict=batter_transformation_dict,
+    features=batter_features,
 )
 
 
@@ -186,21 +206,418 @@ def test_data_treater_get_output_data() -> None:
     assert "difstrikeOutsbaseOnBalls" in actual_features
 
     expected_per_plate_features: set[str] = {
-        ele + "perplateAppearance"
-        for ele in batter_input_data_repr.transformation_dict[
-            create_plate_appearance_normalization
-        ]
+        ele + "perplateAppearance" for ele in batter_plate_norm_stats
     }
 
     assert expected_per_plate_features.difference(actual_features) == set()
 
+    mean_norm_features: list[str] = batter_mean_norm_stats
     expected_normalized_features: set[str] = {
-        ele + suffix
-        for ele in batter_input_data_repr.transformation_dict[create_mean_normalization]
-        for suffix in ["_mean", "_std", "_z_score"]
-    } | {
-        "normalized_" + ele
-        for ele in batter_input_data_repr.transformation_dict[create_mean_normalization]
-    }
+        ele + "_z_score" for ele in mean_norm_features
+    } | {"normalized_" + ele for ele in mean_norm_features}
 
     assert expected_normalized_features.difference(actual_features) == set()
+
+    # the league's means and stds are kept once in a side table
+    assert not any(feature.endswith(("_mean", "_std")) for feature in actual_features)
+    league_statistics: pd.DataFrame = batter_data_treater.league_statistics
+    assert list(league_statistics.index) == mean_norm_features
+    assert list(league_statistics.columns) == ["mean", "std"]
+    assert league_statistics.loc["hits", "mean"] == pytest.approx(
+        output_data["hits"].mean()
+    )
+
+
+@pytest.fixture
+def example_database_path(tmp_path) -> str:
+    """Create a database holding the example snapshot in the fact table."""
+    example_df: pd.DataFrame = pd.read_csv(EXAMPLE_DATA_PATH, index_col=0)
+    database_path: str = str(tmp_path / "mlb_data.db")
+    with create_connection(database_path) as conn:
+        create_star_schema(conn)
+        seed_teams(conn)
+        upsert_players(conn, example_df)
+        insert_player_stats_facts(conn, example_df, "2023-06-01")
+    return database_path
+
+
+def test_data_treater_database_input_data(example_database_path: str) -> None:
+    database_input_paths: DataPaths = DataPaths(
+        input_source="database",
+        path_to_database=example_database_path,
+        league_name="national_league",
+        date="2023-06-01",
+    )
+    database_data_treater: DataTreater = DataTreater(
+        data_paths=database_input_paths, input_parameters=batter_input_data_repr
+    )
+    csv_data_treater: DataTreater = DataTreater(
+        data_paths=batter_input_paths, input_parameters=batter_input_data_repr
+    )
+
+    input_df: pd.DataFrame = database_data_treater.get_input_data()
+    assert set(batting_stats_list).issubset(input_df.columns)
+    assert "pitchesPerInning" not in input_df.columns
+    assert all(pdtypes.is_numeric_dtype(input_df[col]) for col in BATTING_STATS)
+
+    database_filter_df: pd.DataFrame = database_data_treater.get_filter_data()
+    csv_filter_df: pd.DataFrame = csv_data_treater.get_filter_data()
+    assert database_filter_df.shape == csv_filter_df.shape
+    assert sorted(database_filter_df.index) == sorted(csv_filter_df.index)
+
+
+def test_run_treatment_pushes_player_type_filters_down(
+    example_database_path: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that the shared database read only returns the rows kept by at
+    least one player type."""
+    read_rows_counts: list[int] = []
+
+    def counting_read_player_stats_facts(*args, **kwargs) -> pd.DataFrame:
+        facts_df: pd.DataFrame = read_player_stats_facts(*args, **kwargs)
+        read_rows_counts.append(len(facts_df))
+        return facts_df
+
+    monkeypatch.setattr(
+        statsapi_treatment_script,
+        "read_player_stats_facts",
+        counting_read_player_stats_facts,
+    )
+    database_input_paths: DataPaths = DataPaths(
+        input_source="database",
+        path_to_database=example_database_path,
+        league_name="national_league",
+        date="2023-06-01",
+    )
+    player_configs = [
+        ("batter", batter_input_data_repr, None),
+        ("pitcher", pitcher_input_data_repr, None),
+    ]
+    output_data: dict[str, pd.DataFrame] = run_treatment(
+        database_input_paths, player_configs
+    )
+
+    example_df: pd.DataFrame = pd.read_csv(EXAMPLE_DATA_PATH, index_col=0)
+    assert read_rows_counts and read_rows_counts[0] < len(example_df)
+    for player_type, input_parameters, _ in player_configs:
+        csv_output_df: pd.DataFrame = DataTreater(
+            data_paths=batter_input_paths, input_parameters=input_parameters
+        ).get_output_data()
+        assert sorted(output_data[player_type].index) == sorted(csv_output_df.index)
+
+
+def test_data_treater_database_input_requires_league_and_date() -> None:
+    data_treater: DataTreater = DataTreater(
+        data_paths=DataPaths(input_source="database"),
+        input_parameters=batter_input_data_repr,
+    )
+    with pytest.raises(ValueError, match="requires a league_name and date"):
+        data_treater.get_input_data()
+
+
+def test_data_treater_preloaded_input_data() -> None:
+    input_df: pd.DataFrame = pd.read_csv(EXAMPLE_DATA_PATH, index_col=0)
+    preloaded_data_treater: DataTreater = DataTreater(
+        data_paths=DataPaths(),
+        input_parameters=batter_input_data_repr,
+        input_data=input_df,
+    )
+    csv_data_treater: DataTreater = DataTreater(
+        data_paths=batter_input_paths, input_parameters=batter_input_data_repr
+    )
+
+    pd.testing.assert_frame_equal(
+        preloaded_data_treater.get_output_data(), csv_data_treater.get_output_data()
+    )
+    pd.testing.assert_frame_equal(input_df, pd.read_csv(EXAMPLE_DATA_PATH, index_col=0))
+
+
+def test_run_treatment(tmp_path) -> None:
+    player_configs = [
+        ("batter", batter_input_data_repr, str(tmp_path / "batter_stats_df.csv")),
+        ("pitcher", pitcher_input_data_repr, str(tmp_path / "pitcher_stats_df.csv")),
+        ("defender", defender_input_data_repr, None),
+    ]
+    output_data: dict[str, pd.DataFrame] = run_treatment(
+        batter_input_paths, player_configs
+    )
+
+    assert set(output_data.keys()) == {"batter", "pitcher", "defender"}
+    for player_type, input_parameters, _ in player_configs:
+        expected_df: pd.DataFrame = DataTreater(
+            data_paths=batter_input_paths, input_parameters=input_parameters
+        ).get_output_data()
+        pd.testing.assert_frame_equal(output_data[player_type], expected_df)
+
+    assert os.path.exists(tmp_path / "batter_stats_df.csv")
+    assert os.path.exists(tmp_path / "batter_stats_df_league_statistics.csv")
+    batter_percentile_ranks_df: pd.DataFrame = pd.read_csv(
+        tmp_path / "batter_stats_df_percentile_ranks.csv", index_col=0
+    )
+    assert list(batter_percentile_ranks_df.index) == list(output_data["batter"].index)
+    assert "homeRuns_percentile_rank" in batter_percentile_ranks_df.columns
+    assert os.path.exists(tmp_path / "pitcher_stats_df.csv")
+    assert not os.path.exists(tmp_path / "defender_stats_df.csv")
+    written_df: pd.DataFrame = pd.read_csv(
+        tmp_path / "batter_stats_df.csv", index_col=0
+    )
+    assert written_df.shape == output_data["batter"].shape
+    pd.testing.assert_frame_equal(
+        read_arrow_ipc(str(tmp_path / "batter_stats_df.arrow")), output_data["batter"]
+    )
+    assert os.path.exists(tmp_path / "batter_stats_df_percentile_ranks.arrow")
+
+
+def test_run_treatment_raises_player_type_failure() -> None:
+    failing_input_data_repr: DataTreaterInputRepresentation = (
+        DataTreaterInputRepresentation(
+            subset_columns=["notAColumn"],
+            filter_conditions_dict={},
+            features=[],
+        )
+    )
+    with pytest.raises(KeyError, match="notAColumn"):
+        run_treatment(
+            batter_input_paths,
+            [
+                ("batter", batter_input_data_repr, None),
+                ("broken", failing_input_data_repr, None),
+            ],
+        )
+
+
+def test_data_treater_requested_features() -> None:
+    requested_input_data_repr: DataTreaterInputRepresentation = (
+        batter_input_data_repr.model_copy(
+            update={"requested_features": ["normalized_babip"]}
+        )
+    )
+    batter_data_treater: DataTreater = DataTreater(
+        data_paths=batter_input_paths, input_parameters=requested_input_data_repr
+    )
+    output_data: pd.DataFrame = batter_data_treater.get_output_data()
+
+    # babip is computed as an intermediate but only the requested feature is added
+    assert set(output_data.columns) == set(batting_stats_list) | {"normalized_babip"}
+    assert "hitsperplateAppearance" not in output_data.columns
+
+
+def test_data_treater_feature_store(tmp_path, monkeypatch) -> None:
+    feature_store: FeatureStore = FeatureStore(root=str(tmp_path))
+    first_data_treater: DataTreater = DataTreater(
+        data_paths=batter_input_paths,
+        input_parameters=batter_input_data_repr,
+        feature_store=feature_store,
+    )
+    first_output_df: pd.DataFrame = first_data_treater.get_output_data()
+
+    second_data_treater: DataTreater = DataTreater(
+        data_paths=batter_input_paths,
+        input_parameters=batter_input_data_repr,
+        feature_store=feature_store,
+    )
+
+    def fail_compute(*args, **kwargs):
+        raise AssertionError("the cached output should be used")
+
+    monkeypatch.setattr(second_data_treater.feature_engine, "compute", fail_compute)
+    second_output_df: pd.DataFrame = second_data_treater.get_output_data()
+
+    pd.testing.assert_frame_equal(second_output_df, first_output_df)
+    pd.testing.assert_frame_equal(
+        second_data_treater.league_statistics, first_data_treater.league_statistics
+    )
+
+
+def test_data_treater_compact_memory() -> None:
+    compact_data_treater: DataTreater = DataTreater(
+        data_paths=batter_input_paths,
+        input_parameters=batter_input_data_repr,
+        compact_memory=True,
+    )
+    csv_data_treater: DataTreater = DataTreater(
+        data_paths=batter_input_paths, input_parameters=batter_input_data_repr
+    )
+
+    input_df: pd.DataFrame = compact_data_treater.get_input_data()
+    assert isinstance(input_df["playername"].dtype, pd.CategoricalDtype)
+
+    compact_output_df: pd.DataFrame = compact_data_treater.get_output_data()
+    csv_output_df: pd.DataFrame = csv_data_treater.get_output_data()
+    assert compact_output_df.shape == csv_output_df.shape
+    np.testing.assert_allclose(
+        compact_output_df["normalized_hits"].astype(float),
+        csv_output_df["normalized_hits"],
+        rtol=1e-5,
+    )
+
+
+@pytest.fixture
+def example_data_location(tmp_path) -> str:
+    """Create a data directory holding the example snapshot for a single date."""
+    shutil.copy(
+        EXAMPLE_DATA_PATH,
+        tmp_path / "national_league_2023-06-01_full_player_stats_df.csv",
+    )
+    return str(tmp_path) + "/"
+
+
+def test_run_treatment_job_skips_up_to_date_outputs(
+    example_data_location: str,
+) -> None:
+    job: TreatmentJob = TreatmentJob(
+        league_name="national_league",
+        date="2023-06-01",
+        data_location=example_data_location,
+    )
+
+    assert run_treatment_job(job) == "completed"
+    for output_path in job.get_output_paths().values():
+        assert os.path.exists(output_path)
+    assert os.path.exists(job.manifest_path)
+
+    assert run_treatment_job(job) == "skipped"
+    assert run_treatment_job(job, force=True) == "completed"
+
+    # a changed input is treated again
+    with open(job.input_path, "a") as input_file:
+        input_file.write("\n")
+    assert run_treatment_job(job) == "completed"
+
+    os.remove(job.get_output_paths()["pitcher"])
+    assert run_treatment_job(job) == "completed"
+
+
+def test_run_treatment_job_without_feature_store(example_data_location: str) -> None:
+    job: TreatmentJob = TreatmentJob(
+        league_name="national_league",
+        date="2023-06-01",
+        use_feature_store=False,
+        data_location=example_data_location,
+    )
+
+    assert run_treatment_job(job) == "completed"
+    assert not os.path.exists(os.path.join(example_data_location, "feature_store"))
+
+
+def test_run_treatment_job_database_fingerprint(example_database_path: str) -> None:
+    """Test that a database job is only treated again when its own facts change."""
+    job: TreatmentJob = TreatmentJob(
+        league_name="national_league",
+        date="2023-06-01",
+        input_source="database",
+        use_feature_store=False,
+        data_location=os.path.dirname(example_database_path) + "/",
+    )
+    example_df: pd.DataFrame = pd.read_csv(EXAMPLE_DATA_PATH, index_col=0)
+
+    assert run_treatment_job(job) == "completed"
+    with create_connection(example_database_path) as conn:
+        insert_player_stats_facts(conn, example_df, "2023-06-02")
+    assert run_treatment_job(job) == "skipped"
+
+    with create_connection(example_database_path) as conn:
+        insert_player_stats_facts(
+            conn, example_df.assign(hits=example_df["hits"] + 1), "2023-06-01"
+        )
+    assert run_treatment_job(job) == "completed"
+
+
+def test_run_batch_treatment(example_data_location: str) -> None:
+    jobs: list[TreatmentJob] = [
+        TreatmentJob(
+            league_name="national_league",
+            date=date,
+            data_location=example_data_location,
+        )
+        for date in get_date_range("2023-05-31", "2023-06-01")
+    ]
+    statuses: dict[tuple[str, str], str] = run_batch_treatment(jobs, max_workers=2)
+
+    assert statuses == {
+        ("national_league", "2023-05-31"): "missing_input",
+        ("national_league", "2023-06-01"): "completed",
+    }
+    assert (
+        run_batch_treatment(jobs, max_workers=2)[("national_league", "2023-06-01")]
+        == "skipped"
+    )
+
+
+def test_run_chunked_treatment(tmp_path) -> None:
+    output_path: str = str(tmp_path / "batter_stats_df.csv")
+    league_statistics: pd.DataFrame = run_chunked_treatment(
+        batter_input_paths.model_copy(update={"path_to_output_data": output_path}),
+        batter_input_data_repr,
+        chunk_size=50,
+    )
+
+    batter_data_treater: DataTreater = DataTreater(
+        data_paths=batter_input_paths, input_parameters=batter_input_data_repr
+    )
+    expected_output_df: pd.DataFrame = batter_data_treater.get_output_data()
+    pd.testing.assert_frame_equal(
+        league_statistics, batter_data_treater.league_statistics, rtol=1e-9
+    )
+
+    chunked_output_df: pd.DataFrame = pd.read_csv(output_path, index_col=0)
+    assert chunked_output_df.shape == expected_output_df.shape
+    np.testing.assert_allclose(
+        chunked_output_df["babip_z_score"], expected_output_df["babip_z_score"]
+    )
+    # the teams are spread over several chunks
+    np.testing.assert_allclose(
+        chunked_output_df["babip_z_score_by_team_id"],
+        expected_output_df["babip_z_score_by_team_id"],
+    )
+    assert os.path.exists(tmp_path / "batter_stats_df_league_statistics.csv")
+
+
+def test_run_chunked_treatment_checks_data_quality_once(
+    tmp_path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    data_quality_checks: list[tuple] = []
+    monkeypatch.setattr(
+        statsapi_treatment_script,
+        "check_data_quality",
+        lambda *args: data_quality_checks.append(args),
+    )
+    output_path: str = str(tmp_path / "batter_stats_df.csv")
+    run_chunked_treatment(
+        batter_input_paths.model_copy(update={"path_to_output_data": output_path}),
+        batter_input_data_repr,
+        chunk_size=50,
+    )
+
+    input_df: pd.DataFrame = pd.read_csv(
+        batter_input_paths.path_to_input_data, index_col=0
+    )
+    # one check on the counts of the whole input instead of one per chunk
+    assert data_quality_checks == [
+        (
+            len(pd.read_csv(output_path, index_col=0)),
+            len(input_df),
+            batter_input_data_repr.filter_conditions_dict,
+        )
+    ]
+
+
+def test_run_chunked_treatment_removes_stale_side_files(tmp_path) -> None:
+    output_path: str = str(tmp_path / "batter_stats_df.csv")
+    stale_paths: list = [
+        tmp_path / "batter_stats_df.arrow",
+        tmp_path / "batter_stats_df_percentile_ranks.csv",
+        tmp_path / "batter_stats_df_percentile_ranks.arrow",
+    ]
+    for stale_path in stale_paths:
+        stale_path.write_text("left by a previous treatment")
+
+    run_chunked_treatment(
+        batter_input_paths.model_copy(update={"path_to_output_data": output_path}),
+        batter_input_data_repr,
+        chunk_size=50,
+    )
+
+    # the readers fall back to the csv instead of the previous handoff
+    assert not any(os.path.exists(stale_path) for stale_path in stale_paths)
+    assert os.path.exists(output_path)
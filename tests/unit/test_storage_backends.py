@@ -0,0 +1,132 @@
+import pandas as pd
+import pandas.api.types as pdtypes
+import pytest
+
+from mlb_airflow_data_pipeline.storage_backends import (
+    LEAGUE_STANDINGS_TABLE_NAME,
+    PLAYER_STATS_TABLE_NAME,
+    StorageBackend,
+    compile_filters,
+    get_storage_backend,
+)
+
+
+@pytest.fixture(params=["sqlite", "duckdb"])
+def storage_backend(request, tmp_path) -> StorageBackend:
+    """Create each storage backend on a temporary database file."""
+    return get_storage_backend(
+        request.param, db_path=str(tmp_path / f"mlb_data.{request.param}")
+    )
+
+
+@pytest.fixture
+def sample_player_stats() -> pd.DataFrame:
+    """Create a sample player stats snapshot, indexed by player id."""
+    return pd.DataFrame(
+        {
+            "playername": ["Aaron Judge", "Anthony Rizzo", "Pete Alonso"],
+            "team_id": [147, 147, 121],
+            "homeRuns": ["6", "4", "9"],
+            "avg": [".261", "-.--", ".250"],
+        },
+        index=[592450, 519203, 624413],
+    )
+
+
+def test_compile_filters() -> None:
+    """Test that filters compile into a parametrized WHERE clause."""
+    where_clause, params = compile_filters(
+        [("homeRuns", ">=", 30), ("team_id", "in", [147, 121])]
+    )
+
+    assert where_clause == 'WHERE "homeRuns" >= ? AND "team_id" IN (?, ?)'
+    assert params == [30, 147, 121]
+    assert compile_filters(None) == ("", [])
+
+    with pytest.raises(ValueError, match="Unsupported filter operator"):
+        compile_filters([("homeRuns", "~", 30)])
+
+
+def test_write_snapshot_and_read_with_filters(
+    storage_backend: StorageBackend, sample_player_stats: pd.DataFrame
+) -> None:
+    """Test that snapshots are written typed and read back filtered."""
+    with storage_backend.connect() as conn:
+        for date in ["2023-05-01", "2023-05-02", "2023-05-02"]:
+            storage_backend.write_snapshot(
+                conn,
+                PLAYER_STATS_TABLE_NAME,
+                sample_player_stats,
+                "american_league",
+                date,
+                index_label="player_id",
+            )
+
+        result_df = storage_backend.read(
+            conn,
+            PLAYER_STATS_TABLE_NAME,
+            columns=["player_id", "homeRuns", "avg"],
+            filters=[("date", "==", "2023-05-02"), ("homeRuns", ">=", 5)],
+        )
+        all_rows_df = storage_backend.read(conn, PLAYER_STATS_TABLE_NAME)
+
+    assert len(all_rows_df) == 6
+    assert sorted(result_df["player_id"].tolist()) == [592450, 624413]
+    assert pdtypes.is_numeric_dtype(result_df["homeRuns"])
+    assert pdtypes.is_float_dtype(result_df["avg"])
+
+
+def test_aggregate_runs_in_engine(
+    storage_backend: StorageBackend, sample_player_stats: pd.DataFrame
+) -> None:
+    """Test that group-by aggregations are returned per group."""
+    with storage_backend.connect() as conn:
+        storage_backend.write_snapshot(
+            conn,
+            PLAYER_STATS_TABLE_NAME,
+            sample_player_stats,
+            "american_league",
+            "2023-05-01",
+        )
+        result_df = storage_backend.aggregate(
+            conn,
+            PLAYER_STATS_TABLE_NAME,
+            group_by=["team_id"],
+            aggregations={"homeRuns": "sum", "playername": "count"},
+        )
+
+    assert result_df["team_id"].tolist() == [121, 147]
+    assert result_df["sum_homeRuns"].tolist() == [9, 10]
+    assert result_df["count_playername"].tolist() == [1, 2]
+
+
+def test_write_snapshot_adds_new_columns(storage_backend: StorageBackend) -> None:
+    """Test that a snapshot with a column the table lacks is still written."""
+    standings_df = pd.DataFrame({"name": ["New York Mets"], "w": ["30"]})
+    with storage_backend.connect() as conn:
+        storage_backend.write_snapshot(
+            conn,
+            LEAGUE_STANDINGS_TABLE_NAME,
+            standings_df,
+            "national_league",
+            "2023-05-01",
+        )
+        storage_backend.write_snapshot(
+            conn,
+            LEAGUE_STANDINGS_TABLE_NAME,
+            standings_df.assign(l="25"),
+            "national_league",
+            "2023-05-02",
+        )
+        result_df = storage_backend.read(
+            conn, LEAGUE_STANDINGS_TABLE_NAME, columns=["date", "w", "l"]
+        ).sort_values("date")
+
+    assert result_df["w"].tolist() == [30, 30]
+    assert result_df["l"].isna().tolist() == [True, False]
+
+
+def test_get_storage_backend_unknown_name() -> None:
+    """Test that an unknown backend name raises an error."""
+    with pytest.raises(ValueError, match="Unknown storage backend"):
+        get_storage_backend("postgres")  # type: ignore
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from mlb_airflow_data_pipeline.statsapi_feature_utils import (
+    compute_grouped_statistics,
+    compute_league_statistics,
+)
+from mlb_airflow_data_pipeline.streaming_stats_utils import (
+    GroupedRunningStatistics,
+    RunningStatistics,
+)
+
+
+@pytest.fixture
+def example_df() -> pd.DataFrame:
+    rng: np.random.Generator = np.random.default_rng(0)
+    example_df: pd.DataFrame = pd.DataFrame(
+        {
+            "hits": rng.integers(0, 200, 1000).astype(float),
+            # a large offset makes a naive sum of squares lose precision
+            "avg": 1e8 + rng.normal(0.25, 0.03, 1000),
+        }
+    )
+    example_df.loc[::7, "hits"] = np.nan
+    return example_df
+
+
+def test_running_statistics_matches_in_memory(example_df: pd.DataFrame) -> None:
+    running_statistics: RunningStatistics = RunningStatistics(["hits", "avg"])
+    for start in range(0, len(example_df), 128):
+        running_statistics.update(example_df.iloc[start : start + 128])
+
+    pd.testing.assert_frame_equal(
+        running_statistics.to_frame(),
+        compute_league_statistics(example_df, ["hits", "avg"]),
+        rtol=1e-9,
+    )
+
+
+def test_running_statistics_merge(example_df: pd.DataFrame) -> None:
+    first_statistics: RunningStatistics = RunningStatistics(["hits", "avg"])
+    first_statistics.update(example_df.iloc[:300])
+    second_statistics: RunningStatistics = RunningStatistics(["hits", "avg"])
+    second_statistics.update(example_df.iloc[300:])
+    first_statistics.merge(second_statistics)
+
+    pd.testing.assert_frame_equal(
+        first_statistics.to_frame(),
+        compute_league_statistics(example_df, ["hits", "avg"]),
+        rtol=1e-9,
+    )
+
+    with pytest.raises(ValueError, match="different features"):
+        first_statistics.merge(RunningStatistics(["hits"]))
+
+
+def test_running_statistics_few_values() -> None:
+    running_statistics: RunningStatistics = RunningStatistics(["hits", "avg"])
+    running_statistics.update(pd.DataFrame({"hits": [np.nan], "avg": [0.3]}))
+
+    statistics_df: pd.DataFrame = running_statistics.to_frame()
+    assert np.isnan(statistics_df.loc["hits", "mean"])
+    assert statistics_df.loc["avg", "mean"] == pytest.approx(0.3)
+    assert np.isnan(statistics_df.loc["avg", "std"])
+
+
+def test_grouped_running_statistics_matches_in_memory(
+    example_df: pd.DataFrame,
+) -> None:
+    example_df = example_df.assign(team_id=np.arange(len(example_df)) % 15 + 108)
+    grouped_statistics: GroupedRunningStatistics = GroupedRunningStatistics(
+        ["hits", "avg"], ["team_id"]
+    )
+    for start in range(0, len(example_df), 128):
+        grouped_statistics.update(example_df.iloc[start : start + 128])
+
+    pd.testing.assert_frame_equal(
+        grouped_statistics.to_frame(),
+        compute_grouped_statistics(example_df, ["hits", "avg"], ["team_id"]),
+        check_index_type=False,
+        rtol=1e-9,
+    )
@@ -0,0 +1,71 @@
+import pandas as pd
+import pytest
+
+from mlb_airflow_data_pipeline.db_utils import (
+    create_connection,
+    create_table,
+    read_table,
+)
+from mlb_airflow_data_pipeline.write_behind_utils import WriteBehindWriter
+
+
+@pytest.fixture
+def temp_db_file(tmp_path) -> str:
+    """Create a temporary database file path for testing."""
+    return str(tmp_path / "write_behind.db")
+
+
+def team_player_stats(team_id: int) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "playername": [f"Player_{team_id}_{i}" for i in range(3)],
+            "team_id": [team_id] * 3,
+            "hits": [10, 20, 30],
+        }
+    )
+
+
+def test_write_behind_writer_persists_all_frames(temp_db_file: str) -> None:
+    """Test that every submitted frame is written once the writer is closed."""
+    with WriteBehindWriter(temp_db_file, max_queue_size=2, batch_size=3) as writer:
+        writer.submit("league_standings", pd.DataFrame({"team_id": [147, 121]}))
+        for team_id in range(100, 110):
+            writer.submit("player_stats", team_player_stats(team_id))
+
+    assert writer.rows_written == {"league_standings": 2, "player_stats": 30}
+    with create_connection(temp_db_file) as conn:
+        player_stats_df = read_table(conn, "player_stats")
+        assert len(player_stats_df) == 30
+        assert player_stats_df["team_id"].nunique() == 10
+        assert len(read_table(conn, "league_standings")) == 2
+
+
+def test_write_behind_writer_persists_frames_on_crash(temp_db_file: str) -> None:
+    """Test that the frames submitted before an exception are still written."""
+    with (
+        pytest.raises(RuntimeError, match="network failure"),
+        WriteBehindWriter(temp_db_file) as writer,
+    ):
+        writer.submit("player_stats", team_player_stats(147))
+        writer.submit("player_stats", team_player_stats(121))
+        raise RuntimeError("network failure")
+
+    with create_connection(temp_db_file) as conn:
+        assert len(read_table(conn, "player_stats")) == 6
+
+
+def test_write_behind_writer_raises_failed_batch(temp_db_file: str) -> None:
+    """Test that a failed write is raised to the producer."""
+    with create_connection(temp_db_file) as conn:
+        # the submitted frames have no value for the required column
+        create_table(
+            conn,
+            "CREATE TABLE player_stats (playername TEXT, league TEXT NOT NULL);",
+        )
+
+    writer = WriteBehindWriter(temp_db_file)
+    writer.start()
+    writer.submit("player_stats", team_player_stats(147))
+
+    with pytest.raises(Exception, match="Write-behind writer failed"):
+        writer.close()
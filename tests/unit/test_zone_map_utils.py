@@ -0,0 +1,72 @@
+import pandas as pd
+import pytest
+
+from mlb_airflow_data_pipeline.zone_map_utils import (
+    compute_zone_map,
+    read_zone_map,
+    write_zone_map,
+    zone_map_can_match,
+)
+
+
+@pytest.fixture
+def zone_map() -> dict:
+    """Create the zone map of a small typed partition."""
+    return compute_zone_map(
+        pd.DataFrame(
+            {
+                "playername": ["Aaron Judge", "Juan Soto", "Pete Alonso"],
+                "homeRuns": [12, 4, 9],
+                "avg": [0.261, None, 0.250],
+                "caughtStealing": pd.Series([None] * 3, dtype="float64"),
+            }
+        )
+    )
+
+
+def test_compute_zone_map_numeric_columns(zone_map: dict) -> None:
+    """Test that only numeric columns get min/max/count statistics."""
+    assert zone_map["row_count"] == 3
+    assert set(zone_map["columns"]) == {"homeRuns", "avg", "caughtStealing"}
+    assert zone_map["columns"]["homeRuns"] == {"min": 4.0, "max": 12.0, "count": 3}
+    assert zone_map["columns"]["avg"]["count"] == 2
+
+
+@pytest.mark.parametrize(
+    "filters, expected_result",
+    [
+        ([("homeRuns", ">=", 12)], True),
+        ([("homeRuns", ">", 12)], False),
+        ([("homeRuns", "<", 4)], False),
+        ([("homeRuns", "<=", 4)], True),
+        ([("homeRuns", "==", 20)], False),
+        ([("homeRuns", "!=", 4)], True),
+        ([("homeRuns", ">=", 5), ("avg", ">", 0.3)], False),
+        ([("caughtStealing", ">=", 0)], False),
+        ([("unknownStat", ">=", 0)], True),
+    ],
+)
+def test_zone_map_can_match(
+    zone_map: dict, filters: list, expected_result: bool
+) -> None:
+    """Test that partitions are only excluded when no row can match."""
+    assert zone_map_can_match(zone_map, filters) == expected_result
+
+
+def test_zone_map_can_match_without_zone_map() -> None:
+    """Test that a partition without a zone map is never skipped."""
+    assert zone_map_can_match(None, [("homeRuns", ">=", 30)])
+
+
+def test_zone_map_can_match_unsupported_operator(zone_map: dict) -> None:
+    """Test that an unknown operator raises an error."""
+    with pytest.raises(ValueError, match="Unsupported filter operator"):
+        zone_map_can_match(zone_map, [("homeRuns", "~", 30)])
+
+
+def test_write_and_read_zone_map(tmp_path, zone_map: dict) -> None:
+    """Test that a zone map is read back as it was written."""
+    write_zone_map(zone_map, tmp_path)
+
+    assert read_zone_map(tmp_path) == zone_map
+    assert read_zone_map(tmp_path / "missing") is None